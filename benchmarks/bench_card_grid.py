@@ -0,0 +1,100 @@
+"""Виртуальная сетка карточек: смена списка и прокрутка, в том числе с одинаковыми именами
+
+Каталог, где у части элементов совпадают названия (ключ карточки по
+умолчанию), несколько раз фильтруется, перемешивается и прокручивается.
+После каждого шага проверяется, что каждая показанная карточка учтена в
+сетке и заполнена своим элементом, а число виджетов не растет.
+
+    python benchmarks/bench_card_grid.py [количество элементов] [повторов одного имени]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QFrame, QScrollArea
+
+from card_grid import VirtualCardGrid
+
+
+DEFAULT_COUNT = 5000
+DEFAULT_DUPLICATES = 3
+STEPS = 50
+
+
+def make_items(count, duplicates):
+    """Элементы, у которых каждое название повторяется duplicates раз подряд"""
+    return [{"name": f"Program {i // duplicates}", "position": i} for i in range(count)]
+
+
+def check_cards(grid):
+    """Показанные карточки совпадают с учтенными в сетке и заполнены своими элементами"""
+    cards = grid.findChildren(QFrame)
+    shown = {card for card in cards if not card.isHidden()}
+    active = set(grid.active_cards.values())
+    assert shown == active, f"показано карточек {len(shown)}, учтено в сетке {len(active)}"
+    assert len(cards) == len(active) + len(grid.pool), "карточка потеряна: ни в сетке, ни в пуле"
+    for index, card in grid.active_cards.items():
+        assert card.grid_item is grid.items[index], f"карточка {index} заполнена чужим элементом"
+        assert card.bound_position == grid.items[index]["position"]
+    return len(cards)
+
+
+def settle(app, grid):
+    while grid.pending:
+        grid.build_pending()
+    app.processEvents()
+
+
+def main(count, duplicates):
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    def bind_card(card, item):
+        card.bound_position = item["position"]
+
+    scroll_area = QScrollArea()
+    scroll_area.setWidgetResizable(True)
+    scroll_area.resize(1200, 900)
+    grid = VirtualCardGrid(scroll_area, QFrame, bind_card)
+    scroll_area.setWidget(grid)
+    scroll_area.show()
+
+    items = make_items(count, duplicates)
+    rng = random.Random(1)
+    set_items_time = 0
+    max_cards = 0
+
+    grid.set_items(items)
+    settle(app, grid)
+    max_cards = check_cards(grid)
+
+    scroll_bar = scroll_area.verticalScrollBar()
+    for step in range(STEPS):
+        if step % 3 == 0:
+            shown = [item for item in items if rng.random() < 0.7]
+        elif step % 3 == 1:
+            shown = list(items)
+            rng.shuffle(shown)
+        else:
+            shown = list(items)
+
+        started = time.perf_counter()
+        grid.set_items(shown)
+        set_items_time += time.perf_counter() - started
+        settle(app, grid)
+        max_cards = max(max_cards, check_cards(grid))
+
+        scroll_bar.setValue(rng.randint(0, scroll_bar.maximum()))
+        settle(app, grid)
+        max_cards = max(max_cards, check_cards(grid))
+
+    print(f"Элементов {count}, каждое имя повторяется {duplicates} раз, шагов {STEPS}")
+    print(f"  смена списка: {set_items_time / STEPS * 1000:.1f} мс в среднем")
+    print(f"  виджетов карточек всего: {max_cards}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DUPLICATES)
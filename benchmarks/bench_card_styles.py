@@ -0,0 +1,205 @@
+"""Время создания карточек: QSS у каждого виджета против классов из общей таблицы стилей
+
+"до" - карточка, как ее строили раньше: setStyleSheet на карточке, метках и
+кнопке. "после" - те же виджеты с классами из styles.py и одной таблицей на
+контейнере. Время включает показ карточки, то есть применение стилей.
+
+    python benchmarks/bench_card_styles.py [количество карточек]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QFrame, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+
+from styles import install_style_sheet, set_style_class, set_style_state
+
+
+DEFAULT_COUNT = 300
+TAB_STYLE = "QWidget { background-color: #1a1a1a; border-radius: 10px; }"
+
+
+def build_card_inline(index):
+    """Карточка программы со стилями у каждого виджета (прежний вариант)"""
+    card = QFrame()
+    card.setFixedSize(220, 250)
+    card.setStyleSheet("""
+        QFrame {
+            background-color: #252525;
+            border: none;
+            border-radius: 15px;
+            padding: 0px;
+        }
+        QFrame:hover {
+            background-color: #2d2d2d;
+            border: 2px solid #404040;
+        }
+    """)
+    card_layout = QVBoxLayout(card)
+
+    top_container = QWidget()
+    top_container.setStyleSheet("background: transparent;")
+    top_layout = QHBoxLayout(top_container)
+
+    status_label = QLabel("✓")
+    status_label.setStyleSheet("""
+        QLabel {
+            background-color: transparent;
+            border: none;
+            min-width: 24px;
+            max-width: 24px;
+            min-height: 24px;
+            max-height: 24px;
+        }
+        QToolTip {
+            background-color: #2d2d2d;
+            color: #ffffff;
+            border: 1px solid #555555;
+            border-radius: 4px;
+            padding: 8px;
+            font-size: 12px;
+        }
+    """)
+    top_layout.addWidget(status_label)
+
+    is_favorite = index % 3 == 0
+    favorite_btn = QPushButton("♥" if is_favorite else "♡")
+    favorite_btn.setStyleSheet(f"""
+        QPushButton {{
+            background: transparent;
+            border: none;
+            color: {'#ff4757' if is_favorite else '#666666'};
+            font-size: 22px;
+            font-weight: bold;
+        }}
+        QPushButton:hover {{
+            color: #ff4757;
+        }}
+    """)
+    top_layout.addWidget(favorite_btn)
+    card_layout.addWidget(top_container)
+
+    logo_container = QWidget()
+    logo_container.setStyleSheet("background: transparent;")
+    logo_layout = QHBoxLayout(logo_container)
+    logo_label = QLabel("📦")
+    logo_label.setStyleSheet("""
+        QLabel {
+            color: #ffffff;
+            font-size: 48px;
+            font-family: 'Segoe UI Emoji', 'Apple Color Emoji', 'Noto Color Emoji', sans-serif;
+            background: transparent;
+            border: none;
+            qproperty-alignment: AlignCenter;
+        }
+    """)
+    logo_layout.addWidget(logo_label)
+    card_layout.addWidget(logo_container)
+
+    name_label = QLabel(f"Program {index}")
+    name_label.setWordWrap(True)
+    name_label.setStyleSheet("""
+        QLabel {
+            color: #ffffff;
+            font-size: 15px;
+            font-weight: bold;
+            font-family: 'Segoe UI', Arial, sans-serif;
+            background: transparent;
+            border: none;
+            text-align: center;
+            line-height: 1.3;
+            padding: 5px;
+        }
+    """)
+    card_layout.addWidget(name_label)
+    return card
+
+
+def build_card_classes(index):
+    """Та же карточка с классами стилей"""
+    card = QFrame()
+    card.setFixedSize(220, 250)
+    set_style_class(card, "card")
+    card_layout = QVBoxLayout(card)
+
+    top_container = QWidget()
+    set_style_class(top_container, "transparent")
+    top_layout = QHBoxLayout(top_container)
+
+    status_label = QLabel("✓")
+    set_style_class(status_label, "card-status")
+    top_layout.addWidget(status_label)
+
+    is_favorite = index % 3 == 0
+    favorite_btn = QPushButton("♥" if is_favorite else "♡")
+    set_style_class(favorite_btn, "card-favorite")
+    set_style_state(favorite_btn, "favorite", is_favorite)
+    top_layout.addWidget(favorite_btn)
+    card_layout.addWidget(top_container)
+
+    logo_container = QWidget()
+    set_style_class(logo_container, "transparent")
+    logo_layout = QHBoxLayout(logo_container)
+    logo_label = QLabel("📦")
+    logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    set_style_class(logo_label, "card-logo")
+    logo_layout.addWidget(logo_label)
+    card_layout.addWidget(logo_container)
+
+    name_label = QLabel(f"Program {index}")
+    name_label.setWordWrap(True)
+    set_style_class(name_label, "card-name")
+    card_layout.addWidget(name_label)
+    return card
+
+
+def make_container(app, shared_sheet):
+    """Вкладка со своим правилом QWidget и контейнер карточек внутри, как в программе"""
+    tab = QWidget()
+    tab.setStyleSheet(TAB_STYLE)
+    container = QWidget(tab)
+    if shared_sheet:
+        install_style_sheet(container)
+    tab.show()
+    app.processEvents()
+    return tab, container
+
+
+def measure(app, build_card, count, shared_sheet):
+    tab, container = make_container(app, shared_sheet)
+
+    start = time.perf_counter()
+    for index in range(count):
+        card = build_card(index)
+        card.setParent(container)
+        card.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    tab.close()
+    tab.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def main(count):
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    # Прогрев: шрифты и стиль приложения загружаются при первой карточке
+    measure(app, build_card_inline, 5, False)
+    measure(app, build_card_classes, 5, True)
+
+    before = measure(app, build_card_inline, count, False)
+    after = measure(app, build_card_classes, count, True)
+
+    print(f"Карточек: {count}")
+    print(f"  QSS у каждого виджета: {before * 1000:8.1f} мс ({before / count * 1000:.3f} мс на карточку)")
+    print(f"  классы стилей:         {after * 1000:8.1f} мс ({after / count * 1000:.3f} мс на карточку)")
+    print(f"  ускорение: x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
@@ -0,0 +1,126 @@
+"""Сравнение кэша каталога: JSON (indent=2) против снимка catalog_snapshot
+
+Каждая загрузка выполняется в отдельном процессе, чтобы измерить время
+холодного старта интерпретатора с уже прогретым файловым кэшем ОС и прирост RSS.
+
+    python benchmarks/bench_catalog_snapshot.py [1000 10000 100000]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_snapshot import open_snapshot, write_snapshot
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+CATEGORIES = ["Браузеры", "Мультимедиа", "Архиваторы", "Утилиты", "Разработка", "Игры", "Офис", "Безопасность"]
+
+
+def make_catalog(count):
+    """Синтетический каталог, похожий на programs.json"""
+    return [
+        {
+            "name": f"Program {i}",
+            "description": f"Описание программы номер {i} для проверки скорости загрузки каталога",
+            "category": f"{CATEGORIES[i % len(CATEGORIES)]}, {CATEGORIES[(i * 3) % len(CATEGORIES)]}",
+            "logo": f"program_{i}.png",
+            "status": "Доступно" if i % 5 else "Скоро",
+            "keywords": f"program{i},utility,tool{i % 50}",
+            "button_type": "download" if i % 7 else "website",
+            "url": f"https://example.com/downloads/program_{i}.exe",
+            "website": f"https://example.com/program_{i}",
+            "version": i % 100
+        }
+        for i in range(count)
+    ]
+
+
+def current_rss():
+    """Текущий RSS процесса в байтах"""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return counters.WorkingSetSize
+
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def child(kind, path):
+    """Загрузка в дочернем процессе: время загрузки, время обхода имен и прирост RSS"""
+    rss_before = current_rss()
+
+    started = time.perf_counter()
+    if kind == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f)["programs"]
+    else:
+        items = open_snapshot(path)
+    load_time = time.perf_counter() - started
+    rss_loaded = current_rss()
+
+    started = time.perf_counter()
+    names = [item.get("name") for item in items]
+    touch_time = time.perf_counter() - started
+    rss_touched = current_rss()
+
+    print(json.dumps({
+        "count": len(names),
+        "load_ms": load_time * 1000,
+        "touch_ms": touch_time * 1000,
+        "load_rss": rss_loaded - rss_before,
+        "touch_rss": rss_touched - rss_before
+    }))
+
+
+def run_child(kind, path):
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child", kind, path])
+    return json.loads(output)
+
+
+def main(sizes):
+    print(f"{'записей':>8} {'формат':>9} {'файл, КБ':>10} {'загрузка, мс':>13} {'RSS загр., КБ':>14} "
+          f"{'+обход, мс':>11} {'RSS обход, КБ':>14}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            catalog = make_catalog(size)
+            json_path = os.path.join(temp_dir, f"programs_{size}.json")
+            snapshot_path = os.path.join(temp_dir, f"programs_{size}.snapshot")
+
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"programs": catalog}, f, ensure_ascii=False, indent=2)
+            write_snapshot(snapshot_path, catalog)
+
+            for kind, path in (("json", json_path), ("snapshot", snapshot_path)):
+                result = run_child(kind, path)
+                assert result["count"] == size
+                print(f"{size:>8} {kind:>9} {os.path.getsize(path) // 1024:>10} {result['load_ms']:>13.2f} "
+                      f"{result['load_rss'] // 1024:>14} {result['touch_ms']:>11.2f} {result['touch_rss'] // 1024:>14}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
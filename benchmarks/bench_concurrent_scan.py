@@ -0,0 +1,72 @@
+"""Полное сканирование: последовательный обход источников против параллельного (SystemScanner.scan_all)
+
+Провайдер с задержками имитирует обход трех разделов Uninstall и запрос
+драйверов через PowerShell (задержки задаются в мс). Для параллельного
+сканирования показано, когда был готов каждый источник; итоговые программы,
+драйверы и версии сравниваются с последовательным сканированием.
+
+    python benchmarks/bench_concurrent_scan.py [записей] [мс на раздел] [мс на драйверы]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_inventory_fixture import SyntheticInventoryProvider
+from system_scanner import SystemScanner
+
+
+DEFAULT_ENTRIES = 3000
+DEFAULT_SOURCE_DELAY_MS = 400
+DEFAULT_DRIVERS_DELAY_MS = 3000
+
+
+class SlowInventoryProvider(SyntheticInventoryProvider):
+    """Синтетический инвентарь с задержкой чтения каждого источника"""
+
+    def __init__(self, entries, source_delay, drivers_delay):
+        super().__init__(entries)
+        self.source_delay = source_delay
+        self.drivers_delay = drivers_delay
+
+    def read_programs(self, source):
+        time.sleep(self.source_delay)
+        return super().read_programs(source)
+
+    def read_drivers(self):
+        time.sleep(self.drivers_delay)
+        return super().read_drivers()
+
+
+def main(entries, source_delay_ms, drivers_delay_ms):
+    provider = SlowInventoryProvider(entries, source_delay_ms / 1000, drivers_delay_ms / 1000)
+
+    sequential = SystemScanner(provider)
+    started = time.perf_counter()
+    sequential.scan_installed_programs()
+    sequential.scan_installed_drivers()
+    sequential_time = time.perf_counter() - started
+
+    concurrent = SystemScanner(provider)
+    ready = []
+    started = time.perf_counter()
+    concurrent.scan_all(lambda source, names, versions: ready.append((time.perf_counter() - started, source, len(names))))
+    concurrent_time = time.perf_counter() - started
+
+    assert concurrent.installed_programs == sequential.installed_programs
+    assert concurrent.program_versions == sequential.program_versions
+    assert concurrent.installed_drivers == sequential.installed_drivers
+    assert concurrent.driver_versions == sequential.driver_versions
+
+    print(f"Записей: {entries} программ и драйверов, раздел {source_delay_ms} мс, драйверы {drivers_delay_ms} мс")
+    print(f"  последовательно: {sequential_time * 1000:8.0f} мс")
+    print(f"  параллельно:     {concurrent_time * 1000:8.0f} мс, ускорение x{sequential_time / concurrent_time:.1f}")
+    for elapsed, source, count in ready:
+        print(f"    {elapsed * 1000:8.0f} мс  {source} ({count})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ENTRIES,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SOURCE_DELAY_MS,
+         int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_DRIVERS_DELAY_MS)
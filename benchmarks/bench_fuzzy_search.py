@@ -0,0 +1,74 @@
+"""Задержка нечеткого поиска SearchIndex.ranked_search по мере набора на синтетическом каталоге
+
+Каждый запрос набирается по букве: на каждое нажатие считается полный поиск с
+упорядочиванием (как в фоновом потоке вкладки). "холодный" - первое нажатие
+после построения индекса, включая построение сигнатур для опечаток.
+
+    python benchmarks/bench_fuzzy_search.py [количество элементов]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_search_index import make_catalog
+from search_index import SearchIndex
+
+
+DEFAULT_SIZE = 50000
+# Опечатки, перестановки, не та раскладка и транслитерация
+TYPED_QUERIES = ["steam", "ыеуфь", "chrmoe", "хром", "brwoser", "ghjuhfvvf", "архиватр", "utility cleanr"]
+EXPECTED = {"ыеуфь": "Steam", "chrmoe": "Google Chrome", "хром": "Google Chrome", "ghjuhfvvf": "Программа"}
+
+
+def add_known_items(catalog):
+    catalog.extend([
+        {"name": "Steam", "description": "Игровая платформа", "category": "Игры", "keywords": ["valve", "games"]},
+        {"name": "Программа", "description": "Тестовая запись", "category": "Утилиты", "keywords": []},
+    ])
+
+
+def percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def main(size):
+    catalog = make_catalog(size)
+    add_known_items(catalog)
+
+    started = time.perf_counter()
+    index = SearchIndex(catalog)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.ranked_search("chrmoe")
+    cold = time.perf_counter() - started
+
+    print(f"Элементов: {len(catalog)}, построение индекса: {build * 1000:.0f} мс, "
+          f"первый нечеткий запрос: {cold * 1000:.0f} мс, сигнатур пар букв: {len(index.bigram_tokens)}")
+    print(f"{'запрос':>16} {'найдено':>8} {'первый':>28} {'медиана, мс':>12} {'p95, мс':>9} {'макс, мс':>9}")
+
+    all_timings = []
+    for query in TYPED_QUERIES:
+        index._score_cache.clear()
+        timings = []
+        for length in range(1, len(query) + 1):
+            started = time.perf_counter()
+            result = index.ranked_search(query[:length])
+            timings.append(time.perf_counter() - started)
+        all_timings.extend(timings)
+
+        first = result[0]["name"] if result else "-"
+        if query in EXPECTED:
+            assert first == EXPECTED[query], (query, first)
+        print(f"{query:>16} {len(result):>8} {first[:28]:>28} {percentile(timings, 0.5):>12.2f} "
+              f"{percentile(timings, 0.95):>9.2f} {max(timings) * 1000:>9.2f}")
+
+    print(f"{'все нажатия':>16} {len(all_timings):>8} {'':>28} {percentile(all_timings, 0.5):>12.2f} "
+          f"{percentile(all_timings, 0.95):>9.2f} {max(all_timings) * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
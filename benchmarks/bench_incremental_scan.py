@@ -0,0 +1,153 @@
+"""Повторное сканирование: перечитываются только измененные подразделы, статусы обновляются на месте
+
+Синтетическая машина (по умолчанию 1500 программ в трех разделах Uninstall и
+1500 драйверов) и каталог. После полного сканирования и проверки статусов
+часть программ устанавливается, удаляется и обновляется, затем повторное
+сканирование и проверка статусов сравниваются с проверкой всех элементов
+заново и с новым полным сканированием того же состояния.
+
+    python benchmarks/bench_incremental_scan.py [записей] [в каталоге] [изменений]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_inventory_fixture import SyntheticInventoryProvider
+from bench_installed_matcher import make_catalog, make_names
+from system_scanner import InstallationStatusManager
+
+
+DEFAULT_ENTRIES = 1500
+DEFAULT_CATALOG = 1000
+DEFAULT_CHANGES = 5
+
+
+class ChangingInventoryProvider(SyntheticInventoryProvider):
+    """Синтетический реестр с временем записи подразделов и отпечатками разделов"""
+
+    def __init__(self, entries, seed=1):
+        super().__init__(entries, seed)
+        self.records = {source: {record["Subkey"]: record for record in records}
+                        for source, records in self.programs.items()}
+        self.clock = 1
+        self.fingerprints = {source: [len(records), self.clock] for source, records in self.records.items()}
+        self.values_read = 0
+
+    def source_fingerprint(self, source):
+        return list(self.fingerprints[source])
+
+    def read_programs(self, source):
+        self.values_read += len(self.records[source])
+        return list(self.records[source].values())
+
+    def program_stamps(self, source, subkeys=None):
+        records = self.records[source]
+        subkeys = list(records) if subkeys is None else subkeys
+        return {subkey: records[subkey]["LastWrite"] for subkey in subkeys if subkey in records}
+
+    def read_program(self, source, subkey):
+        self.values_read += 1
+        return self.records[source][subkey]
+
+    def touch(self, source, added=False):
+        self.clock += 1
+        if added:
+            self.fingerprints[source] = [len(self.records[source]), self.clock]
+
+    def install(self, name, version):
+        source = sorted(self.records)[self.clock % len(self.records)]
+        subkey = f"{{new-{self.clock}}}"
+        self.touch(source)
+        self.records[source][subkey] = {"Subkey": subkey, "LastWrite": self.clock,
+                                        "DisplayName": name, "DisplayVersion": version}
+        self.touch(source, added=True)
+
+    def uninstall(self, rng):
+        source = rng.choice(sorted(self.records))
+        del self.records[source][rng.choice(sorted(self.records[source]))]
+        self.touch(source, added=True)
+
+    def update(self, rng, version):
+        source = rng.choice(sorted(self.records))
+        record = self.records[source][rng.choice(sorted(self.records[source]))]
+        self.touch(source)
+        record.update(DisplayVersion=version, LastWrite=self.clock)
+
+    def change_drivers(self, rng, count):
+        for name in make_names(count, rng, "newdev"):
+            self.drivers.append({"DeviceName": name, "DriverVersion": "1.0.0"})
+        del self.drivers[:count]
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def full_statuses(provider, programs, drivers):
+    manager = InstallationStatusManager(provider)
+    _, scan_time = timed(manager.perform_system_scan)
+    _, programs_time = timed(manager.check_programs_status, programs)
+    _, drivers_time = timed(manager.check_drivers_status, drivers)
+    return manager, scan_time, programs_time + drivers_time
+
+
+def compare(title, patched, full, installed_names):
+    """Статусы совпадают; при нескольких подходящих названиях допускается другое из установленных"""
+    differences = 0
+    for name, status in full.items():
+        if patched[name] != status:
+            assert patched[name]["installed"] == status["installed"], (title, name, patched[name], status)
+            assert patched[name]["exact_name"] in installed_names, (title, name, patched[name])
+            differences += 1
+    return differences
+
+
+def main(entries, catalog_size, change_count):
+    rng = random.Random(3)
+    catalog = [{"name": name} for name in make_catalog(catalog_size)]
+    provider = ChangingInventoryProvider(entries)
+
+    manager, scan_time, check_time = full_statuses(provider, catalog, catalog)
+    print(f"Записей: {entries} программ и драйверов, в каталоге: {catalog_size}, изменений: {change_count} каждого вида")
+    print(f"  полное:    сканирование {scan_time * 1000:8.1f} мс, статусы {check_time * 1000:8.1f} мс, "
+          f"прочитано записей {provider.values_read}")
+
+    for name in make_names(change_count, rng, "fresh"):
+        provider.install(name, "1.0")
+    for _ in range(change_count):
+        provider.uninstall(rng)
+        provider.update(rng, f"{rng.randint(50, 99)}.0")
+    provider.change_drivers(rng, change_count)
+
+    provider.values_read = 0
+    _, rescan_time = timed(manager.perform_system_scan)
+    _, programs_time = timed(manager.check_programs_status, catalog)
+    _, drivers_time = timed(manager.check_drivers_status, catalog)
+    print(f"  повторное: сканирование {rescan_time * 1000:8.1f} мс, статусы {(programs_time + drivers_time) * 1000:8.1f} мс, "
+          f"прочитано записей {provider.values_read}")
+
+    scanner = manager.scanner
+    assert manager.program_statuses == {name: scanner.check_program_installed(name) for name in manager.program_statuses}
+    assert manager.driver_statuses == {name: scanner.check_driver_installed(name) for name in manager.driver_statuses}
+
+    fresh, _, _ = full_statuses(provider, catalog, catalog)
+    scanner = fresh.scanner
+    assert manager.scanner.installed_programs == scanner.installed_programs
+    assert manager.scanner.program_versions == scanner.program_versions
+    program_differences = compare("программы", manager.program_statuses, fresh.program_statuses,
+                                  scanner.installed_programs)
+    driver_differences = compare("драйверы", manager.driver_statuses, fresh.driver_statuses,
+                                 scanner.installed_programs | scanner.installed_drivers)
+    print(f"  совпадает с проверкой всех элементов заново и с полным сканированием; другое из подходящих названий: "
+          f"программ {program_differences}, драйверов {driver_differences}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ENTRIES,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CATALOG,
+         int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CHANGES)
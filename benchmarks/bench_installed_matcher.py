@@ -0,0 +1,146 @@
+"""Проверка статусов установки: индекс InstalledNameIndex против прежнего полного перебора
+
+Синтетическая машина с 5000 установленных программ и 5000 драйверов и каталог
+из 2000 программ и 2000 драйверов. Прежний перебор воспроизведен ниже дословно
+на тех же правилах сравнения SystemScanner; результаты обоих вариантов
+сравниваются для каждого элемента каталога.
+
+    python benchmarks/bench_installed_matcher.py [установлено] [в каталоге]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from system_scanner import SystemScanner
+
+
+DEFAULT_INSTALLED = 5000
+DEFAULT_CATALOG = 2000
+VENDORS = ["NVIDIA", "AMD", "Intel", "Realtek", "Microsoft", "Google", "Mozilla", "Adobe", "Oracle", "Valve",
+           "Logitech", "ASUS", "MSI", "Corsair", "Razer", "Epic Games", "JetBrains", "VideoLAN", "7-Zip", "Opera"]
+PRODUCTS = ["Chrome", "Firefox", "Reader", "Java", "Steam", "Audio", "Graphics", "Chipset", "Runtime", "Framework",
+            "Visual C++", ".NET", "Redistributable", "Settings", "Software", "Launcher", "Updater", "Player", "Studio",
+            "Toolbox", "Ethernet", "Bluetooth", "USB", "Serial", "Management", "Experience", "Control Panel", "GX",
+            "DirectX", "Vulkan", "PhysX", "Adrenalin", "Driver", "SDK", "Gaming", "Mouse", "Keyboard", "Camera"]
+SUFFIXES = ["", " (x64)", " (x86)", " 2019", " 2022", " 64-bit", " - 14.36.32532", " v2", " Update", " Setup"]
+
+
+def make_names(count, rng, prefix):
+    names = set()
+    while len(names) < count:
+        words = [rng.choice(VENDORS)] + rng.sample(PRODUCTS, rng.randint(1, 3))
+        version = f" {rng.randint(1, 30)}.{rng.randint(0, 9)}.{rng.randint(0, 999)}" if rng.random() < 0.6 else ""
+        tag = f" {prefix}{rng.randint(0, count)}" if rng.random() < 0.5 else ""
+        names.add(" ".join(words) + tag + version + rng.choice(SUFFIXES))
+    return names
+
+
+def make_scanner(installed, seed=1):
+    rng = random.Random(seed)
+    scanner = SystemScanner()
+    scanner.installed_programs = make_names(installed, rng, "app")
+    scanner.installed_drivers = make_names(installed, rng, "dev")
+    scanner.program_versions = {name: f"{rng.randint(1, 9)}.{rng.randint(0, 9)}" for name in scanner.installed_programs}
+    scanner.driver_versions = {name: f"{rng.randint(1, 30)}.{rng.randint(0, 99)}" for name in scanner.installed_drivers}
+    return scanner
+
+
+def make_catalog(count, seed=2):
+    rng = random.Random(seed)
+    return sorted(make_names(count, rng, "item"))
+
+
+def linear_check_program(scanner, program_name):
+    """Прежний check_program_installed"""
+    program_name_lower = program_name.lower()
+    for installed_program in scanner.installed_programs:
+        if scanner._is_program_match(program_name_lower, installed_program.lower()):
+            return {"installed": True, "exact_name": installed_program,
+                    "version": scanner.program_versions.get(installed_program, "Неизвестно")}
+    return {"installed": False, "exact_name": None, "version": None}
+
+
+def linear_check_in_programs(scanner, driver_name):
+    """Прежний _check_in_programs"""
+    driver_name_lower = driver_name.lower()
+    driver_words = set(scanner._extract_key_words(driver_name_lower))
+    candidates = []
+    for installed_program in scanner.installed_programs:
+        installed_lower = installed_program.lower()
+        if ('.net' in driver_name_lower or 'dotnet' in driver_name_lower) and '.net' in installed_lower:
+            if not scanner._has_exclusions(installed_lower, driver_name_lower):
+                candidates.append({"program": installed_program,
+                                   "score": scanner._calculate_relevance_score(driver_name_lower, installed_lower)})
+                continue
+        if any(word in installed_lower for word in driver_words if len(word) > 2):
+            if not scanner._has_exclusions(installed_lower, driver_name_lower):
+                if scanner._is_relevant_match(driver_name_lower, installed_lower):
+                    candidates.append({"program": installed_program,
+                                       "score": scanner._calculate_relevance_score(driver_name_lower, installed_lower)})
+    if candidates:
+        best = max(candidates, key=lambda x: x["score"])
+        return {"installed": True, "exact_name": best["program"],
+                "version": scanner.program_versions.get(best["program"], "Неизвестно")}
+    return {"installed": False, "exact_name": None, "version": None}
+
+
+def linear_check_in_drivers(scanner, driver_name):
+    """Прежний _check_in_drivers"""
+    driver_name_lower = driver_name.lower()
+    driver_words = set(scanner._extract_key_words(driver_name_lower))
+    for installed_driver in scanner.installed_drivers:
+        installed_lower = installed_driver.lower()
+        if any(word in installed_lower for word in driver_words if len(word) > 2):
+            if not scanner._has_exclusions(installed_lower, driver_name_lower):
+                if scanner._is_relevant_match(driver_name_lower, installed_lower):
+                    return {"installed": True, "exact_name": installed_driver,
+                            "version": scanner.driver_versions.get(installed_driver, "Неизвестно")}
+    return {"installed": False, "exact_name": None, "version": None}
+
+
+def linear_check_driver(scanner, driver_name):
+    """Прежний check_driver_installed"""
+    if 'directx' in driver_name.lower() and scanner._check_directx_installed():
+        return {"installed": True, "exact_name": "DirectX (системный)", "version": "Установлен"}
+    result = linear_check_in_programs(scanner, driver_name)
+    if result["installed"]:
+        return result
+    result = linear_check_in_drivers(scanner, driver_name)
+    if result["installed"]:
+        return result
+    return {"installed": False, "exact_name": None, "version": None}
+
+
+def timed(function, names):
+    started = time.perf_counter()
+    results = [function(name) for name in names]
+    return results, time.perf_counter() - started
+
+
+def main(installed, catalog_size):
+    scanner = make_scanner(installed)
+    catalog = make_catalog(catalog_size)
+    print(f"Установлено: {installed} программ и {installed} драйверов, в каталоге: {catalog_size} названий")
+
+    for title, indexed, linear in (
+        ("программы", scanner.check_program_installed, lambda name: linear_check_program(scanner, name)),
+        ("драйверы", scanner.check_driver_installed, lambda name: linear_check_driver(scanner, name)),
+    ):
+        scanner._program_index = scanner._driver_index = None
+        new_results, new_time = timed(indexed, catalog)
+        old_results, old_time = timed(linear, catalog)
+
+        mismatches = [name for name, new, old in zip(catalog, new_results, old_results) if new != old]
+        assert not mismatches, f"{title}: результаты расходятся для {mismatches[:5]}"
+        found = sum(1 for result in new_results if result["installed"])
+
+        print(f"  {title:>10}: найдено {found:>5}, перебор {old_time:8.2f} с, индекс {new_time * 1000:8.1f} мс "
+              f"(с построением), ускорение x{old_time / new_time:.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_INSTALLED,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CATALOG)
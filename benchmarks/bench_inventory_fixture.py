@@ -0,0 +1,86 @@
+"""Сканирование и проверка статусов на синтетической машине из записанного инвентаря
+
+Создает JSON инвентарь (10000 программ в трех разделах Uninstall и 10000
+драйверов) в формате FixtureInventoryProvider и прогоняет через него те же
+пути, что и BackgroundScanner: сканирование, статусы программ и драйверов
+каталога. Работает без Windows.
+
+    python benchmarks/bench_inventory_fixture.py [записей] [в каталоге]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_installed_matcher import make_catalog, make_names
+from inventory_providers import FixtureInventoryProvider, InventoryProvider, PROGRAM_SOURCES, record_inventory
+from system_scanner import InstallationStatusManager
+
+
+DEFAULT_ENTRIES = 10000
+DEFAULT_CATALOG = 1000
+
+
+class SyntheticInventoryProvider(InventoryProvider):
+    """Случайный инвентарь в памяти; записывается в файл через record_inventory"""
+
+    def __init__(self, entries, seed=1):
+        rng = random.Random(seed)
+        programs = sorted(make_names(entries, rng, "app"))
+        self.programs = {source: [] for source in PROGRAM_SOURCES}
+        for position, name in enumerate(programs):
+            record = {"Subkey": f"{{{position:08d}}}", "LastWrite": 1, "DisplayName": name}
+            if rng.random() < 0.8:
+                record["DisplayVersion"] = f"{rng.randint(1, 30)}.{rng.randint(0, 9)}"
+            self.programs[rng.choice(PROGRAM_SOURCES)].append(record)
+
+        self.drivers = [
+            {"DeviceName": name, "DriverVersion": f"{rng.randint(1, 31)}.{rng.randint(0, 99)}.{rng.randint(0, 9999)}",
+             "DriverDate": "20240101000000.******+***"}
+            for name in sorted(make_names(entries, rng, "dev"))
+        ]
+
+    def program_sources(self):
+        return list(self.programs)
+
+    def read_programs(self, source):
+        return self.programs[source]
+
+    def read_drivers(self):
+        return self.drivers
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main(entries, catalog_size):
+    catalog = [{"name": name} for name in make_catalog(catalog_size)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "inventory.json")
+        counts, record_time = timed(record_inventory, SyntheticInventoryProvider(entries), path)
+        size = os.path.getsize(path)
+
+        manager = InstallationStatusManager(FixtureInventoryProvider(path))
+        _, scan_time = timed(manager.perform_system_scan)
+        program_statuses, programs_time = timed(manager.check_programs_status, catalog)
+        driver_statuses, drivers_time = timed(manager.check_drivers_status, catalog)
+
+    print(f"Инвентарь: {counts['programs']} программ, {counts['drivers']} драйверов, "
+          f"{size / 1024 / 1024:.1f} МБ (запись {record_time * 1000:.0f} мс), в каталоге: {catalog_size}")
+    print(f"  сканирование:     {scan_time * 1000:8.1f} мс")
+    print(f"  статусы программ: {programs_time * 1000:8.1f} мс, установлено "
+          f"{sum(1 for status in program_statuses.values() if status['installed'])}")
+    print(f"  статусы драйверов:{drivers_time * 1000:8.1f} мс, установлено "
+          f"{sum(1 for status in driver_statuses.values() if status['installed'])}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ENTRIES,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CATALOG)
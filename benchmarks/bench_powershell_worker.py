@@ -0,0 +1,127 @@
+"""Запросы WMI: новый процесс на каждый запрос против общего процесса PowerShellWorker
+
+По умолчанию используется powershell_stub.py (работает без Windows); на
+Windows можно указать powershell. Кроме времени проверяются таймаут с
+перезапуском, таймаут ожидания занятого процесса и холодного запуска, ошибка
+команды и повтор после завершения процесса.
+
+    python benchmarks/bench_powershell_worker.py [запросов] [powershell]
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from gpu_detector import CPU_NAMES_COMMAND, GPU_NAMES_COMMAND
+from inventory_providers import DRIVERS_COMMAND
+from powershell_worker import PowerShellError, PowerShellTimeout, PowerShellWorker
+import powershell_worker
+
+
+DEFAULT_QUERIES = 20
+STUB = os.path.join(ROOT, "powershell_stub.py")
+COMMANDS = [GPU_NAMES_COMMAND, CPU_NAMES_COMMAND, DRIVERS_COMMAND]
+
+
+def base_command_line(executable):
+    if executable == STUB:
+        return [sys.executable, STUB]
+    return [executable, "-NoProfile"]
+
+
+def spawn_query(executable, command):
+    """Прежний способ: отдельный процесс на запрос"""
+    result = subprocess.run(base_command_line(executable) + ["-Command", command],
+                            capture_output=True, text=True, encoding='utf-8', timeout=60)
+    return result.stdout
+
+
+def worker_command_line(executable):
+    os.environ[powershell_worker.POWERSHELL_ENV] = executable
+    return powershell_worker.worker_command_line()
+
+
+def check_recovery(worker):
+    """Таймаут, ошибка команды и завершение процесса не ломают следующие запросы"""
+    worker.query(GPU_NAMES_COMMAND)
+    starts = worker.starts
+
+    try:
+        worker.query("Start-Sleep -Seconds 5", timeout=0.5)
+        raise AssertionError("нет таймаута")
+    except PowerShellTimeout:
+        pass
+    assert worker.query(GPU_NAMES_COMMAND) and worker.starts == starts + 1
+
+    try:
+        worker.query("throw 'проверка'")
+        raise AssertionError("нет ошибки")
+    except PowerShellError as e:
+        assert "проверка" in str(e)
+    assert worker.query(GPU_NAMES_COMMAND) and worker.starts == starts + 1
+
+    worker.process.kill()
+    worker.process.wait()
+    assert worker.query(GPU_NAMES_COMMAND) and worker.starts == starts + 2
+
+
+def check_timeouts(command_line):
+    """Таймаут запроса ограничивает и ожидание занятого процесса, и холодный запуск"""
+    worker = PowerShellWorker(command_line)
+    try:
+        worker.query("Start-Sleep -Seconds 0.01", timeout=0.001)
+        raise AssertionError("нет таймаута холодного запуска")
+    except PowerShellTimeout:
+        pass
+    assert worker.is_running(), "запускающийся процесс не должен завершаться по таймауту"
+    assert worker.query(GPU_NAMES_COMMAND) and worker.starts == 1
+
+    busy = threading.Thread(target=worker.query, args=("Start-Sleep -Seconds 1",))
+    busy.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    try:
+        worker.query(GPU_NAMES_COMMAND, timeout=0.2)
+        raise AssertionError("нет таймаута ожидания занятого процесса")
+    except PowerShellTimeout:
+        pass
+    waited = time.perf_counter() - started
+    assert waited < 0.5, f"ожидание занятого процесса {waited:.2f} с"
+    busy.join()
+    worker.stop()
+
+
+def main(queries, executable):
+    started = time.perf_counter()
+    for index in range(queries):
+        spawn_query(executable, COMMANDS[index % len(COMMANDS)])
+    spawn_time = time.perf_counter() - started
+
+    worker = PowerShellWorker(worker_command_line(executable))
+    started = time.perf_counter()
+    worker.query(COMMANDS[0])
+    first_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for index in range(1, queries):
+        worker.query(COMMANDS[index % len(COMMANDS)])
+    warm_time = time.perf_counter() - started
+
+    check_recovery(worker)
+    worker.stop()
+    check_timeouts(worker.command_line)
+
+    print(f"Запросов: {queries}, исполняемый файл: {os.path.basename(executable)}")
+    print(f"  процесс на запрос:  {spawn_time * 1000:8.0f} мс ({spawn_time / queries * 1000:.1f} мс на запрос)")
+    print(f"  общий процесс:      {(first_time + warm_time) * 1000:8.0f} мс (первый с запуском {first_time * 1000:.1f} мс, "
+          f"далее {warm_time / max(1, queries - 1) * 1000:.2f} мс на запрос)")
+    print("  таймауты запроса, занятого процесса и холодного запуска, ошибка команды "
+          "и перезапуск после завершения процесса: проверены")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_QUERIES,
+         sys.argv[2] if len(sys.argv) > 2 else STUB)
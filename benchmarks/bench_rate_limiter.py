@@ -0,0 +1,125 @@
+"""Ограничение скорости загрузок: измеренная скорость против заданного лимита
+
+Локальный http.server отдает файл с поддержкой Range, SegmentedDownloader
+скачивает его несколькими соединениями через BandwidthLimiter. Проверяются
+лимит одной загрузки (общий для всех ее соединений) и общий лимит процесса
+для двух одновременных загрузок: измеренная скорость должна быть в пределах
+допуска от лимита. Для сравнения показана скорость без ограничения.
+
+    python benchmarks/bench_rate_limiter.py [лимит КБ/с] [секунд] [допуск %]
+"""
+import http.server
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import create_session
+from rate_limiter import BandwidthLimiter
+from segmented_downloader import SegmentedDownloader
+
+
+DEFAULT_LIMIT_KBPS = 2048
+DEFAULT_SECONDS = 3
+DEFAULT_TOLERANCE_PERCENT = 5
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Отдает server.payload целиком или диапазон из заголовка Range"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        payload = self.server.payload
+        start, end = 0, len(payload) - 1
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(end, int(match.group(2))) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        try:
+            self.wfile.write(payload[start:end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(size):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    server.daemon_threads = True
+    server.payload = os.urandom(size)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def download_all(url, directory, throttles):
+    """Скачать файл параллельно по одному разу на каждый ограничитель, возвращает (байт, секунд)"""
+    session = create_session()
+    downloaders = [
+        SegmentedDownloader(url, os.path.join(directory, f"download-{index}.bin"), session=session, throttle=throttle)
+        for index, throttle in enumerate(throttles)
+    ]
+    threads = [threading.Thread(target=downloader.download) for downloader in downloaders]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    for throttle in throttles:
+        throttle.close()
+    return sum(downloader.downloaded for downloader in downloaders), elapsed
+
+
+def check_rate(title, received, elapsed, limit, tolerance):
+    rate = received / elapsed
+    deviation = (rate - limit) / limit
+    print(f"  {title:<34} {rate / 1024:9.0f} КБ/с, лимит {limit / 1024:.0f} КБ/с, отклонение {deviation * 100:+.1f}%")
+    assert abs(deviation) <= tolerance, f"{title}: скорость {rate / 1024:.0f} КБ/с вне допуска от лимита"
+
+
+def main(limit_kbps, seconds, tolerance_percent):
+    limit = limit_kbps * 1024
+    tolerance = tolerance_percent / 100
+    size = int(limit * seconds)
+    server = start_server(size)
+    url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+
+    print(f"Файл {size / 1024 / 1024:.1f} МБ, лимит {limit_kbps} КБ/с, допуск {tolerance_percent}%")
+    with tempfile.TemporaryDirectory() as directory:
+        received, elapsed = download_all(url, directory, [BandwidthLimiter().create_transfer()])
+        assert received == size
+        print(f"  {'без ограничения':<34} {received / elapsed / 1024:9.0f} КБ/с")
+
+        limiter = BandwidthLimiter(transfer_rate=limit)
+        received, elapsed = download_all(url, directory, [limiter.create_transfer()])
+        assert received == size
+        check_rate("лимит загрузки (все соединения)", received, elapsed, limit, tolerance)
+
+        limiter = BandwidthLimiter(global_rate=limit)
+        received, elapsed = download_all(url, directory, [limiter.create_transfer(), limiter.create_transfer()])
+        assert received == 2 * size
+        # Две загрузки делят общий лимит, поэтому длятся вдвое дольше
+        check_rate("общий лимит (две загрузки)", received, elapsed, limit, tolerance)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LIMIT_KBPS,
+         float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SECONDS,
+         float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_TOLERANCE_PERCENT)
@@ -0,0 +1,97 @@
+"""Задержка запросов SearchIndex против линейного поиска на синтетическом каталоге
+
+"маска" - только вычисление множества найденных элементов, "медиана" и "p95" -
+вместе с построением списка результатов в порядке каталога.
+
+    python benchmarks/bench_search_index.py [количество элементов]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+
+
+DEFAULT_SIZE = 50000
+REPEATS = 200
+CATEGORIES = ["Браузеры", "Мультимедиа", "Архиваторы", "Утилиты", "Разработка", "Игры", "Офис", "Безопасность"]
+WORDS = [
+    "browser", "archive", "video", "audio", "player", "editor", "driver", "update", "system", "cleaner",
+    "monitor", "backup", "manager", "download", "utility", "graphics", "network", "security", "office", "games",
+    "быстрый", "бесплатный", "архиватор", "браузер", "драйвер", "видео", "плеер", "редактор", "утилита", "система"
+]
+QUERIES = ["chrome", "arch", "vid", "плеер", "program 4213", "xyzzy", "utility cleaner", "е", "p", "4213"]
+
+
+def make_catalog(count, seed=1):
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(count):
+        words = rng.sample(WORDS, 6)
+        catalog.append({
+            "name": f"Program {i} {words[0].capitalize()}",
+            "description": " ".join(words[1:]) + f" версия {i % 97}",
+            "category": f"{CATEGORIES[i % len(CATEGORIES)]}, {CATEGORIES[(i * 3) % len(CATEGORIES)]}",
+            "keywords": [words[0], f"tool{i % 500}"]
+        })
+    catalog.append({"name": "Google Chrome", "description": "Браузер", "category": "Браузеры", "keywords": ["chrome"]})
+    return catalog
+
+
+def linear_search(items, query):
+    """Прежний поиск вкладок: подстрока в полях каждого элемента"""
+    query = query.lower()
+    results = []
+    for item in items:
+        if (query in item["name"].lower() or query in item["description"].lower()
+                or query in item["category"].lower() or any(query in keyword for keyword in item["keywords"])):
+            results.append(item)
+    return results
+
+
+def measure(function, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return result, timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.95)] * 1000
+
+
+def main(size):
+    catalog = make_catalog(size)
+
+    started = time.perf_counter()
+    index = SearchIndex(catalog)
+    print(f"Элементов: {len(catalog)}, построение индекса: {(time.perf_counter() - started) * 1000:.0f} мс, "
+          f"слов: {len(index.postings)}, суффиксов: {len(index.suffixes)}")
+    print(f"{'запрос':>18} {'найдено':>8} {'холодный, мс':>13} {'маска, мс':>10} "
+          f"{'медиана, мс':>12} {'p95, мс':>9} {'линейно, мс':>12}")
+
+    favorites = [item["name"] for item in catalog[::997]]
+
+    for query in QUERIES:
+        index._token_cache.clear()
+        started = time.perf_counter()
+        index.search(query)
+        cold = (time.perf_counter() - started) * 1000
+
+        # Повторные запросы - как при наборе текста, когда слова уже в кэше индекса
+        _, mask_median, _ = measure(lambda: index.query_mask(query))
+        result, median, p95 = measure(lambda: index.search(query))
+        _, linear, _ = measure(lambda: linear_search(catalog, query), repeats=3)
+        if query != "utility cleaner" and query != "program 4213":
+            assert len(result) == len(linear_search(catalog, query)), query
+        print(f"{query:>18} {len(result):>8} {cold:>13.3f} {mask_median:>10.3f} "
+              f"{median:>12.3f} {p95:>9.3f} {linear:>12.1f}")
+
+    result, median, p95 = measure(lambda: index.search("arch", category="Утилиты", keys=favorites))
+    print(f"{'arch+кат.+избр.':>18} {len(result):>8} {'':>13} {'':>10} {median:>12.3f} {p95:>9.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,242 @@
+import time
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QWidget
+from temp_manager import debug_log
+
+
+CARD_WIDTH = 220
+CARD_HEIGHT = 250
+HORIZONTAL_SPACING = 120
+VERTICAL_SPACING = 50
+MARGIN_LEFT = 55
+MARGIN_TOP = 10
+MARGIN_RIGHT = 45
+MARGIN_BOTTOM = 10
+OVERSCAN_ROWS = 1
+# Время на одну порцию построения карточек, чтобы ввод в поиске не подвисал
+BATCH_BUDGET = 0.008
+
+
+class VirtualCardGrid(QWidget):
+    """Виртуальная сетка карточек для QScrollArea
+
+    Виджеты существуют только для видимых строк и небольшого запаса сверху и снизу.
+    Карточки, ушедшие из видимой области, прячутся в пул и переиспользуются для новых
+    элементов: create_card() строит пустую карточку, bind_card(card, item) заполняет ее.
+    При смене списка карточки оставшихся видимыми элементов (по ключу key_func)
+    только перемещаются, а недостающие строятся порциями через цикл событий.
+    unbind_card(card) вызывается, когда карточка уходит в пул (например, чтобы
+    отменить загрузку ее логотипа).
+    Расположение совпадает с прежней QGridLayout с выравниванием по центру.
+    """
+
+    def __init__(self, scroll_area, create_card, bind_card, columns=3, overscan_rows=OVERSCAN_ROWS,
+                 key_func=None, unbind_card=None):
+        super().__init__()
+        self.scroll_area = scroll_area
+        self.create_card = create_card
+        self.bind_card = bind_card
+        self.unbind_card = unbind_card
+        self.columns = columns
+        self.overscan_rows = overscan_rows
+        self.key_func = key_func or (lambda item: item.get("name"))
+
+        self.items = []
+        self.active_cards = {}
+        self.pool = []
+        self.pending = []
+
+        self.stats = {"created": 0, "reused": 0, "recycled": 0}
+        self.stats_reported = True
+
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(0)
+        self.batch_timer.timeout.connect(self.build_pending)
+
+        scroll_area.verticalScrollBar().valueChanged.connect(self.update_visible)
+
+    def set_items(self, items):
+        """Показать новый список элементов, сохранив карточки оставшихся видимыми элементов"""
+        self.items = list(items)
+        self.stats = {"created": 0, "reused": 0, "recycled": 0}
+        self.stats_reported = False
+
+        # Имена могут совпадать, поэтому по ключу хранится список карточек
+        cards_by_key = {}
+        for card in self.active_cards.values():
+            cards_by_key.setdefault(self.key_func(card.grid_item), []).append(card)
+        self.active_cards = {}
+
+        self.update_geometry()
+        start, end = self.visible_range()
+        for index in range(start, end):
+            item = self.items[index]
+            cards = cards_by_key.get(self.key_func(item))
+            if not cards:
+                continue
+            card = cards.pop(0)
+            if card.grid_item is not item:
+                self.bind(card, item, index)
+            card.grid_index = index
+            self.active_cards[index] = card
+            self.stats["reused"] += 1
+
+        for cards in cards_by_key.values():
+            for card in cards:
+                self.pool_card(card)
+
+        self.update_visible()
+
+    def set_columns(self, columns):
+        if columns == self.columns:
+            return
+        self.columns = columns
+        self.update_geometry()
+        self.update_visible()
+
+    def refresh(self):
+        """Заново заполнить видимые карточки (статусы установки, избранное)"""
+        for index, card in self.active_cards.items():
+            self.bind(card, self.items[index], index)
+
+    def bind(self, card, item, index):
+        card.grid_item = item
+        card.grid_index = index
+        self.bind_card(card, item)
+
+    def index_priority(self, index):
+        """Приоритет загрузки для элемента: 0 в видимой области, дальше от нее - меньше"""
+        _, top = self.grid_origin()
+        row_pitch = CARD_HEIGHT + VERTICAL_SPACING
+        viewport_top = self.scroll_area.verticalScrollBar().value()
+        first_row = (viewport_top - top) // row_pitch
+        last_row = (viewport_top + self.scroll_area.viewport().height() - top) // row_pitch
+
+        row = index // self.columns
+        if row < first_row:
+            return row - first_row
+        if row > last_row:
+            return last_row - row
+        return 0
+
+    def row_count(self):
+        return (len(self.items) + self.columns - 1) // self.columns
+
+    def grid_size(self):
+        """Размер сетки карточек без внешних отступов"""
+        rows = self.row_count()
+        width = self.columns * CARD_WIDTH + (self.columns - 1) * HORIZONTAL_SPACING
+        height = rows * CARD_HEIGHT + max(0, rows - 1) * VERTICAL_SPACING
+        return width, height
+
+    def update_geometry(self):
+        self.setMinimumHeight(MARGIN_TOP + self.grid_size()[1] + MARGIN_BOTTOM)
+
+    def grid_origin(self):
+        """Левый верхний угол сетки: по центру области, но не ближе отступов"""
+        width, height = self.grid_size()
+        # Высота после setMinimumHeight применяется не сразу: берем ту, что выставит QScrollArea
+        own_height = max(self.minimumHeight(), self.scroll_area.viewport().height())
+        left = max(MARGIN_LEFT, (self.width() - width + MARGIN_LEFT - MARGIN_RIGHT) // 2)
+        top = max(MARGIN_TOP, (own_height - height + MARGIN_TOP - MARGIN_BOTTOM) // 2)
+        return left, top
+
+    def visible_range(self):
+        """Диапазон индексов элементов, для которых нужны карточки"""
+        if not self.items:
+            return 0, 0
+
+        _, top = self.grid_origin()
+        row_pitch = CARD_HEIGHT + VERTICAL_SPACING
+        viewport_top = self.scroll_area.verticalScrollBar().value()
+        viewport_bottom = viewport_top + self.scroll_area.viewport().height()
+
+        first_row = max(0, (viewport_top - top) // row_pitch - self.overscan_rows)
+        last_row = min(self.row_count() - 1, (viewport_bottom - top) // row_pitch + self.overscan_rows)
+        if last_row < first_row:
+            return 0, 0
+
+        return first_row * self.columns, min(len(self.items), (last_row + 1) * self.columns)
+
+    def acquire_card(self):
+        if self.pool:
+            self.stats["recycled"] += 1
+            return self.pool.pop()
+        self.stats["created"] += 1
+        card = self.create_card()
+        card.setParent(self)
+        return card
+
+    def release_card(self, index):
+        self.pool_card(self.active_cards.pop(index))
+
+    def pool_card(self, card):
+        card.hide()
+        if self.unbind_card:
+            self.unbind_card(card)
+        self.pool.append(card)
+
+    def card_position(self, index, origin):
+        left, top = origin
+        row, col = divmod(index, self.columns)
+        return left + col * (CARD_WIDTH + HORIZONTAL_SPACING), top + row * (CARD_HEIGHT + VERTICAL_SPACING)
+
+    def update_visible(self, *args):
+        """Расставить карточки видимых строк, спрятать остальные и запланировать недостающие"""
+        start, end = self.visible_range()
+
+        for index in list(self.active_cards):
+            if not start <= index < end:
+                self.release_card(index)
+
+        origin = self.grid_origin()
+        for index, card in self.active_cards.items():
+            card.move(*self.card_position(index, origin))
+            card.show()
+
+        self.pending = [index for index in range(start, end) if index not in self.active_cards]
+        if self.pending:
+            self.batch_timer.start()
+        else:
+            self.report_stats()
+
+    def build_pending(self):
+        """Построить порцию недостающих карточек, не занимая цикл событий дольше BATCH_BUDGET"""
+        deadline = time.perf_counter() + BATCH_BUDGET
+        start, end = self.visible_range()
+        origin = self.grid_origin()
+
+        while self.pending and time.perf_counter() < deadline:
+            index = self.pending.pop(0)
+            if index in self.active_cards or not start <= index < end:
+                continue
+
+            card = self.acquire_card()
+            self.bind(card, self.items[index], index)
+            self.active_cards[index] = card
+            card.move(*self.card_position(index, origin))
+            card.show()
+
+        if self.pending:
+            self.batch_timer.start()
+        else:
+            self.report_stats()
+
+    def report_stats(self):
+        """Записать в лог, сколько карточек создано и переиспользовано после смены списка"""
+        if self.stats_reported:
+            return
+        self.stats_reported = True
+        debug_log(
+            f"Сетка карточек: элементов {len(self.items)}, создано {self.stats['created']}, "
+            f"переиспользовано {self.stats['reused']}, из пула {self.stats['recycled']}"
+        )
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_visible()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_visible()
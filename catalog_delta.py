@@ -0,0 +1,248 @@
+"""Инкрементальное обновление каталогов
+
+Клиент отправляет ревизию своего кэша в заголовке X-Catalog-Revision вместе
+с A-IM: catalog-patch. Сервер, который знает эту ревизию, отвечает 226 IM Used
+и списком операций в духе JSON Patch с SHA-256 итогового каталога; иначе отдает
+полный каталог (200) или 304. Операции add и move указывают в "before" ключ
+элемента, перед которым стоит элемент (null - в конец), поэтому порядок
+каталога и его хэш совпадают с сервером.
+
+Локальная замена сервера данных:
+
+    python catalog_delta.py <папка с programs.json, drivers.json, news.json> [порт]
+"""
+import bisect
+import hashlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DELTA_IM = "catalog-patch"
+REVISION_HEADER = "X-Catalog-Revision"
+STATUS_IM_USED = 226
+DEFAULT_PORT = 8765
+
+
+class CatalogPatchError(Exception):
+    """Патч не подходит к кэшу или результат не совпал по хэшу"""
+    pass
+
+
+def catalog_hash(items):
+    """Ревизия каталога: SHA-256 канонического JSON списка элементов"""
+    canonical = json.dumps([dict(item) for item in items], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _item_path(key_value):
+    """Путь элемента в формате JSON Pointer"""
+    return "/" + str(key_value).replace("~", "~0").replace("/", "~1")
+
+
+def _path_key(path):
+    if not path.startswith("/"):
+        raise CatalogPatchError(f"Некорректный путь в патче: {path}")
+    return path[1:].replace("~1", "/").replace("~0", "~")
+
+
+def _stable_keys(old_keys, new_keys):
+    """Ключи, которые остаются на месте: наибольшая подпоследовательность new_keys в порядке old_keys"""
+    old_positions = {item_key: position for position, item_key in enumerate(old_keys)}
+    sequence = [item_key for item_key in new_keys if item_key in old_positions]
+
+    tails = []
+    tail_indexes = []
+    previous = [None] * len(sequence)
+    for index, item_key in enumerate(sequence):
+        position = old_positions[item_key]
+        length = bisect.bisect_left(tails, position)
+        if length == len(tails):
+            tails.append(position)
+            tail_indexes.append(index)
+        else:
+            tails[length] = position
+            tail_indexes[length] = index
+        previous[index] = tail_indexes[length - 1] if length else None
+
+    stable = set()
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        stable.add(sequence[index])
+        index = previous[index]
+    return stable
+
+
+def make_catalog_patch(old_items, new_items, key, base_revision=None, revision=None):
+    """Построить патч из old_items в new_items, элементы адресуются по ключу
+
+    Новые и переставленные элементы идут с конца каталога: к моменту вставки
+    элемент из "before" уже стоит на своем месте. По умолчанию ревизией
+    считается хэш каталога.
+    """
+    old_by_key = {str(item.get(key)): item for item in old_items}
+    new_keys = [str(item.get(key)) for item in new_items]
+    new_key_set = set(new_keys)
+
+    ops = [{"op": "remove", "path": _item_path(item_key)} for item_key in old_by_key if item_key not in new_key_set]
+
+    for item_key, item in zip(new_keys, new_items):
+        if item_key in old_by_key and dict(old_by_key[item_key]) != dict(item):
+            ops.append({"op": "replace", "path": _item_path(item_key), "value": item})
+
+    stable = _stable_keys([item_key for item_key in old_by_key if item_key in new_key_set], new_keys)
+    for index in range(len(new_items) - 1, -1, -1):
+        item_key = new_keys[index]
+        before = new_keys[index + 1] if index + 1 < len(new_keys) else None
+        if item_key not in old_by_key:
+            ops.append({"op": "add", "path": _item_path(item_key), "value": new_items[index], "before": before})
+        elif item_key not in stable:
+            ops.append({"op": "move", "path": _item_path(item_key), "before": before})
+
+    new_hash = catalog_hash(new_items)
+    return {
+        "base": base_revision or catalog_hash(old_items),
+        "revision": revision or new_hash,
+        "sha256": new_hash,
+        "ops": ops
+    }
+
+
+def apply_catalog_patch(items, patch, key, base_revision=None):
+    """Применить патч к каталогу и проверить хэш результата
+
+    Замена сохраняет позицию элемента; add и move ставят элемент перед
+    "before" (без него - в конец).
+    """
+    if base_revision is not None and patch.get("base") != base_revision:
+        raise CatalogPatchError("Патч построен для другой ревизии каталога")
+
+    result = {str(item.get(key)): dict(item) for item in items}
+    order = list(result)
+
+    def place(item_key, before):
+        if before is None:
+            order.append(item_key)
+        elif before in result and before != item_key:
+            order.insert(order.index(before), item_key)
+        else:
+            raise CatalogPatchError(f"Элемент для вставки не найден: {before}")
+
+    for operation in patch.get("ops", []):
+        op = operation.get("op")
+        item_key = _path_key(operation.get("path", ""))
+
+        if op == "remove":
+            if item_key not in result:
+                raise CatalogPatchError(f"Удаляемый элемент не найден: {item_key}")
+            del result[item_key]
+            order.remove(item_key)
+        elif op == "replace":
+            if item_key not in result:
+                raise CatalogPatchError(f"Заменяемый элемент не найден: {item_key}")
+            result[item_key] = operation["value"]
+        elif op == "add":
+            if item_key in result:
+                raise CatalogPatchError(f"Добавляемый элемент уже есть: {item_key}")
+            place(item_key, operation.get("before"))
+            result[item_key] = operation["value"]
+        elif op == "move":
+            if item_key not in result:
+                raise CatalogPatchError(f"Перемещаемый элемент не найден: {item_key}")
+            order.remove(item_key)
+            place(item_key, operation.get("before"))
+        else:
+            raise CatalogPatchError(f"Неизвестная операция патча: {op}")
+
+    patched = [result[item_key] for item_key in order]
+    if catalog_hash(patched) != patch.get("sha256"):
+        raise CatalogPatchError("Хэш каталога после патча не совпал")
+
+    return patched
+
+
+class CatalogDeltaHandler(BaseHTTPRequestHandler):
+    """Отдача каталогов из папки с поддержкой патчей от известных ревизий"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        file_name = os.path.basename(self.path.split("?")[0])
+        data_type = file_name[:-len(".json")] if file_name.endswith(".json") else None
+
+        current = self.server.load_catalog(data_type) if data_type else None
+        if current is None:
+            self._send(404, b"")
+            return
+
+        items, revision = current
+        etag = f'"{revision}"'
+        client_revision = self.headers.get(REVISION_HEADER)
+        wants_patch = DELTA_IM in (self.headers.get("A-IM") or "")
+
+        if self.headers.get("If-None-Match") == etag or client_revision == revision:
+            self._send(304, b"", {"ETag": etag})
+            return
+
+        base_items = self.server.history.get(data_type, {}).get(client_revision)
+        if wants_patch and base_items is not None:
+            key = self.server.keys.get(data_type, "name")
+            body = json.dumps(make_catalog_patch(base_items, items, key), ensure_ascii=False).encode("utf-8")
+            self._send(STATUS_IM_USED, body, {"ETag": etag, "IM": DELTA_IM, "Content-Type": "application/json"})
+            return
+
+        body = json.dumps({data_type: items}, ensure_ascii=False).encode("utf-8")
+        self._send(200, body, {"ETag": etag, REVISION_HEADER: revision, "Content-Type": "application/json"})
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CatalogDeltaServer(ThreadingHTTPServer):
+    """Локальная замена сервера данных: помнит все отданные ревизии каталогов"""
+
+    def __init__(self, directory, port=DEFAULT_PORT, keys=None):
+        super().__init__(("127.0.0.1", port), CatalogDeltaHandler)
+        self.directory = directory
+        self.keys = keys or {"programs": "name", "drivers": "name", "news": "id"}
+        self.history = {}
+        self._mtimes = {}
+        self._current = {}
+        self._lock = threading.Lock()
+
+    def load_catalog(self, data_type):
+        """Текущий каталог из папки (перечитывается при изменении файла)"""
+        path = os.path.join(self.directory, f"{data_type}.json")
+        if not os.path.exists(path):
+            return None
+
+        with self._lock:
+            mtime = os.path.getmtime(path)
+            if self._mtimes.get(data_type) != mtime:
+                with open(path, "r", encoding="utf-8") as f:
+                    items = json.load(f).get(data_type, [])
+                revision = catalog_hash(items)
+                self.history.setdefault(data_type, {})[revision] = items
+                self._current[data_type] = (items, revision)
+                self._mtimes[data_type] = mtime
+            return self._current[data_type]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    server = CatalogDeltaServer(sys.argv[1], port)
+    print(f"Сервер каталогов: http://127.0.0.1:{port}/ (UTILHELP_DATA_URL для клиента)")
+    server.serve_forever()
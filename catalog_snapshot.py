@@ -0,0 +1,287 @@
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from collections.abc import MutableMapping, Sequence
+
+
+SNAPSHOT_MAGIC = b"UHCS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+PENDING_SUFFIX = ".pending"
+
+# magic, версия, резерв, записей, полей, строк,
+# смещение/длина метаданных, смещение полей, записей, таблицы строк, данных строк
+HEADER = struct.Struct("<4sHHIIIIIIIII")
+
+# Ссылка на значение: (номер строки << 2) | тип
+VALUE_MISSING = 0
+VALUE_STRING = 1
+VALUE_JSON = 2
+VALUE_INT = 3
+VALUE_TYPE_BITS = 2
+VALUE_TYPE_MASK = (1 << VALUE_TYPE_BITS) - 1
+MAX_INLINE_INT = (1 << (32 - VALUE_TYPE_BITS)) - 1
+
+
+class SnapshotError(Exception):
+    """Файл снимка каталога поврежден или имеет другую версию"""
+    pass
+
+
+def _align(offset):
+    return (offset + 3) & ~3
+
+
+def write_snapshot(path, items, meta=None):
+    """Записать каталог в компактный снимок: заголовок, таблица строк и записи фиксированной длины"""
+    strings = []
+    string_ids = {}
+
+    def intern(value):
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = len(strings)
+            string_ids[value] = string_id
+            strings.append(value)
+        return string_id
+
+    fields = []
+    field_ids = {}
+    for item in items:
+        for key in item:
+            if key not in field_ids:
+                field_ids[key] = len(fields)
+                fields.append(key)
+
+    field_refs = [intern(key) for key in fields]
+
+    records = []
+    for item in items:
+        record = [VALUE_MISSING] * len(fields)
+        for key, value in item.items():
+            if isinstance(value, str):
+                record[field_ids[key]] = (intern(value) << VALUE_TYPE_BITS) | VALUE_STRING
+            elif type(value) is int and 0 <= value <= MAX_INLINE_INT:
+                record[field_ids[key]] = (value << VALUE_TYPE_BITS) | VALUE_INT
+            else:
+                encoded = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+                record[field_ids[key]] = (intern(encoded) << VALUE_TYPE_BITS) | VALUE_JSON
+        records.extend(record)
+
+    encoded_strings = [value.encode('utf-8') for value in strings]
+    string_offsets = [0]
+    for encoded in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+
+    meta_bytes = json.dumps(meta or {}, ensure_ascii=False).encode('utf-8')
+
+    meta_offset = HEADER.size
+    fields_offset = _align(meta_offset + len(meta_bytes))
+    records_offset = fields_offset + 4 * len(fields)
+    string_table_offset = records_offset + 4 * len(records)
+    string_data_offset = string_table_offset + 4 * len(string_offsets)
+
+    header = HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0,
+        len(items), len(fields), len(strings),
+        meta_offset, len(meta_bytes),
+        fields_offset, records_offset, string_table_offset, string_data_offset
+    )
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(b"\0" * (fields_offset - meta_offset - len(meta_bytes)))
+        f.write(struct.pack(f"<{len(fields)}I", *field_refs))
+        f.write(struct.pack(f"<{len(records)}I", *records))
+        f.write(struct.pack(f"<{len(string_offsets)}I", *string_offsets))
+        f.write(b"".join(encoded_strings))
+
+    try:
+        os.replace(temp_path, path)
+    except PermissionError:
+        # В Windows нельзя заменить файл, пока он отображен в память (снимок еще используется).
+        # Новый снимок подхватится при следующем открытии.
+        os.replace(temp_path, path + PENDING_SUFFIX)
+
+
+def remove_snapshot(path):
+    """Удалить снимок вместе с отложенной заменой"""
+    for snapshot_path in (path, path + PENDING_SUFFIX, path + ".tmp"):
+        try:
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+        except OSError:
+            pass
+
+
+def snapshot_exists(path):
+    return os.path.exists(path) or os.path.exists(path + PENDING_SUFFIX)
+
+
+def open_snapshot(path, use_mmap=True):
+    """Открыть снимок каталога, при наличии отложенной замены сначала применить ее"""
+    pending_path = path + PENDING_SUFFIX
+    if os.path.exists(pending_path):
+        try:
+            os.replace(pending_path, path)
+        except OSError:
+            path = pending_path
+
+    with open(path, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+
+    return CatalogSnapshot(buffer)
+
+
+class CatalogSnapshot(Sequence):
+    """Каталог из снимка: записи декодируются при первом обращении"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+        if len(buffer) < HEADER.size:
+            raise SnapshotError("Снимок каталога слишком короткий")
+
+        (magic, version, _, self.record_count, self.field_count, self.string_count,
+         meta_offset, meta_length, fields_offset, self.records_offset,
+         self.string_table_offset, self.string_data_offset) = HEADER.unpack_from(buffer, 0)
+
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Неизвестный формат снимка каталога")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Неподдерживаемая версия снимка каталога: {version}")
+
+        self._offsets = self._read_string_offsets()
+        expected_size = self.string_data_offset + self._offsets[self.string_count]
+        if len(buffer) < expected_size:
+            raise SnapshotError("Снимок каталога поврежден")
+
+        self.meta = json.loads(bytes(buffer[meta_offset:meta_offset + meta_length]).decode('utf-8'))
+
+        field_refs = struct.unpack_from(f"<{self.field_count}I", buffer, fields_offset)
+        # Повторяющиеся значения (категории, статусы) разделяют один объект строки
+        self._strings = [None] * self.string_count
+        self.fields = [self.string(ref) for ref in field_refs]
+
+        self._record_struct = struct.Struct(f"<{self.field_count}I")
+        self._records = [None] * self.record_count
+        # Записи могут читаться из фоновых потоков (поиск, сканирование)
+        self._decode_lock = threading.Lock()
+
+    def _read_string_offsets(self):
+        """Таблица смещений строк без копирования (на little-endian системах)"""
+        start = self.string_table_offset
+        end = start + 4 * (self.string_count + 1)
+        if len(self.buffer) < end:
+            raise SnapshotError("Снимок каталога поврежден")
+
+        if sys.byteorder == 'little':
+            return memoryview(self.buffer)[start:end].cast('I')
+
+        offsets = array.array('I', bytes(self.buffer[start:end]))
+        offsets.byteswap()
+        return offsets
+
+    def string(self, string_id):
+        """Декодировать строку из таблицы строк"""
+        value = self._strings[string_id]
+        if value is None:
+            offset = self.string_data_offset
+            value = str(self.buffer[offset + self._offsets[string_id]:offset + self._offsets[string_id + 1]], 'utf-8')
+            self._strings[string_id] = value
+        return value
+
+    def decode_record(self, index):
+        """Прочитать запись фиксированной длины в словарь"""
+        refs = self._record_struct.unpack_from(self.buffer, self.records_offset + index * self._record_struct.size)
+
+        buffer = self.buffer
+        offsets = self._offsets
+        strings = self._strings
+        base = self.string_data_offset
+
+        values = {}
+        for field, ref in zip(self.fields, refs):
+            value_type = ref & VALUE_TYPE_MASK
+            if value_type == VALUE_MISSING:
+                continue
+
+            value = ref >> VALUE_TYPE_BITS
+            if value_type != VALUE_INT:
+                text = strings[value]
+                if text is None:
+                    text = str(buffer[base + offsets[value]:base + offsets[value + 1]], 'utf-8')
+                    strings[value] = text
+                value = json.loads(text) if value_type == VALUE_JSON else text
+
+            values[field] = value
+        return values
+
+    def __len__(self):
+        return self.record_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.record_count))]
+
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError("Индекс записи вне снимка каталога")
+
+        record = self._records[index]
+        if record is None:
+            with self._decode_lock:
+                record = self._records[index]
+                if record is None:
+                    record = SnapshotRecord(self, index)
+                    self._records[index] = record
+        return record
+
+
+class SnapshotRecord(MutableMapping):
+    """Запись каталога, которая читает свои поля из снимка только при первом доступе"""
+    __slots__ = ('_snapshot', '_index', '_values')
+
+    def __init__(self, snapshot, index):
+        self._snapshot = snapshot
+        self._index = index
+        self._values = None
+
+    def _decoded(self):
+        values = self._values
+        if values is None:
+            # Ссылка на снимок остается: другой поток может декодировать запись одновременно
+            with self._snapshot._decode_lock:
+                values = self._values
+                if values is None:
+                    values = self._snapshot.decode_record(self._index)
+                    self._values = values
+        return values
+
+    def __getitem__(self, key):
+        return self._decoded()[key]
+
+    def __setitem__(self, key, value):
+        self._decoded()[key] = value
+
+    def __delitem__(self, key):
+        del self._decoded()[key]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def __len__(self):
+        return len(self._decoded())
+
+    def __repr__(self):
+        return f"SnapshotRecord({self._decoded()!r})"
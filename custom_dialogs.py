@@ -1,7 +1,8 @@
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QPushButton, QWidget, QGraphicsOpacityEffect
-from PyQt6.QtGui import QPixmap, QIcon
+from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer, QSize
 from resource_path import get_icon_path
+from image_helper import load_icon_file
 from scroll_helper import configure_scroll_area
 
 
@@ -134,7 +135,7 @@ class CustomMessageDialog(QDialog):
             try:
                 full_icon_path = get_icon_path(icon_path)
                 if full_icon_path:
-                    pixmap = QPixmap(full_icon_path)
+                    pixmap = load_icon_file(full_icon_path)
                     if not pixmap.isNull():
                         scaled_pixmap = pixmap.scaled(48, 48, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                         icon_label.setPixmap(scaled_pixmap)
@@ -0,0 +1,100 @@
+import json
+import os
+import time
+
+
+JOURNAL_SUFFIX = ".journal.json"
+JOURNAL_VERSION = 1
+
+
+class DownloadJournal:
+    """Журнал недокачанного файла для продолжения загрузки через HTTP Range"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.journal_path = file_path + JOURNAL_SUFFIX
+        self.url = None
+        self.etag = None
+        self.last_modified = None
+        self.total_size = 0
+        self.segments = []
+        self.last_saved = 0
+
+    def load(self):
+        """Загрузить журнал с диска, возвращает True если журнал найден и валиден"""
+        try:
+            if not os.path.exists(self.journal_path) or not os.path.exists(self.file_path):
+                return False
+
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if data.get('version') != JOURNAL_VERSION:
+                return False
+
+            self.url = data.get('url')
+            self.etag = data.get('etag')
+            self.last_modified = data.get('last_modified')
+            self.total_size = int(data.get('total_size') or 0)
+            self.segments = [
+                {"start": int(s["start"]), "end": int(s["end"]), "done": int(s["done"])}
+                for s in data.get('segments', [])
+            ]
+
+            if os.path.getsize(self.file_path) != self.total_size:
+                return False
+
+            return bool(self.segments)
+
+        except Exception as e:
+            print(f"Ошибка чтения журнала загрузки: {e}")
+            return False
+
+    def save(self):
+        """Атомарно сохранить журнал рядом с файлом"""
+        data = {
+            "version": JOURNAL_VERSION,
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "total_size": self.total_size,
+            "segments": self.segments
+        }
+
+        try:
+            temp_path = self.journal_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.journal_path)
+            self.last_saved = time.time()
+        except Exception as e:
+            print(f"Ошибка сохранения журнала загрузки: {e}")
+
+    def remove(self):
+        """Удалить журнал после завершения загрузки"""
+        for path in (self.journal_path, self.journal_path + ".tmp"):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except Exception:
+                pass
+
+    def matches(self, url, total_size, etag, last_modified):
+        """Проверка, что журнал относится к той же версии файла на сервере"""
+        if self.url != url or self.total_size != total_size:
+            return False
+
+        if self.etag and etag:
+            return self.etag == etag
+
+        if self.last_modified and last_modified:
+            return self.last_modified == last_modified
+
+        return not (self.etag or etag or self.last_modified or last_modified)
+
+    def completed_bytes(self):
+        """Количество уже скачанных байт"""
+        return sum(segment["done"] for segment in self.segments)
+
+    def is_complete(self):
+        return all(s["done"] >= s["end"] - s["start"] + 1 for s in self.segments)
@@ -1,7 +1,6 @@
 import os
 import subprocess
 import tempfile
-import urllib.request
 from urllib.parse import urlparse
 import shutil
 import time
@@ -12,6 +11,9 @@ from PyQt6.QtCore import QThread, pyqtSignal, QTimer, Qt
 from PyQt6.QtGui import QPixmap, QPainter, QBrush, QColor
 from temp_manager import get_temp_manager
 from notification_manager import get_notification_manager
+from segmented_downloader import SegmentedDownloader, DownloadCancelled
+from download_journal import DownloadJournal
+from download_scheduler import PRIORITY_USER
 
 
 class CustomProgressBar(QWidget):
@@ -236,6 +238,8 @@ class DownloadThread(QThread):
         super().__init__()
         self.url = url
         self.filename = filename
+        self.cancelled = False
+        self.downloader = None
         
         from temp_manager import get_temp_manager
         temp_manager = get_temp_manager()
@@ -266,8 +270,6 @@ class DownloadThread(QThread):
         self.update_interval = 0.5  
         
         try:
-            import ssl
-            
             if not self.file_path:
                 self.download_error.emit("Ошибка: не удалось создать путь для файла")
                 return
@@ -287,57 +289,18 @@ class DownloadThread(QThread):
             self.start_time = time.time()
             self.last_update_time = self.start_time
             
-            def progress_hook(block_num, block_size, total_size):
-                if self.cancelled:
-                    return
-                
-                current_time = time.time()
-                downloaded = block_num * block_size
-                
-                if total_size > 0:
-                    percent = min(int((downloaded / total_size) * 100), 100)
-                    
-                    if current_time - self.last_update_time >= self.update_interval:
-                        time_diff = current_time - self.last_update_time
-                        bytes_diff = downloaded - self.last_downloaded
-                        
-                        if time_diff > 0 and bytes_diff > 0:
-                            current_speed = bytes_diff / time_diff
-                            
-                            self.speed_samples.append(current_speed)
-                            if len(self.speed_samples) > 5:
-                                self.speed_samples.pop(0)
-                            
-                            avg_speed = sum(self.speed_samples) / len(self.speed_samples)
-                        else:
-                            avg_speed = 0
-                        
-                        speed = self.format_speed(avg_speed)
-                        size = self.format_size(total_size)
-                        
-                        self.last_update_time = current_time
-                        self.last_downloaded = downloaded
-                        
-                        self.progress_updated.emit(percent, speed, size)
-            
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            https_handler = urllib.request.HTTPSHandler(context=ssl_context)
-            opener = urllib.request.build_opener(https_handler)
-            
-            opener.addheaders = [('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')]
-            
-            urllib.request.install_opener(opener)
+            self.downloader = SegmentedDownloader(self.url, self.file_path, progress_callback=self.report_progress)
             
             try:
-                urllib.request.urlretrieve(self.url, self.file_path, progress_hook)
+                self.downloader.download()
                 
                 if not os.path.exists(self.file_path):
                     self.download_error.emit("Файл не был создан после скачивания")
                     return
                     
+            except DownloadCancelled:
+                self.remove_partial_file()
+                return
             except Exception as download_error:
                 error_details = []
                 error_details.append(f"Ошибка: {str(download_error)}")
@@ -368,15 +331,69 @@ class DownloadThread(QThread):
             error_msg = f"Общая ошибка: {str(e)}\nПуть: {getattr(self, 'file_path', 'не определен')}"
             self.download_error.emit(error_msg)
     
-    def cancel(self):
-        """Отмена скачивания"""
-        self.cancelled = True
+    def report_progress(self, downloaded, total_size):
+        """Обработка прогресса от всех сегментов загрузки"""
+        if self.cancelled:
+            return
+        
+        current_time = time.time()
+        
+        if self.downloader and self.last_downloaded < self.downloader.resumed_bytes:
+            self.last_downloaded = self.downloader.resumed_bytes
+        
+        if total_size > 0:
+            percent = min(int((downloaded / total_size) * 100), 100)
+            
+            if current_time - self.last_update_time >= self.update_interval:
+                time_diff = current_time - self.last_update_time
+                bytes_diff = downloaded - self.last_downloaded
+                
+                if time_diff > 0 and bytes_diff > 0:
+                    current_speed = bytes_diff / time_diff
+                    
+                    self.speed_samples.append(current_speed)
+                    if len(self.speed_samples) > 5:
+                        self.speed_samples.pop(0)
+                    
+                    avg_speed = sum(self.speed_samples) / len(self.speed_samples)
+                else:
+                    avg_speed = 0
+                
+                speed = self.format_speed(avg_speed)
+                size = self.format_size(total_size)
+                
+                self.last_update_time = current_time
+                self.last_downloaded = downloaded
+                
+                self.progress_updated.emit(percent, speed, size)
+    
+    def remove_partial_file(self):
+        """Удаление недокачанного файла, если его нельзя продолжить по журналу"""
+        if self.downloader and os.path.exists(self.downloader.journal.journal_path):
+            return
+        
         if os.path.exists(self.file_path):
             try:
                 os.remove(self.file_path)
             except:
                 pass
     
+    @staticmethod
+    def discard_partial_file(file_path):
+        """Удаление недокачанного файла вместе с журналом, когда загрузку отменили насовсем"""
+        DownloadJournal(file_path).remove()
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        except Exception as e:
+            print(f"Ошибка удаления недокачанного файла: {e}")
+    
+    def cancel(self):
+        """Отмена скачивания (недокачанный файл с журналом сохраняется для продолжения)"""
+        self.cancelled = True
+        if self.downloader:
+            self.downloader.cancel()
+    
     def format_speed(self, bytes_per_second):
         """Форматирование скорости скачивания"""
         if bytes_per_second < 1024:
@@ -398,6 +415,25 @@ class DownloadThread(QThread):
             return f"{size / (1024 * 1024 * 1024):.1f} GB"
 
 
+class SizeProbeThread(QThread):
+    """Узнать размер файла по Content-Length (HEAD), пока загрузка ждет в очереди"""
+    size_found = pyqtSignal(int)
+    
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+    
+    def run(self):
+        try:
+            from http_client import get_http_session, DEFAULT_TIMEOUT
+            response = get_http_session().head(self.url, allow_redirects=True, timeout=DEFAULT_TIMEOUT, verify=False)
+            size = int(response.headers.get('Content-Length') or 0)
+            if response.ok and size > 0:
+                self.size_found.emit(size)
+        except Exception as e:
+            print(f"Ошибка определения размера файла: {e}")
+
+
 class DownloadDialog(QDialog):
     """Диалог скачивания с прогресс баром"""
     def __init__(self, program_name, download_url, parent=None):
@@ -747,7 +783,8 @@ class DownloadDialogWithMetadata(DownloadDialog):
 class InstallationManager:
     """Менеджер установки программ и драйверов"""
     @staticmethod
-    def install_program(program_name, download_url, parent=None, icon_path=None, file_type="program"):
+    def install_program(program_name, download_url, parent=None, icon_path=None, file_type="program",
+                        priority=PRIORITY_USER, size_hint=None):
         if not download_url or not download_url.startswith('http'):
             CustomMessageBox.warning(parent, "Ошибка", 
                               "Некорректная ссылка для скачивания!")
@@ -763,7 +800,7 @@ class InstallationManager:
                 current = current.parent()
         
         if main_window:
-            main_window.add_download(program_name, download_url, icon_path, file_type)
+            main_window.add_download(program_name, download_url, icon_path, file_type, priority, size_hint)
         else:
             dialog = DownloadDialogWithMetadata(program_name, download_url, parent, icon_path, file_type)
             dialog.exec()
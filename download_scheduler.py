@@ -0,0 +1,219 @@
+import heapq
+import itertools
+import re
+from PyQt6.QtCore import QObject, pyqtSignal
+from settings_manager import settings_manager
+
+
+PRIORITY_USER = 0
+
+DEFAULT_MAX_ACTIVE = 3
+UNKNOWN_SIZE = float('inf')
+
+STATE_QUEUED = "queued"
+STATE_ACTIVE = "active"
+STATE_PAUSED = "paused"
+STATE_FINISHED = "finished"
+
+SIZE_UNITS = {
+    "b": 1, "б": 1,
+    "kb": 1024, "кб": 1024,
+    "mb": 1024 ** 2, "мб": 1024 ** 2,
+    "gb": 1024 ** 3, "гб": 1024 ** 3,
+}
+
+
+def catalog_size_hint(item):
+    """Размер файла из поля size элемента каталога: байты числом или строка вида "45 MB" / "1,2 ГБ"
+
+    Возвращает None, если размер не указан или не распознан.
+    """
+    size = item.get("size") if item else None
+    if isinstance(size, (int, float)) and not isinstance(size, bool):
+        return int(size) if size > 0 else None
+    if not isinstance(size, str):
+        return None
+
+    match = re.fullmatch(r"\s*([\d.,]+)\s*([a-zа-я]*)\s*", size.lower())
+    if not match:
+        return None
+    number, unit = match.groups()
+    if unit and unit not in SIZE_UNITS:
+        return None
+    try:
+        number = float(number.replace(",", "."))
+    except ValueError:
+        return None
+    size_bytes = int(number * SIZE_UNITS.get(unit, 1))
+    return size_bytes if size_bytes > 0 else None
+
+
+class DownloadScheduler(QObject):
+    """Глобальная очередь загрузок с ограничением числа одновременных скачиваний
+
+    Задача загрузки - любой объект с методами start_download() и pause_download()
+    и атрибутом queue_state; по завершении задача вызывает job_finished().
+    """
+    queue_changed = pyqtSignal()
+
+    def __init__(self, max_active=None):
+        super().__init__()
+        if max_active is None:
+            max_active = settings_manager.get_setting("max_active_downloads", DEFAULT_MAX_ACTIVE)
+        self.max_active = max(1, int(max_active))
+        settings_manager.add_change_listener(self.on_setting_changed)
+
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._front_counter = itertools.count(-1, -1)
+        self.active = []
+        self.paused = []
+
+    def _push(self, job, priority, size_hint, sequence):
+        entry = [priority, size_hint, sequence, job, True]
+        self._entries[id(job)] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _discard_entry(self, job):
+        entry = self._entries.pop(id(job), None)
+        if entry:
+            entry[4] = False
+        return entry
+
+    def enqueue(self, job, priority=PRIORITY_USER, size_hint=None):
+        """Поставить загрузку в очередь: сначала с меньшим priority, при равном - меньшие по размеру"""
+        job.queue_priority = priority
+        job.queue_size_hint = size_hint if size_hint else UNKNOWN_SIZE
+        job.queue_state = STATE_QUEUED
+
+        self._push(job, priority, job.queue_size_hint, next(self._counter))
+        self._pump()
+
+    def queued_jobs(self):
+        """Задачи в очереди в порядке запуска"""
+        return [entry[3] for entry in sorted(e for e in self._heap if e[4])]
+
+    def queue_position(self, job):
+        """Позиция задачи в очереди (с 1) или 0 если она не в очереди"""
+        jobs = self.queued_jobs()
+        return jobs.index(job) + 1 if job in jobs else 0
+
+    def update_size_hint(self, job, size_hint):
+        """Уточнить размер ожидающей задачи, если он был неизвестен (например, по Content-Length)"""
+        entry = self._entries.get(id(job))
+        if not entry or not size_hint or entry[1] != UNKNOWN_SIZE:
+            return
+
+        job.queue_size_hint = size_hint
+        self._discard_entry(job)
+        self._push(job, entry[0], size_hint, entry[2])
+        self.queue_changed.emit()
+
+    def move_to_front(self, job):
+        """Поднять задачу в начало очереди своего приоритета"""
+        entry = self._discard_entry(job)
+        if not entry:
+            return
+        self._push(job, entry[0], 0, next(self._front_counter))
+        self.queue_changed.emit()
+
+    def move(self, job, offset):
+        """Сдвинуть задачу в очереди на offset позиций (отрицательное - вперёд)"""
+        jobs = self.queued_jobs()
+        if job not in jobs:
+            return
+
+        new_index = max(0, min(len(jobs) - 1, jobs.index(job) + offset))
+        jobs.remove(job)
+        jobs.insert(new_index, job)
+
+        for queued in jobs:
+            self._discard_entry(queued)
+        self._heap = [e for e in self._heap if e[4]]
+        heapq.heapify(self._heap)
+
+        # После ручной перестановки порядок задаётся явно, приоритеты сохраняются
+        for queued in jobs:
+            self._push(queued, queued.queue_priority, 0, next(self._counter))
+        self.queue_changed.emit()
+
+    def pause(self, job):
+        """Приостановить задачу (активную или ожидающую)"""
+        if job.queue_state == STATE_ACTIVE:
+            job.pause_download()
+            if job in self.active:
+                self.active.remove(job)
+        elif job.queue_state == STATE_QUEUED:
+            self._discard_entry(job)
+        else:
+            return
+
+        job.queue_state = STATE_PAUSED
+        self.paused.append(job)
+        self._pump()
+
+    def resume(self, job):
+        """Вернуть приостановленную задачу в начало очереди своего приоритета"""
+        if job.queue_state != STATE_PAUSED:
+            return
+
+        if job in self.paused:
+            self.paused.remove(job)
+        job.queue_state = STATE_QUEUED
+        self._push(job, job.queue_priority, 0, next(self._front_counter))
+        self._pump()
+
+    def remove(self, job):
+        """Убрать задачу из планировщика (отмена)"""
+        self._discard_entry(job)
+        if job in self.active:
+            self.active.remove(job)
+        if job in self.paused:
+            self.paused.remove(job)
+        job.queue_state = STATE_FINISHED
+        self._pump()
+
+    def job_finished(self, job):
+        """Задача завершилась (успешно или с ошибкой) - освободить слот"""
+        self.remove(job)
+
+    def set_max_active(self, max_active):
+        """Изменить лимит одновременных загрузок"""
+        self.max_active = max(1, int(max_active))
+        self._pump()
+
+    def on_setting_changed(self, key, value):
+        if key == "max_active_downloads":
+            self.set_max_active(value or DEFAULT_MAX_ACTIVE)
+
+    def _pump(self):
+        """Запустить ожидающие задачи, пока есть свободные слоты"""
+        while len(self.active) < self.max_active and self._heap:
+            entry = heapq.heappop(self._heap)
+            if not entry[4]:
+                continue
+
+            job = entry[3]
+            self._entries.pop(id(job), None)
+            job.queue_state = STATE_ACTIVE
+            self.active.append(job)
+
+            try:
+                job.start_download()
+            except Exception as e:
+                print(f"Ошибка запуска загрузки из очереди: {e}")
+                self.active.remove(job)
+                job.queue_state = STATE_FINISHED
+
+        self.queue_changed.emit()
+
+
+_download_scheduler = None
+
+def get_download_scheduler():
+    """Получить глобальный экземпляр планировщика загрузок"""
+    global _download_scheduler
+    if _download_scheduler is None:
+        _download_scheduler = DownloadScheduler()
+    return _download_scheduler
@@ -9,6 +9,8 @@ import ctypes
 import sys
 from downloads_manager import get_downloads_manager
 from scroll_helper import configure_scroll_area
+from image_helper import load_icon_file
+from styles import install_style_sheet, set_style_class
 
 
 def run_file_as_admin(file_path):
@@ -142,6 +144,8 @@ class DownloadsTab(QWidget):
         self.downloads_grid = QGridLayout(self.downloads_content)
         self.downloads_grid.setContentsMargins(20, 10, 20, 10)
         self.downloads_grid.setSpacing(20)
+        # Стили карточек - классы из общей таблицы, а не QSS у каждого виджета
+        install_style_sheet(self.downloads_content)
         
         self.scroll_area.setWidget(self.downloads_content)
         self.layout.addWidget(self.scroll_area)
@@ -195,7 +199,7 @@ class DownloadsTab(QWidget):
             from resource_path import get_icon_path
             books_icon_path = get_icon_path("books.png")
             if books_icon_path:
-                books_pixmap = QPixmap(books_icon_path)
+                books_pixmap = load_icon_file(books_icon_path)
                 if not books_pixmap.isNull():
                     scaled_books = books_pixmap.scaled(96, 96, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                     empty_icon.setPixmap(scaled_books)
@@ -266,20 +270,7 @@ class DownloadsTab(QWidget):
         """Создание карточки загрузки"""
         card = QFrame()
         card.setFixedSize(300, 260)
-        card.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #2d2d2d, stop:1 #252525);
-                border: 2px solid #404040;
-                border-radius: 18px;
-                padding: 0px;
-            }
-            QFrame:hover {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #353535, stop:1 #2d2d2d);
-                border: 2px solid #666666;
-            }
-        """)
+        set_style_class(card, "download-card")
         
         card_layout = QVBoxLayout(card)
         card_layout.setContentsMargins(20, 10, 20, 15)
@@ -287,24 +278,14 @@ class DownloadsTab(QWidget):
         
         icon_container = QFrame()
         icon_container.setFixedSize(100, 100)
-        icon_container.setStyleSheet("""
-            QFrame {
-                background: transparent;
-                border: none;
-            }
-        """)
+        set_style_class(icon_container, "transparent")
         
         icon_layout = QVBoxLayout(icon_container)
         icon_layout.setContentsMargins(0, 0, 0, 0)
         
         icon_label = QLabel()
         icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        icon_label.setStyleSheet("""
-            QLabel {
-                background: transparent;
-                border: none;
-            }
-        """)
+        set_style_class(icon_label, "transparent")
         
         if download.get("icon_path") and os.path.exists(download["icon_path"]):
             pixmap = QPixmap(download["icon_path"])
@@ -319,58 +300,30 @@ class DownloadsTab(QWidget):
                 from resource_path import get_icon_path
                 box_icon_path = get_icon_path("fallbackbox.png")
                 if box_icon_path:
-                    box_pixmap = QPixmap(box_icon_path)
+                    box_pixmap = load_icon_file(box_icon_path)
                     if not box_pixmap.isNull():
                         scaled_box = box_pixmap.scaled(64, 64, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                         icon_label.setPixmap(scaled_box)
                     else:
                         icon_label.setText("📦")
-                        icon_label.setStyleSheet("""
-                            QLabel {
-                                color: #cccccc;
-                                font-size: 52px;
-                                background: transparent;
-                                border: none;
-                            }
-                        """)
+                        set_style_class(icon_label, "download-glyph")
                 else:
                     icon_label.setText("📦")
-                    icon_label.setStyleSheet("""
-                        QLabel {
-                            color: #cccccc;
-                            font-size: 52px;
-                            background: transparent;
-                            border: none;
-                        }
-                    """)
+                    set_style_class(icon_label, "download-glyph")
         else:
             from resource_path import get_icon_path
             box_icon_path = get_icon_path("fallbackbox.png")
             if box_icon_path:
-                box_pixmap = QPixmap(box_icon_path)
+                box_pixmap = load_icon_file(box_icon_path)
                 if not box_pixmap.isNull():
                     scaled_box = box_pixmap.scaled(64, 64, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                     icon_label.setPixmap(scaled_box)
                 else:
                     icon_label.setText("📦")
-                    icon_label.setStyleSheet("""
-                        QLabel {
-                            color: #cccccc;
-                            font-size: 52px;
-                            background: transparent;
-                            border: none;
-                        }
-                    """)
+                    set_style_class(icon_label, "download-glyph")
             else:
                 icon_label.setText("📦")
-                icon_label.setStyleSheet("""
-                    QLabel {
-                        color: #cccccc;
-                        font-size: 52px;
-                        background: transparent;
-                        border: none;
-                    }
-                """)
+                set_style_class(icon_label, "download-glyph")
         
         icon_layout.addWidget(icon_label)
         
@@ -386,26 +339,11 @@ class DownloadsTab(QWidget):
         name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         name_label.setWordWrap(True)
         name_label.setFixedHeight(35)
-        name_label.setStyleSheet("""
-            QLabel {
-                color: #ffffff;
-                font-size: 13px;
-                font-weight: bold;
-                background: transparent;
-                border: none;
-                padding: 0px 5px;
-            }
-        """)
+        set_style_class(name_label, "download-name")
         card_layout.addWidget(name_label)
         
         info_container = QFrame()
-        info_container.setStyleSheet("""
-            QFrame {
-                background-color: rgba(58, 58, 58, 0.5);
-                border-radius: 8px;
-                border: 1px solid #555555;
-            }
-        """)
+        set_style_class(info_container, "download-info")
         info_layout = QHBoxLayout(info_container)
         info_layout.setContentsMargins(0, 5, 10, 5)
         info_layout.setSpacing(8)
@@ -418,30 +356,22 @@ class DownloadsTab(QWidget):
         filesize_icon_path = get_icon_path("filesize.png")
         if filesize_icon_path:
             filesize_icon = QLabel()
-            filesize_pixmap = QPixmap(filesize_icon_path)
+            filesize_pixmap = load_icon_file(filesize_icon_path)
             if not filesize_pixmap.isNull():
                 scaled_filesize = filesize_pixmap.scaled(16, 16, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                 filesize_icon.setPixmap(scaled_filesize)
-                filesize_icon.setStyleSheet("background: transparent; border: none;")
+                set_style_class(filesize_icon, "transparent")
                 filesize_icon.setAlignment(Qt.AlignmentFlag.AlignVCenter)
                 size_container.addWidget(filesize_icon)
         
         size_label = QLabel(download['file_size'])
-        size_label.setStyleSheet("""
-            QLabel {
-                color: #cccccc;
-                font-size: 11px;
-                font-weight: bold;
-                background: transparent;
-                border: none;
-            }
-        """)
+        set_style_class(size_label, "download-meta")
         size_label.setAlignment(Qt.AlignmentFlag.AlignVCenter)
         size_container.addWidget(size_label)
         
         size_widget = QWidget()
         size_widget.setLayout(size_container)
-        size_widget.setStyleSheet("background: transparent; border: none;")
+        set_style_class(size_widget, "transparent")
         info_layout.addWidget(size_widget)
         
         info_layout.addStretch()
@@ -454,31 +384,23 @@ class DownloadsTab(QWidget):
         calendar_icon_path = get_icon_path("calendar.png")
         if calendar_icon_path:
             calendar_icon = QLabel()
-            calendar_pixmap = QPixmap(calendar_icon_path)
+            calendar_pixmap = load_icon_file(calendar_icon_path)
             if not calendar_pixmap.isNull():
                 scaled_calendar = calendar_pixmap.scaled(16, 16, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                 calendar_icon.setPixmap(scaled_calendar)
-                calendar_icon.setStyleSheet("background: transparent; border: none;")
+                set_style_class(calendar_icon, "transparent")
                 calendar_icon.setAlignment(Qt.AlignmentFlag.AlignVCenter)
                 calendar_icon.setFixedSize(16, 16)
                 date_container.addWidget(calendar_icon)
         
         date_label = QLabel(download['download_date'].split()[0])
-        date_label.setStyleSheet("""
-            QLabel {
-                color: #cccccc;
-                font-size: 11px;
-                font-weight: bold;
-                background: transparent;
-                border: none;
-            }
-        """)
+        set_style_class(date_label, "download-meta")
         date_label.setAlignment(Qt.AlignmentFlag.AlignVCenter)
         date_container.addWidget(date_label)
         
         date_widget = QWidget()
         date_widget.setLayout(date_container)
-        date_widget.setStyleSheet("background: transparent; border: none;")
+        set_style_class(date_widget, "transparent")
         info_layout.addWidget(date_widget)
         
         card_layout.addWidget(info_container)
@@ -489,29 +411,7 @@ class DownloadsTab(QWidget):
         run_btn = QPushButton("▶ Запустить")
         run_btn.setFixedHeight(36)
         run_btn.clicked.connect(lambda: self.run_file(download))
-        run_btn.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #4CAF50, stop:1 #45a049);
-                color: white;
-                border: 1px solid #4CAF50;
-                padding: 8px 16px;
-                border-radius: 8px;
-                font-size: 13px;
-                font-weight: bold;
-                outline: none;
-                text-align: left;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #5CBF60, stop:1 #4CAF50);
-                border: 1px solid #5CBF60;
-            }
-            QPushButton:pressed {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #45a049, stop:1 #3d8b40);
-            }
-        """)
+        set_style_class(run_btn, "download-run")
         buttons_layout.addWidget(run_btn)
         
         delete_btn = QPushButton()
@@ -530,25 +430,7 @@ class DownloadsTab(QWidget):
         else:
             delete_btn.setText("🗑")
         
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(244, 67, 54, 0.1);
-                color: #f44336;
-                border: 1px solid rgba(244, 67, 54, 0.3);
-                border-radius: 16px;
-                font-size: 14px;
-                font-weight: bold;
-                outline: none;
-            }
-            QPushButton:hover {
-                background-color: rgba(244, 67, 54, 0.2);
-                border: 1px solid rgba(244, 67, 54, 0.5);
-            }
-            QPushButton:pressed {
-                background-color: rgba(244, 67, 54, 0.3);
-                border: 1px solid #f44336;
-            }
-        """)
+        set_style_class(delete_btn, "download-delete")
         buttons_layout.addWidget(delete_btn)
         
         card_layout.addLayout(buttons_layout)
@@ -1,12 +1,17 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QScrollArea, QPushButton, QHBoxLayout, QFrame, QGridLayout, QLineEdit, QDialog, QGraphicsOpacityEffect, QComboBox, QListWidget, QListWidgetItem
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QScrollArea, QPushButton, QHBoxLayout, QFrame, QLineEdit, QDialog, QGraphicsOpacityEffect, QComboBox, QListWidget, QListWidgetItem, QApplication
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, pyqtSignal
-from PyQt6.QtGui import QPixmap
 from scroll_helper import configure_scroll_area
 from download_manager import InstallationManager, CustomMessageBox
+from download_scheduler import PRIORITY_USER, catalog_size_hint
 from resource_path import get_db_path
 from gpu_detector import GPUDetector, CPUDetector
 from scroll_helper import configure_scroll_area
 from favorites_manager import FavoritesManager
+from search_index import SearchIndex
+from search_pipeline import SearchPipeline, sort_by_name
+from card_grid import VirtualCardGrid
+from image_helper import get_image_loader, SOURCE_PROGRAM
+from styles import install_style_sheet, set_style_class, set_style_state
 from system_scanner import CachedInstallationStatusManager, BackgroundScanner
 
 
@@ -540,10 +545,9 @@ class DriverInfoPanel(QWidget):
         self.title_label.setText(driver["name"])
         
         from image_helper import load_program_image
-        pixmap = load_program_image(driver["logo"])
+        pixmap = load_program_image(driver["logo"], (100, 100))
         if pixmap and not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            self.logo_label.setPixmap(scaled_pixmap)
+            self.logo_label.setPixmap(pixmap)
         else:
             self.logo_label.setText("🔧") 
         
@@ -599,15 +603,17 @@ class DriverInfoPanel(QWidget):
         else:
             download_url = driver.get("url", "")
             if download_url:
-                from resource_path import get_program_image_path
-                icon_path = get_program_image_path(driver.get("logo", ""))
+                from image_helper import get_program_image_file
+                icon_path = get_program_image_file(driver.get("logo", ""))
                 
                 InstallationManager.install_program(
                     driver["name"], 
                     download_url, 
                     self, 
                     icon_path, 
-                    "driver"
+                    "driver",
+                    PRIORITY_USER,
+                    catalog_size_hint(driver)
                 )
             else:
                 CustomMessageBox.warning(self, "Ошибка", 
@@ -668,6 +674,7 @@ class DriversTab(QWidget):
         
         self.all_drivers = []
         self.filtered_drivers = []
+        self.search_index = SearchIndex([])
         self.current_driver = None
         self.current_columns = 3  
         self.favorites_manager = FavoritesManager()
@@ -742,7 +749,7 @@ class DriversTab(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Поиск драйверов...")
-        self.search_input.textChanged.connect(self.filter_drivers)
+        self.search_input.textChanged.connect(self.schedule_filter)
         self.search_input.setFixedHeight(35)
         self.search_input.setStyleSheet("""
             QLineEdit {
@@ -839,12 +846,15 @@ class DriversTab(QWidget):
             }
         """)
         
-        self.drivers_content = QWidget()
-        self.drivers_grid = QGridLayout(self.drivers_content)
-        self.drivers_grid.setContentsMargins(55, 10, 45, 10)  
-        self.drivers_grid.setHorizontalSpacing(120)  
-        self.drivers_grid.setVerticalSpacing(50)     
-        self.drivers_grid.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.drivers_grid = VirtualCardGrid(
+            self.scroll_area, self.create_driver_card, self.bind_driver_card,
+            unbind_card=get_image_loader().cancel
+        )
+        # Стили карточек - классы из общей таблицы, а не QSS у каждого виджета
+        install_style_sheet(self.drivers_grid)
+        # Картинка по ссылке обновилась на сервере - перерисовываем видимые карточки
+        get_image_loader().image_changed.connect(lambda source, name: self.drivers_grid.refresh())
+        self.drivers_content = self.drivers_grid
         
         self.drivers_data = []
         
@@ -852,6 +862,11 @@ class DriversTab(QWidget):
         self.layout.addWidget(self.scroll_area)
         
         self.info_panel = DriverInfoPanel(self)
+        
+        self.search_pipeline = SearchPipeline(
+            self.match_drivers, self.rank_drivers, self.apply_search_results, name="Поиск драйверов"
+        )
+        QApplication.instance().aboutToQuit.connect(self.search_pipeline.shutdown)
 
     def set_data(self, drivers_data):
         """Установить данные драйверов из JSON"""
@@ -888,69 +903,42 @@ class DriversTab(QWidget):
         for category in sorted(categories_set):
             self.category_filter.addItem(category, category)
         
-        self.filtered_drivers = self.all_drivers.copy()
+        # Индекс строится по алфавиту: при равной оценке результаты идут по названию
+        self.search_index = SearchIndex(sort_by_name(self.all_drivers))
+        self.filtered_drivers = list(self.search_index.items)
+        # Результат поиска по прежним данным уже не нужен
+        self.search_pipeline.cancel()
         
         self.display_drivers()
 
     def display_drivers(self):
         """Отображение драйверов в виде сетки"""
-        for i in reversed(range(self.drivers_grid.count())):
-            child = self.drivers_grid.itemAt(i).widget()
-            if child:
-                child.setParent(None)
-        
         window_width = self.width()
         if window_width >= 1600:  
             columns = 4
         else:  
             columns = 3
         
-        sorted_drivers = sorted(self.filtered_drivers, key=lambda x: x.get('name', '').lower())
-        
-        row = 0
-        col = 0
-        for driver in sorted_drivers:
-            card = self.create_driver_card(driver)
-            self.drivers_grid.addWidget(card, row, col)
-            
-            col += 1
-            if col >= columns:  
-                col = 0
-                row += 1
+        self.drivers_grid.set_columns(columns)
+        self.drivers_grid.set_items(self.filtered_drivers)
 
-    def create_driver_card(self, driver):
-        """Создание карточки драйвера"""
+    def create_driver_card(self):
+        """Создание пустой карточки драйвера (заполняется в bind_driver_card)"""
         card = QFrame()
         card.setFixedSize(220, 250)  
+        card.driver = None
         
         def card_mouse_press(event):
             if event.button() == Qt.MouseButton.LeftButton:
                 child = card.childAt(event.pos())
                 if child and child.objectName() == "favorite_btn":
                     return
-                self.show_driver_info(driver)
+                if card.driver is not None:
+                    self.show_driver_info(card.driver)
         
         card.mousePressEvent = card_mouse_press
         
-        colors = {
-            'bg_secondary': '#252525',
-            'bg_button': '#2d2d2d', 
-            'border': '#404040',
-            'text_primary': '#ffffff'
-        }
-        
-        card.setStyleSheet(f"""
-            QFrame {{
-                background-color: {colors['bg_secondary']};
-                border: none;
-                border-radius: 15px;
-                padding: 0px;
-            }}
-            QFrame:hover {{
-                background-color: {colors['bg_button']};
-                border: 2px solid {colors['border']};
-            }}
-        """)
+        set_style_class(card, "card")
         
         card_layout = QVBoxLayout(card)
         card_layout.setContentsMargins(10, 10, 10, 10)
@@ -959,93 +947,49 @@ class DriversTab(QWidget):
         
         top_container = QWidget()
         top_container.setFixedHeight(30)
-        top_container.setStyleSheet("background: transparent;")
+        set_style_class(top_container, "transparent")
         top_layout = QHBoxLayout(top_container)
         top_layout.setContentsMargins(0, 0, 0, 0)
         
-        status = self.status_manager.get_driver_status(driver["name"])
-        if status["installed"]:
-            status_label = QLabel()
-            status_label.setFixedSize(24, 24)
-            status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # Загружаем иконку installed.png
-            from resource_path import get_icon_path
-            icon_path = get_icon_path("installed.png")
-            if icon_path:
-                from PyQt6.QtGui import QPixmap
-                pixmap = QPixmap(icon_path)
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(20, 20, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    status_label.setPixmap(scaled_pixmap)
-                else:
-                    status_label.setText("✓")
-            else:
-                status_label.setText("✓")
-            
-            status_label.setStyleSheet("""
-                QLabel {
-                    background-color: transparent;
-                    border: none;
-                    min-width: 24px;
-                    max-width: 24px;
-                    min-height: 24px;
-                    max-height: 24px;
-                }
-                QToolTip {
-                    background-color: #2d2d2d;
-                    color: #ffffff;
-                    border: 1px solid #555555;
-                    border-radius: 4px;
-                    padding: 8px;
-                    font-size: 12px;
-                }
-            """)
-            status_label.setToolTip(f"Установлен: {status['exact_name']}\nВерсия: {status['version']}")
-            top_layout.addWidget(status_label)
+        status_label = QLabel()
+        status_label.setFixedSize(24, 24)
+        status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        
+        # Загружаем иконку installed.png
+        from image_helper import load_icon_image
+        pixmap = load_icon_image("installed.png", (20, 20))
+        if pixmap:
+            status_label.setPixmap(pixmap)
+        else:
+            status_label.setText("✓")
+        
+        set_style_class(status_label, "card-status")
+        status_label.hide()
+        top_layout.addWidget(status_label)
         
         top_layout.addStretch()
         
         favorite_btn = QPushButton()
         favorite_btn.setFixedSize(28, 28)
         favorite_btn.setObjectName("favorite_btn")
-        is_favorite = self.favorites_manager.is_favorite(driver["name"], "drivers")
-        favorite_btn.setText("♥" if is_favorite else "♡")
-        favorite_btn.setStyleSheet(f"""
-            QPushButton {{
-                background: transparent;
-                border: none;
-                color: {'#ff4757' if is_favorite else '#666666'};
-                font-size: 22px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                color: #ff4757;
-            }}
-        """)
-        favorite_btn.clicked.connect(lambda: self.toggle_favorite(driver, favorite_btn))
+        set_style_class(favorite_btn, "card-favorite")
+        favorite_btn.clicked.connect(lambda: self.toggle_favorite(card.driver, favorite_btn))
         
         def favorite_mouse_press(event):
             event.accept()
-            self.toggle_favorite(driver, favorite_btn)
+            if card.driver is not None:
+                self.toggle_favorite(card.driver, favorite_btn)
         
         favorite_btn.mousePressEvent = favorite_mouse_press
         
         top_layout.addWidget(favorite_btn)
         card_layout.addWidget(top_container)
         
-        from image_helper import load_program_image
-        pixmap = load_program_image(driver["logo"])
-        if pixmap and not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            logo_label = QLabel()
-            logo_label.setPixmap(scaled_pixmap)
-        else:
-            logo_label = QLabel("🔧")  
+        logo_label = QLabel()
         
         logo_container = QWidget()
         logo_container.setFixedSize(200, 100)  
-        logo_container.setStyleSheet("background: transparent;")
+        set_style_class(logo_container, "transparent")
         logo_layout = QHBoxLayout(logo_container)
         logo_layout.setContentsMargins(0, 0, 0, 0)
         logo_layout.addStretch()
@@ -1054,16 +998,7 @@ class DriversTab(QWidget):
         
         logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         logo_label.setFixedSize(100, 100)
-        logo_label.setStyleSheet("""
-            QLabel {
-                color: #ffffff;
-                font-size: 48px;
-                font-family: 'Segoe UI Emoji', 'Apple Color Emoji', 'Noto Color Emoji', sans-serif;
-                background: transparent;
-                border: none;
-                qproperty-alignment: AlignCenter;
-            }
-        """)
+        set_style_class(logo_label, "card-logo")
         
         card_layout.addWidget(logo_container)
         
@@ -1071,105 +1006,94 @@ class DriversTab(QWidget):
         
         recommendation_area = QWidget()
         recommendation_area.setFixedHeight(45)
-        recommendation_area.setStyleSheet("background: transparent;")
+        set_style_class(recommendation_area, "transparent")
         recommendation_area_layout = QVBoxLayout(recommendation_area)
         recommendation_area_layout.setContentsMargins(0, 0, 0, 0)
         recommendation_area_layout.setSpacing(2)
         
-        show_cpu_recommendation = CPUDetector.should_show_cpu_recommendation(driver["name"], self.user_cpu_vendor)
-        show_gpu_recommendation = GPUDetector.should_show_recommendation(driver["name"], self.user_gpu_vendor)
-        
         recommendation_container = QWidget()
-        recommendation_container.setStyleSheet("background: transparent;")
+        set_style_class(recommendation_container, "transparent")
         recommendation_layout = QVBoxLayout(recommendation_container)  
         recommendation_layout.setContentsMargins(0, 0, 0, 0)
         recommendation_layout.setSpacing(2)
         
-        if show_cpu_recommendation or show_gpu_recommendation:
-            if show_cpu_recommendation:
-                cpu_container = QWidget()
-                cpu_container.setStyleSheet("background: transparent;")
-                cpu_layout = QHBoxLayout(cpu_container)
-                cpu_layout.setContentsMargins(0, 0, 0, 0)
-                cpu_layout.addStretch()
-                
-                cpu_label = QLabel("⭐ Для вашего CPU")
-                cpu_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                cpu_label.setWordWrap(False)
-                cpu_label.setFixedWidth(140)
-                cpu_label.setStyleSheet("""
-                    QLabel {
-                        color: #cccccc;
-                        font-size: 9px;
-                        font-weight: bold;
-                        background: rgba(128, 128, 128, 0.1);
-                        border: 1px solid #888888;
-                        border-radius: 4px;
-                        padding: 2px 6px;
-                        margin: 1px;
-                    }
-                """)
-                
-                cpu_layout.addWidget(cpu_label)
-                cpu_layout.addStretch()
-                recommendation_layout.addWidget(cpu_container)
+        recommendation_containers = []
+        for text in ("⭐ Для вашего CPU", "⭐ Для вашей GPU"):
+            container = QWidget()
+            set_style_class(container, "transparent")
+            container_layout = QHBoxLayout(container)
+            container_layout.setContentsMargins(0, 0, 0, 0)
+            container_layout.addStretch()
             
-            if show_gpu_recommendation:
-                gpu_container = QWidget()
-                gpu_container.setStyleSheet("background: transparent;")
-                gpu_layout = QHBoxLayout(gpu_container)
-                gpu_layout.setContentsMargins(0, 0, 0, 0)
-                gpu_layout.addStretch()
-                
-                gpu_label = QLabel("⭐ Для вашей GPU")
-                gpu_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                gpu_label.setWordWrap(False)
-                gpu_label.setFixedWidth(140)
-                gpu_label.setStyleSheet("""
-                    QLabel {
-                        color: #cccccc;
-                        font-size: 9px;
-                        font-weight: bold;
-                        background: rgba(128, 128, 128, 0.1);
-                        border: 1px solid #888888;
-                        border-radius: 4px;
-                        padding: 2px 6px;
-                        margin: 1px;
-                    }
-                """)
-                
-                gpu_layout.addWidget(gpu_label)
-                gpu_layout.addStretch()
-                recommendation_layout.addWidget(gpu_container)
+            label = QLabel(text)
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.setWordWrap(False)
+            label.setFixedWidth(140)
+            set_style_class(label, "card-recommendation")
             
-            recommendation_area_layout.addSpacing(10)
+            container_layout.addWidget(label)
+            container_layout.addStretch()
+            container.hide()
+            recommendation_layout.addWidget(container)
+            recommendation_containers.append(container)
         
         recommendation_area_layout.addWidget(recommendation_container)
         
         recommendation_area_layout.addStretch()
         card_layout.addWidget(recommendation_area)
         
-        name_label = QLabel(driver["name"])
+        name_label = QLabel()
         name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         name_label.setWordWrap(True)
         name_label.setFixedHeight(60)  
-        name_label.setStyleSheet(f"""
-            QLabel {{
-                color: {colors['text_primary']};
-                font-size: 15px;
-                font-weight: bold;
-                font-family: 'Segoe UI', Arial, sans-serif;
-                background: transparent;
-                border: none;
-                text-align: center;
-                line-height: 1.3;
-                padding: 5px;
-            }}
-        """)
+        set_style_class(name_label, "card-name")
         card_layout.addWidget(name_label)
         
+        card.status_label = status_label
+        card.favorite_btn = favorite_btn
+        card.logo_label = logo_label
+        card.cpu_recommendation, card.gpu_recommendation = recommendation_containers
+        card.name_label = name_label
+        
         return card
 
+    def bind_driver_card(self, card, driver):
+        """Заполнение карточки данными драйвера"""
+        card.driver = driver
+        
+        status = self.status_manager.get_driver_status(driver["name"])
+        if status["installed"]:
+            card.status_label.setToolTip(f"Установлен: {status['exact_name']}\nВерсия: {status['version']}")
+            card.status_label.show()
+        else:
+            card.status_label.hide()
+        
+        is_favorite = self.favorites_manager.is_favorite(driver["name"], "drivers")
+        self.update_favorite_button(card.favorite_btn, is_favorite)
+        
+        # Пока логотип читается в фоне, на карточке значок-заглушка
+        card.logo_label.setText("🔧")
+        get_image_loader().request(
+            card, SOURCE_PROGRAM, driver["logo"], (100, 100),
+            lambda pixmap, card=card: self.set_card_logo(card, pixmap),
+            self.drivers_grid.index_priority(card.grid_index)
+        )
+        
+        card.cpu_recommendation.setVisible(CPUDetector.should_show_cpu_recommendation(driver["name"], self.user_cpu_vendor))
+        card.gpu_recommendation.setVisible(GPUDetector.should_show_recommendation(driver["name"], self.user_gpu_vendor))
+        
+        card.name_label.setText(driver["name"])
+
+    def set_card_logo(self, card, pixmap):
+        """Показать загруженный логотип (без изображения остается значок-заглушка)"""
+        if pixmap:
+            card.logo_label.setPixmap(pixmap)
+
+    def update_favorite_button(self, button, is_favorite):
+        """Вид кнопки избранного"""
+        button.setText("♥" if is_favorite else "♡")
+        set_style_state(button, "favorite", is_favorite)
+
     def toggle_favorite(self, driver, button):
         """Переключить статус избранного для драйвера"""
         driver_name = driver["name"]
@@ -1177,38 +1101,10 @@ class DriversTab(QWidget):
         
         if is_favorite:
             self.favorites_manager.remove_from_favorites(driver_name, "drivers")
-            button.setText("♡")
-            button.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    color: #666666;
-                    font-size: 22px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    color: #ff4757;
-                }
-            """)
         else:
             self.favorites_manager.add_to_favorites(driver_name, "drivers")
-            button.setText("♥")
-            button.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    color: #ff4757;
-                    font-size: 22px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    color: #ff4757;
-                }
-            """)
         
-        self.update_favorites_tab()
-        
-        self.update_favorites_tab()
+        self.update_favorite_button(button, not is_favorite)
 
     def show_driver_info(self, driver):
         """Показать информационную панель драйвера"""
@@ -1219,29 +1115,55 @@ class DriversTab(QWidget):
             self.current_driver = driver
             self.info_panel.show_driver(driver)
 
-    def filter_drivers(self):
-        """Фильтрация драйверов по поисковому запросу и категории"""
-        search_text = self.search_input.text().lower()
+    def apply_catalog_diff(self, diff):
+        """Применить фоновое обновление каталога, сохранив поиск и выбранную категорию"""
+        added, removed, changed = len(diff["added"]), len(diff["removed"]), len(diff["changed"])
+        print(f"Drivers tab: обновление каталога (+{added} -{removed} ~{changed})")
+        
         selected_category = self.category_filter.currentData()
+        self.set_data(diff["items"])
         
-        self.filtered_drivers = []
-        for driver in self.all_drivers:
-            if selected_category == "favorites":
-                if not self.favorites_manager.is_favorite(driver["name"], "drivers"):
-                    continue
-            elif selected_category:
-                if selected_category not in driver.get("categories", []):
-                    continue
-            
-            if search_text:
-                if not (search_text in driver["name"].lower() or
-                        search_text in driver["description"].lower() or
-                        search_text in driver["category"].lower() or
-                        any(search_text in keyword for keyword in driver["keywords"])):
-                    continue
-            
-            self.filtered_drivers.append(driver)
+        if selected_category or self.search_input.text():
+            for index, item in enumerate(self.category_filter.items):
+                if item["data"] == selected_category:
+                    self.category_filter.setCurrentIndex(index)
+                    break
+            self.filter_drivers()
+
+    def search_request(self):
+        """Параметры поиска для фонового потока (виджеты читаются только здесь, в GUI потоке)"""
+        search_text = self.search_input.text()
+        selected_category = self.category_filter.currentData()
+        
+        favorites = None
+        if selected_category == "favorites":
+            favorites = list(self.favorites_manager.get_favorites("drivers"))
+            selected_category = None
         
+        return self.search_index, search_text, selected_category, favorites
+
+    def schedule_filter(self):
+        """Поиск по мере ввода: запускается после паузы в наборе"""
+        self.search_pipeline.submit(self.search_request())
+
+    def filter_drivers(self):
+        """Фильтрация драйверов по поисковому запросу и категории"""
+        self.search_pipeline.submit(self.search_request(), immediate=True)
+
+    @staticmethod
+    def match_drivers(request):
+        """Этап поиска с учетом опечаток (выполняется в фоновом потоке)"""
+        search_index, search_text, selected_category, favorites = request
+        return search_index.ranked_masks(search_text, selected_category, favorites)
+
+    @staticmethod
+    def rank_drivers(ranked, request):
+        """Этап упорядочивания: лучшие совпадения первыми (в фоновом потоке)"""
+        return request[0].select_ranked(ranked)
+
+    def apply_search_results(self, drivers):
+        """Показать результат последнего запроса"""
+        self.filtered_drivers = drivers
         self.display_drivers()
 
     
@@ -1299,7 +1221,7 @@ class DriversTab(QWidget):
             success = self.status_manager.perform_system_scan()
             if success and hasattr(self, 'all_drivers'):
                 self.status_manager.check_drivers_status(self.all_drivers)
-                self.display_drivers()
+                self.drivers_grid.refresh()
         except Exception as e:
             print(f"Ошибка сканирования: {e}")
         finally:
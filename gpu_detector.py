@@ -1,17 +1,35 @@
 import subprocess
 import re
 import platform
+from powershell_worker import PowerShellError, query as powershell_query
+
+
+GPU_NAMES_COMMAND = "Get-CimInstance -ClassName Win32_VideoController | Select-Object -ExpandProperty Name"
+CPU_NAMES_COMMAND = "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty Name"
+NAMES_TIMEOUT = 5
+
+
+def query_names(command):
+    """Названия устройств через общий процесс PowerShell"""
+    return [str(name).strip() for name in powershell_query(command, timeout=NAMES_TIMEOUT) if name and str(name).strip()]
 
 
 class HardwareDetector:
     @staticmethod
     def get_gpu_info():
-        """Получает информацию о GPU через WMIC или PowerShell"""
+        """Получает информацию о GPU через общий процесс PowerShell или WMIC"""
+        try:
+            gpu_names = query_names(GPU_NAMES_COMMAND)
+            if gpu_names:
+                return gpu_names
+        except PowerShellError as e:
+            print(f"Ошибка PowerShell: {e}, пробуем WMIC...")
+        
         try:
             result = subprocess.run([
                 'wmic', 'path', 'win32_VideoController', 
                 'get', 'name', '/format:list'
-            ], capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW, timeout=5)
+            ], capture_output=True, text=True, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0), timeout=5)
 
             if result.returncode == 0:
                 gpu_names = []
@@ -22,34 +40,13 @@ class HardwareDetector:
                         if gpu_name:
                             gpu_names.append(gpu_name)
                 
-                if gpu_names:
-                    return gpu_names
+                return gpu_names
+            return []
         except FileNotFoundError:
-            print("WMIC не найден, пробуем PowerShell...")
+            print("WMIC не найден")
+            return []
         except Exception as e:
             print(f"Ошибка WMIC: {e}")
-        
-        try:
-            ps_command = "Get-CimInstance -ClassName Win32_VideoController | Select-Object -ExpandProperty Name"
-            result = subprocess.run([
-                'powershell', '-NoProfile', '-Command', ps_command
-            ], capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW, timeout=10)
-            
-            if result.returncode == 0:
-                gpu_names = []
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    gpu_name = line.strip()
-                    if gpu_name:
-                        gpu_names.append(gpu_name)
-                
-                return gpu_names
-            else:
-                print(f"Ошибка PowerShell: {result.stderr}")
-                return []
-                
-        except Exception as e:
-            print(f"Ошибка при определении GPU через PowerShell: {e}")
             return []
     
     @staticmethod
@@ -116,11 +113,18 @@ class HardwareDetector:
 class CPUDetector:
     @staticmethod
     def get_cpu_info():
-        """Получает информацию о CPU через WMIC или PowerShell"""
+        """Получает информацию о CPU через общий процесс PowerShell или WMIC"""
+        try:
+            cpu_names = query_names(CPU_NAMES_COMMAND)
+            if cpu_names:
+                return cpu_names
+        except PowerShellError as e:
+            print(f"Ошибка PowerShell для CPU: {e}, пробуем WMIC...")
+        
         try:
             result = subprocess.run([
                 'wmic', 'cpu', 'get', 'name', '/format:list'
-            ], capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW, timeout=5)
+            ], capture_output=True, text=True, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0), timeout=5)
             
             if result.returncode == 0:
                 cpu_names = []
@@ -132,34 +136,13 @@ class CPUDetector:
                         if cpu_name:
                             cpu_names.append(cpu_name)
                 
-                if cpu_names:
-                    return cpu_names
+                return cpu_names
+            return []
         except FileNotFoundError:
-            print("WMIC не найден, пробуем PowerShell...")
+            print("WMIC не найден")
+            return []
         except Exception as e:
             print(f"Ошибка WMIC для CPU: {e}")
-        
-        try:
-            ps_command = "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty Name"
-            result = subprocess.run([
-                'powershell', '-NoProfile', '-Command', ps_command
-            ], capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW, timeout=10)
-            
-            if result.returncode == 0:
-                cpu_names = []
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    cpu_name = line.strip()
-                    if cpu_name:
-                        cpu_names.append(cpu_name)
-                
-                return cpu_names
-            else:
-                print(f"Ошибка PowerShell для CPU: {result.stderr}")
-                return []
-                
-        except Exception as e:
-            print(f"Ошибка при определении CPU через PowerShell: {e}")
             return []
     
     @staticmethod
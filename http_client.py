@@ -0,0 +1,61 @@
+import threading
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 16
+
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Установщики скачиваются без проверки сертификата, как и раньше в DownloadThread
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def create_session():
+    """Создать сессию с пулом keep-alive соединений и политикой повторов"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+
+    retry = Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=0,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Получить общую HTTP сессию программы"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = create_session()
+    return _http_session
+
+
+def get(url, **kwargs):
+    """GET запрос через общую сессию с таймаутами по умолчанию"""
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return get_http_session().get(url, **kwargs)
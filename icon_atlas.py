@@ -0,0 +1,145 @@
+"""Атлас системных иконок
+
+Все PNG из папки иконок упаковываются в одно изображение с индексом
+имя -> прямоугольник. Программа декодирует атлас один раз и вырезает из него
+иконки, вместо того чтобы читать десятки отдельных файлов.
+
+Сборка (reorganize_build.py делает это для dist автоматически):
+
+    python icon_atlas.py <папка с иконками> [папка для атласа]
+"""
+import json
+import os
+import sys
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QPainter, QPixmap
+
+
+ATLAS_IMAGE = "icons_atlas.png"
+ATLAS_INDEX = "icons_atlas.json"
+ATLAS_VERSION = 1
+ATLAS_MAX_WIDTH = 512
+ATLAS_PADDING = 1
+# Крупные картинки (иллюстрации) в атлас не берем, их удобнее грузить отдельно
+ATLAS_MAX_ICON_SIDE = 128
+
+
+def pack_icons(sizes, max_width=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+    """Разложить прямоугольники по полкам: самые высокие первыми
+
+    Возвращает (позиции {имя: (x, y)}, ширина, высота).
+    """
+    positions = {}
+    x = y = shelf_height = width = 0
+
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        if x and x + w > max_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+
+        positions[name] = (x, y)
+        x += w + padding
+        width = max(width, x - padding)
+        shelf_height = max(shelf_height, h)
+
+    return positions, width, y + shelf_height
+
+
+def build_icon_atlas(icons_dir, output_dir=None):
+    """Собрать атлас из PNG папки icons_dir и записать изображение и индекс"""
+    output_dir = output_dir or icons_dir
+
+    images = {}
+    for file_name in sorted(os.listdir(icons_dir)):
+        if not file_name.lower().endswith(".png") or file_name == ATLAS_IMAGE:
+            continue
+
+        image = QImage(os.path.join(icons_dir, file_name))
+        if image.isNull():
+            print(f"Ошибка чтения иконки {file_name}")
+            continue
+        if max(image.width(), image.height()) > ATLAS_MAX_ICON_SIDE:
+            continue
+        images[file_name] = image
+
+    positions, width, height = pack_icons({name: (image.width(), image.height()) for name, image in images.items()})
+
+    atlas = QImage(max(width, 1), max(height, 1), QImage.Format.Format_ARGB32_Premultiplied)
+    atlas.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(atlas)
+    for name, image in images.items():
+        painter.drawImage(*positions[name], image)
+    painter.end()
+
+    os.makedirs(output_dir, exist_ok=True)
+    if not atlas.save(os.path.join(output_dir, ATLAS_IMAGE), "PNG"):
+        raise Exception("Не удалось сохранить изображение атласа")
+
+    index = {
+        "version": ATLAS_VERSION,
+        "image": ATLAS_IMAGE,
+        "icons": {
+            name: [*positions[name], images[name].width(), images[name].height()]
+            for name in images
+        }
+    }
+    with open(os.path.join(output_dir, ATLAS_INDEX), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+
+    return len(images), (width, height)
+
+
+class IconAtlas:
+    """Атлас иконок: одно декодирование изображения, иконки вырезаются по индексу (только GUI поток)"""
+
+    def __init__(self, index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("version") != ATLAS_VERSION:
+            raise ValueError(f"Неподдерживаемая версия атласа иконок: {index.get('version')}")
+
+        self.image_path = os.path.join(os.path.dirname(index_path), index["image"])
+        self.rects = {os.path.normcase(name): rect for name, rect in index["icons"].items()}
+        self._pixmap = None
+
+    def __contains__(self, name):
+        return os.path.normcase(name) in self.rects
+
+    def pixmap(self, name):
+        """Иконка из атласа или None, если ее там нет"""
+        rect = self.rects.get(os.path.normcase(name))
+        if rect is None:
+            return None
+
+        if self._pixmap is None:
+            self._pixmap = QPixmap(self.image_path)
+        if self._pixmap.isNull():
+            return None
+        return self._pixmap.copy(*rect)
+
+
+_icon_atlas = None
+
+def get_icon_atlas():
+    """Получить атлас иконок, если он собран (в режиме разработки его обычно нет)"""
+    global _icon_atlas
+    if _icon_atlas is None:
+        from resource_path import get_icon_path
+        _icon_atlas = False
+        index_path = get_icon_path(ATLAS_INDEX)
+        if index_path:
+            try:
+                _icon_atlas = IconAtlas(index_path)
+            except Exception as e:
+                print(f"Ошибка загрузки атласа иконок: {e}")
+    return _icon_atlas or None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    count, size = build_icon_atlas(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Атлас иконок: {count} иконок, {size[0]}x{size[1]}")
@@ -1,39 +1,406 @@
-from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt
-from resource_path import get_program_image_path
+import os
+import time
+from collections import OrderedDict
+from PyQt6.QtGui import QPixmap, QImage
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+from resource_path import get_program_image_path, get_icon_path, get_resource_index
+from remote_images import is_remote_image, get_remote_image_cache
+from icon_atlas import get_icon_atlas
 
 
-def load_program_image(image_name):
-    """Загрузить изображение программы/драйвера"""
+PIXMAP_CACHE_BUDGET = 64 * 1024 * 1024
+SOURCE_PROGRAM = "program"
+SOURCE_ICON = "icon"
+IMAGE_LOADER_THREADS = 4
+REMOTE_IMAGE_THREADS = 6
+# Картинку по ссылке, которую не удалось скачать, не запрашиваем снова столько секунд
+REMOTE_RETRY_INTERVAL = 300
+
+
+def pixmap_bytes(pixmap):
+    """Примерный объем декодированного изображения в памяти"""
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache:
+    """Общий кэш декодированных изображений с вытеснением по объему (LRU)
+
+    Ключ - (источник, имя, размер, режим масштабирования), размер None означает
+    исходное изображение. Масштабированные варианты запоминаются, поэтому каждый
+    логотип читается с диска и сглаженно масштабируется один раз за сеанс.
+    Картинки по ссылкам, которые не удалось скачать, считаются отсутствующими
+    REMOTE_RETRY_INTERVAL секунд, а не навсегда.
+    Работает только в GUI потоке, как и сам QPixmap.
+    """
+
+    def __init__(self, budget=PIXMAP_CACHE_BUDGET):
+        self.budget = budget
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.missing = set()
+        self.failed_at = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source, name, size=None, transform=Qt.TransformationMode.SmoothTransformation):
+        """Изображение из кэша или с диска; None, если файла нет или он не читается"""
+        if not name:
+            return None
+
+        key = self.make_key(source, name, size, transform)
+        pixmap = self.peek(key)
+        if pixmap is not None:
+            return pixmap
+
+        if self.is_missing(source, name):
+            return None
+
+        self.misses += 1
+        if size:
+            original = self.get(source, name)
+            if original is None:
+                return None
+            pixmap = original.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, transform)
+        else:
+            pixmap = self.load(source, name)
+            if pixmap is None:
+                # Картинка по ссылке может появиться на диске после фоновой загрузки
+                if not is_remote_image(name):
+                    self.mark_missing(source, name)
+                return None
+
+        self.put(key, pixmap)
+        return pixmap
+
+    @staticmethod
+    def make_key(source, name, size=None, transform=Qt.TransformationMode.SmoothTransformation):
+        return (source, name, tuple(size) if size else None, transform)
+
+    def peek(self, key):
+        """Изображение, если оно уже в кэше, без чтения с диска"""
+        pixmap = self.entries.get(key)
+        if pixmap is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return pixmap
+
+    def is_missing(self, source, name):
+        return (source, name) in self.missing or self.recently_failed(name)
+
+    def mark_missing(self, source, name):
+        self.missing.add((source, name))
+
+    def mark_failed(self, name):
+        """Запомнить неудачную загрузку картинки по ссылке"""
+        self.failed_at[name] = time.monotonic()
+
+    def recently_failed(self, name):
+        """Загрузка картинки по ссылке не удалась меньше REMOTE_RETRY_INTERVAL секунд назад"""
+        failed_at = self.failed_at.get(name)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at < REMOTE_RETRY_INTERVAL:
+            return True
+        del self.failed_at[name]
+        return False
+
+    def forget_failures(self):
+        """Разрешить снова скачивать картинки по ссылкам (например, после обновления каталога)"""
+        self.failed_at.clear()
+
+    @staticmethod
+    def resolve(source, name):
+        """Путь к файлу изображения; для ссылок - только уже скачанный файл"""
+        if is_remote_image(name):
+            return get_remote_image_cache().cached_path(name)
+        return get_program_image_path(name) if source == SOURCE_PROGRAM else get_icon_path(name)
+
+    def load(self, source, name):
+        if source == SOURCE_ICON:
+            atlas = get_icon_atlas()
+            pixmap = atlas.pixmap(name) if atlas else None
+            if pixmap is not None:
+                return pixmap
+
+        path = self.resolve(source, name)
+        if not path:
+            return None
+
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            return None
+        return pixmap
+
+    def put(self, key, pixmap):
+        size = pixmap_bytes(pixmap)
+        if size > self.budget:
+            return
+
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= pixmap_bytes(old)
+
+        self.entries[key] = pixmap
+        self.total_bytes += size
+
+        while self.total_bytes > self.budget:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= pixmap_bytes(evicted)
+
+    def discard(self, source, name):
+        """Забыть все варианты изображения (например, после обновления картинки по ссылке)"""
+        for key in [key for key in self.entries if key[0] == source and key[1] == name]:
+            self.total_bytes -= pixmap_bytes(self.entries.pop(key))
+        self.missing.discard((source, name))
+        self.failed_at.pop(name, None)
+
+    def clear(self):
+        """Сбросить кэш (например, после замены файлов изображений)"""
+        self.entries.clear()
+        self.missing.clear()
+        self.failed_at.clear()
+        self.total_bytes = 0
+
+
+_pixmap_cache = None
+
+def get_pixmap_cache():
+    """Получить общий кэш изображений"""
+    global _pixmap_cache
+    if _pixmap_cache is None:
+        _pixmap_cache = PixmapCache()
+        get_resource_index().add_change_listener(_pixmap_cache.clear)
+    return _pixmap_cache
+
+
+def decode_image(path, key):
+    """Прочитать и вписать в размер из ключа кэша (можно вызывать не из GUI потока)"""
+    image = QImage(path)
+    size = key[2]
+    if size and not image.isNull():
+        image = image.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, key[3])
+    return image
+
+
+class ImageDecodeTask(QRunnable):
+    """Чтение и масштабирование изображения в пуле потоков (QImage, без QPixmap)"""
+
+    def __init__(self, loader, key, path):
+        super().__init__()
+        # Задача остается у загрузчика, чтобы ее можно было отменить через tryTake
+        self.setAutoDelete(False)
+        self.loader = loader
+        self.key = key
+        self.path = path
+
+    def run(self):
+        self.loader.image_decoded.emit(self.key, decode_image(self.path, self.key))
+
+
+class RemoteImageTask(QRunnable):
+    """Скачивание (или сверка по ETag) картинки по ссылке и ее декодирование
+
+    С decode=False только сверяет уже показанную картинку и сообщает, если она изменилась.
+    """
+
+    def __init__(self, loader, key, url, decode=True):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.loader = loader
+        self.key = key
+        self.url = url
+        self.decode = decode
+
+    def run(self):
+        try:
+            path, changed = get_remote_image_cache().fetch(self.url)
+        except Exception as e:
+            print(f"Ошибка загрузки изображения {self.url}: {e}")
+            path, changed = None, False
+
+        if not self.decode:
+            if changed:
+                self.loader.image_changed.emit(self.key[0], self.url)
+            return
+
+        image = decode_image(path, self.key) if path else QImage()
+        self.loader.image_decoded.emit(self.key, image)
+
+
+class AsyncImageLoader(QObject):
+    """Фоновая загрузка изображений для карточек
+
+    Декодирование и масштабирование идут в пуле потоков, готовое изображение
+    возвращается в GUI поток сигналом, превращается в QPixmap и кладется в общий
+    кэш. Каждый владелец (карточка) ждет не больше одного изображения: новый
+    запрос или cancel() отменяет прежний, еще не начатые задачи снимаются с очереди.
+    Картинки по ссылкам скачиваются в отдельном пуле; уже скачанные показываются
+    сразу и один раз за сеанс сверяются с сервером, об изменении сообщает image_changed.
+    """
+    image_decoded = pyqtSignal(object, object)
+    image_changed = pyqtSignal(str, str)
+
+    def __init__(self, cache, max_threads=IMAGE_LOADER_THREADS):
+        super().__init__()
+        self.cache = cache
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, min(max_threads, QThread.idealThreadCount())))
+        self.remote_pool = QThreadPool(self)
+        self.remote_pool.setMaxThreadCount(REMOTE_IMAGE_THREADS)
+        self.revalidating = set()
+
+        self.tasks = {}
+        self.waiters = {}
+        self.owner_keys = {}
+
+        self.image_decoded.connect(self._on_image_decoded)
+        self.image_changed.connect(self._on_image_changed)
+
+    def request(self, owner, source, name, size, callback, priority=0):
+        """Запросить изображение для владельца; callback(pixmap или None) вызывается в GUI потоке
+
+        Если изображение уже в кэше, callback вызывается сразу.
+        """
+        self.cancel(owner)
+
+        if not name:
+            callback(None)
+            return
+
+        key = self.cache.make_key(source, name, size)
+        pixmap = self.cache.peek(key)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+
+        if self.cache.is_missing(source, name):
+            callback(None)
+            return
+
+        self.waiters.setdefault(key, {})[owner] = callback
+        self.owner_keys[owner] = key
+
+        if key not in self.tasks:
+            path = self.cache.resolve(source, name)
+            if path:
+                task = ImageDecodeTask(self, key, path)
+                self.pool.start(task, priority)
+                if is_remote_image(name):
+                    self.revalidate(source, name)
+            elif is_remote_image(name):
+                task = RemoteImageTask(self, key, name)
+                self.remote_pool.start(task, priority)
+            else:
+                self.cache.mark_missing(source, name)
+                self._on_image_decoded(key, QImage())
+                return
+
+            self.tasks[key] = task
+
+    def revalidate(self, source, name):
+        """Один раз за сеанс сверить скачанную картинку с сервером в фоне"""
+        if name in self.revalidating or not get_remote_image_cache().needs_revalidation(name):
+            return
+        self.revalidating.add(name)
+        task = RemoteImageTask(self, (source, name, None, None), name, decode=False)
+        # Сверку не отменяют, пул сам удалит задачу после выполнения
+        task.setAutoDelete(True)
+        self.remote_pool.start(task, -1)
+
+    def cancel(self, owner):
+        """Отменить ожидание изображения владельцем"""
+        key = self.owner_keys.pop(owner, None)
+        if key is None:
+            return
+
+        waiters = self.waiters.get(key, {})
+        waiters.pop(owner, None)
+        if waiters:
+            return
+
+        self.waiters.pop(key, None)
+        task = self.tasks.get(key)
+        if task is not None and (self.pool.tryTake(task) or self.remote_pool.tryTake(task)):
+            del self.tasks[key]
+
+    def _on_image_decoded(self, key, image):
+        self.tasks.pop(key, None)
+        waiters = self.waiters.pop(key, {})
+
+        if image.isNull():
+            # Картинку по ссылке можно скачать позже, поэтому она лишь откладывается на время
+            if is_remote_image(key[1]):
+                self.cache.mark_failed(key[1])
+            else:
+                self.cache.mark_missing(key[0], key[1])
+            pixmap = None
+        else:
+            pixmap = QPixmap.fromImage(image)
+            self.cache.put(key, pixmap)
+
+        for owner, callback in waiters.items():
+            self.owner_keys.pop(owner, None)
+            try:
+                callback(pixmap)
+            except Exception as e:
+                print(f"Ошибка установки изображения: {e}")
+
+    def _on_image_changed(self, source, name):
+        self.cache.discard(source, name)
+
+    def shutdown(self):
+        """Снять очередь и дождаться текущих задач (при выходе из программы)"""
+        for pool in (self.pool, self.remote_pool):
+            pool.clear()
+            pool.waitForDone(1000)
+
+
+_image_loader = None
+
+def get_image_loader():
+    """Получить общий фоновый загрузчик изображений"""
+    global _image_loader
+    if _image_loader is None:
+        from PyQt6.QtWidgets import QApplication
+        _image_loader = AsyncImageLoader(get_pixmap_cache())
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_image_loader.shutdown)
+    return _image_loader
+
+
+def get_program_image_file(image_name):
+    """Путь к файлу изображения программы, в том числе уже скачанного по ссылке"""
     if not image_name:
         return None
-    
-    image_path = get_program_image_path(image_name)
-    
-    if not image_path:
-        return None
-    
-    pixmap = QPixmap(image_path)
-    
-    if pixmap.isNull():
-        return None
-    
-    return pixmap
+    return PixmapCache.resolve(SOURCE_PROGRAM, image_name)
+
+
+def load_program_image(image_name, size=None):
+    """Загрузить изображение программы/драйвера, при size - вписанное в этот размер"""
+    return get_pixmap_cache().get(SOURCE_PROGRAM, image_name, size)
+
+
+def load_icon_image(icon_name, size=None):
+    """Загрузить системную иконку UTILHELP, при size - вписанную в этот размер"""
+    return get_pixmap_cache().get(SOURCE_ICON, icon_name, size)
+
+
+def load_icon_file(icon_path):
+    """QPixmap иконки по пути из get_icon_path: из атласа или общего кэша, иначе с диска"""
+    if not icon_path:
+        return QPixmap()
+    pixmap = load_icon_image(os.path.basename(icon_path))
+    return pixmap if pixmap else QPixmap(icon_path)
 
 
 def create_program_icon(image_name, size=(24, 24)):
     """Создать иконку для кнопки из изображения программы"""
     from PyQt6.QtGui import QIcon
-    
-    pixmap = load_program_image(image_name)
-    
-    if not pixmap or pixmap.isNull():
+
+    scaled_pixmap = load_program_image(image_name, size)
+
+    if not scaled_pixmap or scaled_pixmap.isNull():
         return None
-    
-    scaled_pixmap = pixmap.scaled(
-        size[0], size[1], 
-        Qt.AspectRatioMode.KeepAspectRatio, 
-        Qt.TransformationMode.SmoothTransformation
-    )
-    
-    return QIcon(scaled_pixmap)
\ No newline at end of file
+
+    return QIcon(scaled_pixmap)
@@ -0,0 +1,320 @@
+"""Источники сведений об установленных программах и драйверах
+
+SystemScanner не читает систему сам, а получает записи от провайдера:
+- программы - списки записей реестра {"Subkey", "LastWrite", "DisplayName",
+  "DisplayVersion"} по разделам Uninstall (источникам). LastWrite - время
+  последней записи подраздела, по нему повторное сканирование перечитывает
+  только измененные подразделы;
+- драйверы - записи Win32_PnPSignedDriver {"DeviceName", "DriverVersion",
+  "DriverDate"}.
+
+На Windows программы читаются из реестра, драйверы - через PowerShell
+(SystemInventoryProvider). FixtureInventoryProvider воспроизводит записанный в
+JSON инвентарь (record_inventory) любого размера, поэтому сканирование,
+сравнение и обновление статусов можно проверять и нагружать без Windows:
+путь к файлу задается переменной окружения UTILHELP_INVENTORY_FIXTURE.
+"""
+import json
+import os
+from typing import Dict, List
+from powershell_worker import PowerShellError, query as powershell_query
+
+
+INVENTORY_FIXTURE_ENV = "UTILHELP_INVENTORY_FIXTURE"
+FIXTURE_FORMAT = 1
+
+UNINSTALL_PATH = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
+UNINSTALL_PATH_WOW64 = r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
+
+# Источники программ: раздел реестра в виде "HKLM\путь"
+PROGRAM_SOURCES = [
+    "HKLM\\" + UNINSTALL_PATH,
+    "HKLM\\" + UNINSTALL_PATH_WOW64,
+    "HKCU\\" + UNINSTALL_PATH,
+]
+
+DRIVERS_COMMAND = """
+Get-WmiObject Win32_PnPSignedDriver | Where-Object {
+    $_.DeviceName -and
+    $_.DriverVersion -and
+    $_.DeviceName -notlike "*Generic*" -and
+    $_.DeviceName -notlike "*Standard*" -and
+    $_.DeviceName -notlike "*Basic*" -and
+    $_.DeviceName -notlike "*Microsoft*" -and
+    $_.DeviceName -notlike "*Windows*"
+} | Select-Object DeviceName, DriverVersion, DriverDate
+"""
+DRIVERS_TIMEOUT = 30
+DRIVER_FIELDS = ("DeviceName", "DriverVersion", "DriverDate")
+
+
+class InventoryProvider:
+    """Базовый провайдер: нет ни программ, ни драйверов
+
+    read_programs(source) возвращает записи одного раздела Uninstall или
+    поднимает OSError, если раздела нет; read_drivers() возвращает записи
+    драйверов (пустой список, если их не удалось получить).
+
+    Для повторного сканирования: source_fingerprint(source) - отпечаток
+    раздела, который меняется при добавлении и удалении подразделов (None -
+    неизвестен), program_stamps(source, subkeys) - время записи подразделов,
+    read_program(source, subkey) - одна запись. По умолчанию они выводятся из
+    read_programs.
+    """
+    name = "empty"
+
+    def program_sources(self) -> List[str]:
+        return []
+
+    def read_programs(self, source: str) -> List[Dict[str, str]]:
+        raise FileNotFoundError(source)
+
+    def read_drivers(self) -> List[Dict[str, str]]:
+        return []
+
+    def source_fingerprint(self, source: str):
+        return None
+
+    def program_stamps(self, source: str, subkeys: List[str] = None) -> Dict[str, int]:
+        stamps = {record["Subkey"]: record.get("LastWrite") for record in self.read_programs(source)}
+        if subkeys is None:
+            return stamps
+        return {subkey: stamps[subkey] for subkey in subkeys if subkey in stamps}
+
+    def read_program(self, source: str, subkey: str) -> Dict[str, str]:
+        for record in self.read_programs(source):
+            if record["Subkey"] == subkey:
+                return record
+        raise FileNotFoundError(f"{source}\\{subkey}")
+
+
+def _import_winreg():
+    """winreg есть только на Windows, поэтому импортируется при первом чтении реестра"""
+    try:
+        import winreg
+        return winreg
+    except ImportError:
+        return None
+
+
+class RegistryInventoryProvider(InventoryProvider):
+    """Программы из разделов Uninstall реестра Windows"""
+    name = "registry"
+
+    def __init__(self):
+        self.winreg = _import_winreg()
+
+    def program_sources(self) -> List[str]:
+        return list(PROGRAM_SOURCES) if self.winreg is not None else []
+
+    def open_source(self, source: str):
+        hive_name, path = source.split("\\", 1)
+        hives = {
+            "HKLM": self.winreg.HKEY_LOCAL_MACHINE,
+            "HKCU": self.winreg.HKEY_CURRENT_USER,
+        }
+        return self.winreg.OpenKey(hives[hive_name], path)
+
+    def read_programs(self, source: str) -> List[Dict[str, str]]:
+        winreg = self.winreg
+        if winreg is None:
+            raise FileNotFoundError(source)
+
+        records = []
+        with self.open_source(source) as key:
+            for i in range(winreg.QueryInfoKey(key)[0]):
+                try:
+                    subkey_name = winreg.EnumKey(key, i)
+                    with winreg.OpenKey(key, subkey_name) as subkey:
+                        records.append(self.read_values(subkey_name, subkey))
+                except OSError:
+                    continue
+        return records
+
+    def read_values(self, subkey_name: str, subkey) -> Dict[str, str]:
+        """Время записи, DisplayName и DisplayVersion подраздела (если они есть)"""
+        record = {"Subkey": subkey_name, "LastWrite": self.winreg.QueryInfoKey(subkey)[2]}
+        try:
+            record["DisplayName"] = self.winreg.QueryValueEx(subkey, "DisplayName")[0]
+        except FileNotFoundError:
+            return record
+
+        try:
+            record["DisplayVersion"] = self.winreg.QueryValueEx(subkey, "DisplayVersion")[0]
+        except OSError:
+            pass
+        return record
+
+    def source_fingerprint(self, source: str):
+        """Число подразделов и время записи раздела: меняются при установке и удалении"""
+        if self.winreg is None:
+            raise FileNotFoundError(source)
+        with self.open_source(source) as key:
+            info = self.winreg.QueryInfoKey(key)
+        return [info[0], info[2]]
+
+    def program_stamps(self, source: str, subkeys: List[str] = None) -> Dict[str, int]:
+        """Время записи подразделов без чтения значений (всех или только перечисленных)"""
+        winreg = self.winreg
+        if winreg is None:
+            raise FileNotFoundError(source)
+
+        stamps = {}
+        with self.open_source(source) as key:
+            if subkeys is None:
+                subkeys = []
+                for i in range(winreg.QueryInfoKey(key)[0]):
+                    try:
+                        subkeys.append(winreg.EnumKey(key, i))
+                    except OSError:
+                        continue
+
+            for subkey_name in subkeys:
+                try:
+                    with winreg.OpenKey(key, subkey_name) as subkey:
+                        stamps[subkey_name] = winreg.QueryInfoKey(subkey)[2]
+                except OSError:
+                    continue
+        return stamps
+
+    def read_program(self, source: str, subkey_name: str) -> Dict[str, str]:
+        if self.winreg is None:
+            raise FileNotFoundError(source)
+        with self.open_source(source) as key:
+            with self.winreg.OpenKey(key, subkey_name) as subkey:
+                return self.read_values(subkey_name, subkey)
+
+
+class PowerShellInventoryProvider(InventoryProvider):
+    """Драйверы из Win32_PnPSignedDriver через общий процесс PowerShell"""
+    name = "powershell"
+
+    def read_drivers(self) -> List[Dict[str, str]]:
+        try:
+            return parse_driver_records(powershell_query(DRIVERS_COMMAND, timeout=DRIVERS_TIMEOUT))
+        except PowerShellError as e:
+            print(f"Ошибка запроса драйверов через PowerShell: {e}")
+            return []
+
+
+def parse_driver_records(data) -> List[Dict[str, str]]:
+    """Записи драйверов из JSON: один драйвер может прийти объектом, несколько - списком"""
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        return []
+    return [driver for driver in data if isinstance(driver, dict)]
+
+
+class SystemInventoryProvider(InventoryProvider):
+    """Инвентарь Windows: программы из реестра, драйверы через PowerShell"""
+    name = "system"
+
+    def __init__(self):
+        self.programs = RegistryInventoryProvider()
+        self.drivers = PowerShellInventoryProvider()
+
+    def program_sources(self) -> List[str]:
+        return self.programs.program_sources()
+
+    def read_programs(self, source: str) -> List[Dict[str, str]]:
+        return self.programs.read_programs(source)
+
+    def read_drivers(self) -> List[Dict[str, str]]:
+        return self.drivers.read_drivers()
+
+    def source_fingerprint(self, source: str):
+        return self.programs.source_fingerprint(source)
+
+    def program_stamps(self, source: str, subkeys: List[str] = None) -> Dict[str, int]:
+        return self.programs.program_stamps(source, subkeys)
+
+    def read_program(self, source: str, subkey: str) -> Dict[str, str]:
+        return self.programs.read_program(source, subkey)
+
+
+class FixtureInventoryProvider(InventoryProvider):
+    """Инвентарь, записанный в JSON файл
+
+    {"format": 1, "programs": {источник: [записи]}, "drivers": [записи]}.
+    Файл читается при первом обращении и перечитывается, если изменился.
+    Источника, которого нет в файле, нет и в "реестре" (OSError, как у
+    отсутствующего раздела). Записям без Subkey подразделом служит номер.
+    """
+    name = "fixture"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.inventory = None
+        self.loaded_mtime = None
+
+    def load(self) -> Dict:
+        mtime = os.stat(self.path).st_mtime_ns
+        if self.inventory is None or mtime != self.loaded_mtime:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                inventory = json.load(f)
+            if inventory.get("format") != FIXTURE_FORMAT:
+                raise ValueError(f"Неподдерживаемый формат инвентаря: {inventory.get('format')}")
+
+            programs = {}
+            for source, records in inventory.get("programs", {}).items():
+                for position, record in enumerate(records):
+                    record.setdefault("Subkey", str(position))
+                programs[source] = {record["Subkey"]: record for record in records}
+            inventory["programs"] = programs
+            self.inventory = inventory
+            self.loaded_mtime = mtime
+        return self.inventory
+
+    def program_sources(self) -> List[str]:
+        return list(self.load().get("programs", {}))
+
+    def source_records(self, source: str) -> Dict[str, Dict[str, str]]:
+        programs = self.load().get("programs", {})
+        if source not in programs:
+            raise FileNotFoundError(source)
+        return programs[source]
+
+    def read_programs(self, source: str) -> List[Dict[str, str]]:
+        return list(self.source_records(source).values())
+
+    def read_program(self, source: str, subkey: str) -> Dict[str, str]:
+        records = self.source_records(source)
+        if subkey not in records:
+            raise FileNotFoundError(f"{source}\\{subkey}")
+        return records[subkey]
+
+    def read_drivers(self) -> List[Dict[str, str]]:
+        return parse_driver_records(self.load().get("drivers", []))
+
+
+def record_inventory(provider: InventoryProvider, path: str) -> Dict[str, int]:
+    """Записать инвентарь провайдера в файл для FixtureInventoryProvider"""
+    programs = {}
+    for source in provider.program_sources():
+        try:
+            programs[source] = provider.read_programs(source)
+        except OSError:
+            continue
+
+    drivers = [
+        {field: driver[field] for field in DRIVER_FIELDS if field in driver}
+        for driver in provider.read_drivers()
+    ]
+    inventory = {"format": FIXTURE_FORMAT, "programs": programs, "drivers": drivers}
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(inventory, f, indent=1, ensure_ascii=False)
+
+    return {
+        "programs": sum(len(records) for records in programs.values()),
+        "drivers": len(drivers)
+    }
+
+
+def get_inventory_provider() -> InventoryProvider:
+    """Провайдер по умолчанию: записанный инвентарь, если задан UTILHELP_INVENTORY_FIXTURE, иначе система"""
+    fixture_path = os.environ.get(INVENTORY_FIXTURE_ENV)
+    if fixture_path:
+        return FixtureInventoryProvider(fixture_path)
+    return SystemInventoryProvider()
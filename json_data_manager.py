@@ -1,14 +1,74 @@
 import requests
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from PyQt6.QtCore import QThread, pyqtSignal
+from rate_limiter import get_bandwidth_limiter
+from catalog_delta import (
+    apply_catalog_patch, catalog_hash, CatalogPatchError, DELTA_IM, REVISION_HEADER, STATUS_IM_USED
+)
+from catalog_snapshot import open_snapshot, write_snapshot, remove_snapshot, snapshot_exists, SNAPSHOT_SUFFIX
+from search_index import SearchIndex, tokenize
+import http_client
 
 
 GITHUB_PAGES_URL = "https://al1ster13.github.io/utilhelp-data/"
+DATA_URL = os.environ.get("UTILHELP_DATA_URL", GITHUB_PAGES_URL)
 
 CACHE_DIR = "cache"  
 CACHE_DURATION = timedelta(hours=1)  
+VALIDATORS_FILE = "validators.json"
+
+DATA_TYPES = ('programs', 'drivers', 'news')
+DATA_TYPE_NAMES = {
+    'programs': 'программ',
+    'drivers': 'драйверов',
+    'news': 'новостей'
+}
+CATALOG_KEYS = {
+    'programs': 'name',
+    'drivers': 'name',
+    'news': 'id'
+}
+# search_programs/search_drivers ищут подстроку только в названии и описании
+SEARCH_FIELDS = ('name', 'description')
+
+
+def snapshot_path(data_type):
+    """Путь к снимку каталога в кэше"""
+    return os.path.join(CACHE_DIR, f"{data_type}{SNAPSHOT_SUFFIX}")
+
+
+def legacy_cache_path(data_type):
+    """Путь к кэшу каталога в старом формате JSON"""
+    return os.path.join(CACHE_DIR, f"{data_type}.json")
+
+
+def diff_catalog(old_items, new_items, key):
+    """Разница двух версий каталога по ключу элемента"""
+    old_by_key = {item.get(key): item for item in old_items}
+    new_by_key = {item.get(key): item for item in new_items}
+    
+    return {
+        "added": [item for item_key, item in new_by_key.items() if item_key not in old_by_key],
+        "removed": [item for item_key, item in old_by_key.items() if item_key not in new_by_key],
+        "changed": [
+            item for item_key, item in new_by_key.items()
+            if item_key in old_by_key and old_by_key[item_key] != item
+        ],
+        "items": new_items
+    }
+
+
+def diff_catalogs(old_data, new_data):
+    """Разница по всем каталогам, только для изменившихся типов данных"""
+    result = {}
+    for data_type in DATA_TYPES:
+        diff = diff_catalog(old_data.get(data_type, []), new_data.get(data_type, []), CATALOG_KEYS[data_type])
+        if diff["added"] or diff["removed"] or diff["changed"]:
+            result[data_type] = diff
+    return result
 
 
 class DataLoader(QThread):
@@ -17,9 +77,11 @@ class DataLoader(QThread):
     loading_progress = pyqtSignal(str, int)  
     loading_completed = pyqtSignal(dict)  
     loading_failed = pyqtSignal(str)  
+    catalog_updated = pyqtSignal(dict)
     
-    def __init__(self):
+    def __init__(self, stale_while_revalidate=False):
         super().__init__()
+        self.stale_while_revalidate = stale_while_revalidate
         self.data = {
             'programs': [],
             'drivers': [],
@@ -32,32 +94,13 @@ class DataLoader(QThread):
         """Загрузка данных"""
         self.loading_started.emit()
         
+        if self.stale_while_revalidate and self.load_from_cache(ignore_age=True):
+            self.revalidate_cached()
+            return
+        
         try:
             self.loading_progress.emit("Подключение к серверу", 10)
-            
-            self.loading_progress.emit("Загрузка программ", 30)
-            programs_data = self.download_json('programs')
-            if programs_data:
-                self.data['programs'] = programs_data.get('programs', [])
-                self.save_to_cache('programs', programs_data)
-            else:
-                raise Exception("Не удалось загрузить данные программ")
-            
-            self.loading_progress.emit("Загрузка драйверов", 60)
-            drivers_data = self.download_json('drivers')
-            if drivers_data:
-                self.data['drivers'] = drivers_data.get('drivers', [])
-                self.save_to_cache('drivers', drivers_data)
-            else:
-                raise Exception("Не удалось загрузить данные драйверов")
-            
-            self.loading_progress.emit("Загрузка новостей", 90)
-            news_data = self.download_json('news')
-            if news_data:
-                self.data['news'] = news_data.get('news', [])
-                self.save_to_cache('news', news_data)
-            else:
-                raise Exception("Не удалось загрузить данные новостей")
+            self.fetch_catalogs(report_progress=True)
             
             self.loading_progress.emit("Готово", 100)
             self.loading_completed.emit(self.data)
@@ -73,54 +116,220 @@ class DataLoader(QThread):
             else:
                 self.loading_failed.emit(f"Ошибка загрузки данных: {str(e)}")
     
-    def download_json(self, data_type):
-        """Скачивает JSON файл с GitHub"""
+    def revalidate_cached(self):
+        """Сразу отдать кэш, затем проверить каталоги на сервере и сообщить об изменениях"""
+        cached = {data_type: list(items) for data_type, items in self.data.items()}
+        
+        self.loading_progress.emit("Готово", 100)
+        self.loading_completed.emit(cached)
+        
+        try:
+            self.fetch_catalogs(report_progress=False)
+        except Exception as e:
+            print(f"Фоновое обновление каталогов не удалось, используется кэш: {e}")
+            return
+        
+        diff = diff_catalogs(cached, self.data)
+        if diff:
+            print(f"✓ Каталоги обновлены в фоне: {', '.join(diff)}")
+            self.catalog_updated.emit(diff)
+    
+    def fetch_catalogs(self, report_progress=True):
+        """Параллельная условная загрузка всех каталогов в self.data"""
+        validators = self.load_validators()
+        completed = 0
+        
+        with ThreadPoolExecutor(max_workers=len(DATA_TYPES)) as executor:
+            futures = {
+                executor.submit(self.download_json, data_type, validators.get(data_type)): data_type
+                for data_type in DATA_TYPES
+            }
+            
+            for future in as_completed(futures):
+                data_type = futures[future]
+                loaded, new_validators, not_modified = future.result()
+                
+                if not loaded:
+                    raise Exception(f"Не удалось загрузить данные {DATA_TYPE_NAMES[data_type]}")
+                
+                self.data[data_type] = loaded.get(data_type, [])
+                if not_modified and snapshot_exists(snapshot_path(data_type)):
+                    self.touch_cache_time()
+                else:
+                    self.save_to_cache(data_type, loaded)
+                validators[data_type] = new_validators
+                
+                completed += 1
+                if report_progress:
+                    status = "без изменений" if not_modified else "загружены"
+                    self.loading_progress.emit(
+                        f"Данные {DATA_TYPE_NAMES[data_type]} {status}",
+                        10 + 80 * completed // len(DATA_TYPES)
+                    )
+        
+        self.save_validators(validators)
+    
+    def download_json(self, data_type, validators=None):
+        """Скачивает JSON файл с GitHub условным запросом
+        
+        Возвращает (данные, валидаторы, не_изменился). При 304 данные берутся из кэша,
+        при 226 к кэшу применяется патч, а если он не подошел - каталог скачивается целиком.
+        """
         try:
-            url = f"{GITHUB_PAGES_URL}{data_type}.json"
-            response = requests.get(url, timeout=10)
+            url = f"{DATA_URL}{data_type}.json"
+            cached = self.read_cache_file(data_type) if validators else None
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise Exception(f"HTTP {response.status_code}")
+            headers = {}
+            if cached is not None:
+                if validators.get('etag'):
+                    headers['If-None-Match'] = validators['etag']
+                if validators.get('last_modified'):
+                    headers['If-Modified-Since'] = validators['last_modified']
+                if validators.get('revision'):
+                    headers['A-IM'] = DELTA_IM
+                    headers[REVISION_HEADER] = validators['revision']
+            
+            with http_client.get(url, stream=True, headers=headers) as response:
+                new_validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+                
+                if response.status_code == 304 and cached is not None:
+                    return cached, validators, True
+                elif (response.status_code == STATUS_IM_USED and cached is not None
+                        and response.headers.get('IM') == DELTA_IM):
+                    patch = json.loads(self.read_throttled(response))
+                elif response.status_code == 200:
+                    loaded = json.loads(self.read_throttled(response))
+                    new_validators['revision'] = (response.headers.get(REVISION_HEADER)
+                                                  or catalog_hash(loaded.get(data_type, [])))
+                    return loaded, new_validators, False
+                else:
+                    raise Exception(f"HTTP {response.status_code}")
+            
+            try:
+                items = apply_catalog_patch(cached.get(data_type, []), patch, CATALOG_KEYS[data_type],
+                                            validators['revision'])
+            except (CatalogPatchError, KeyError, TypeError) as e:
+                print(f"Патч каталога {data_type} не применен, полная загрузка: {e}")
+                return self.download_json(data_type)
+            
+            print(f"✓ Каталог {data_type}: применено изменений {len(patch.get('ops', []))}")
+            new_validators['revision'] = patch.get('revision')
+            return {data_type: items}, new_validators, False
                 
         except requests.RequestException as e:
             raise Exception(f"Нет подключения к интернету")
         except json.JSONDecodeError as e:
             raise Exception(f"Ошибка формата данных")
     
-    def load_from_cache(self):
-        """Загружает данные из кэша если они свежие"""
+    def read_throttled(self, response):
+        """Чтение тела ответа с учетом общего ограничения скорости"""
+        throttle = get_bandwidth_limiter().create_transfer()
         try:
-            cache_time_file = os.path.join(CACHE_DIR, "cache_time.txt")
-            
-            if os.path.exists(cache_time_file):
+            chunks = []
+            for chunk in response.iter_content(chunk_size=16384):
+                if chunk:
+                    chunks.append(chunk)
+                    throttle.consume(len(chunk))
+            return b"".join(chunks)
+        finally:
+            throttle.close()
+    
+    def load_from_cache(self, ignore_age=False):
+        """Загружает данные из кэша если они свежие
+        
+        С ignore_age=True возраст не проверяется, но нужны кэши всех каталогов.
+        """
+        try:
+            if ignore_age:
+                if not all(self.has_cache_file(data_type) for data_type in DATA_TYPES):
+                    return False
+            else:
+                cache_time_file = os.path.join(CACHE_DIR, "cache_time.txt")
+                if not os.path.exists(cache_time_file):
+                    return False
+                
                 with open(cache_time_file, 'r') as f:
                     cache_time = datetime.fromisoformat(f.read().strip())
-                    
-                if datetime.now() - cache_time < CACHE_DURATION:
-                    for data_type in ['programs', 'drivers', 'news']:
-                        cache_file = os.path.join(CACHE_DIR, f"{data_type}.json")
-                        if os.path.exists(cache_file):
-                            with open(cache_file, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                                self.data[data_type] = data.get(data_type, [])
-                    
-                    print("✓ Данные загружены из кэша")
-                    return True
+                
+                if datetime.now() - cache_time >= CACHE_DURATION:
+                    return False
             
-            return False
+            for data_type in DATA_TYPES:
+                data = self.read_cache_file(data_type)
+                if data is not None:
+                    self.data[data_type] = data.get(data_type, [])
+            
+            print("✓ Данные загружены из кэша")
+            return True
             
         except Exception as e:
             print(f"Ошибка загрузки кэша: {e}")
             return False
     
+    def has_cache_file(self, data_type):
+        """Есть ли каталог в кэше (снимок или старый JSON)"""
+        return snapshot_exists(snapshot_path(data_type)) or os.path.exists(legacy_cache_path(data_type))
+    
+    def read_cache_file(self, data_type):
+        """Прочитать каталог из кэша независимо от его возраста
+        
+        Снимок отображается в память, записи декодируются при первом обращении.
+        """
+        try:
+            if snapshot_exists(snapshot_path(data_type)):
+                return {data_type: open_snapshot(snapshot_path(data_type))}
+        except Exception as e:
+            print(f"Ошибка чтения снимка кэша {data_type}: {e}")
+        
+        try:
+            cache_file = legacy_cache_path(data_type)
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Ошибка чтения кэша {data_type}: {e}")
+        return None
+    
+    def load_validators(self):
+        """Загрузить сохраненные ETag/Last-Modified каталогов"""
+        try:
+            validators_file = os.path.join(CACHE_DIR, VALIDATORS_FILE)
+            if os.path.exists(validators_file):
+                with open(validators_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Ошибка чтения валидаторов кэша: {e}")
+        return {}
+    
+    def save_validators(self, validators):
+        """Сохранить ETag/Last-Modified каталогов"""
+        try:
+            validators_file = os.path.join(CACHE_DIR, VALIDATORS_FILE)
+            with open(validators_file, 'w', encoding='utf-8') as f:
+                json.dump(validators, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Ошибка сохранения валидаторов кэша: {e}")
+    
+    def touch_cache_time(self):
+        """Отметить кэш как актуальный без перезаписи данных"""
+        try:
+            cache_time_file = os.path.join(CACHE_DIR, "cache_time.txt")
+            with open(cache_time_file, 'w') as f:
+                f.write(datetime.now().isoformat())
+        except Exception as e:
+            print(f"Ошибка сохранения времени кэша: {e}")
+    
     def save_to_cache(self, data_type, data):
         """Сохраняет данные в кэш"""
         try:
-            cache_file = os.path.join(CACHE_DIR, f"{data_type}.json")
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            write_snapshot(snapshot_path(data_type), data.get(data_type, []))
+            
+            legacy_file = legacy_cache_path(data_type)
+            if os.path.exists(legacy_file):
+                os.remove(legacy_file)
             
             cache_time_file = os.path.join(CACHE_DIR, "cache_time.txt")
             with open(cache_time_file, 'w') as f:
@@ -140,9 +349,14 @@ class JsonDataManager:
             'drivers': [],
             'news': []
         }
+        self.search_indexes = {}
     
-    def load_data(self, on_complete=None, on_failed=None, on_progress=None):
-        """Загружает данные с GitHub"""
+    def load_data(self, on_complete=None, on_failed=None, on_progress=None, on_updated=None, stale_while_revalidate=True):
+        """Загружает данные с GitHub
+        
+        При stale_while_revalidate данные из кэша отдаются сразу, а изменения
+        с сервера приходят позже в on_updated в виде разницы каталогов.
+        """
         if self.is_loading:
             return
         
@@ -156,7 +370,8 @@ class JsonDataManager:
             except:
                 pass
         
-        self.loader = DataLoader()
+        self.loader = DataLoader(stale_while_revalidate)
+        self.loader.finished.connect(self._on_finished)
         
         if on_complete:
             self.loader.loading_completed.connect(lambda data: self._on_complete(data, on_complete))
@@ -167,12 +382,14 @@ class JsonDataManager:
         if on_progress:
             self.loader.loading_progress.connect(on_progress)
         
+        self.loader.catalog_updated.connect(lambda diff: self._on_updated(diff, on_updated))
+        
         self.loader.start()
     
     def _on_complete(self, data, callback):
         """Обработка успешной загрузки"""
-        self.is_loading = False
         self.data = data
+        self.search_indexes = {}
         callback(data)
     
     def _on_failed(self, error, callback):
@@ -180,6 +397,19 @@ class JsonDataManager:
         self.is_loading = False
         callback(error)
     
+    def _on_updated(self, diff, callback):
+        """Обработка фонового обновления каталогов"""
+        for data_type, catalog_diff in diff.items():
+            self.data[data_type] = catalog_diff["items"]
+            self.search_indexes.pop(data_type, None)
+        
+        if callback:
+            callback(diff)
+    
+    def _on_finished(self):
+        """Загрузчик завершил работу, включая фоновую проверку кэша"""
+        self.is_loading = False
+    
     def get_programs(self):
         """Получить список программ"""
         return self.data.get('programs', [])
@@ -192,39 +422,43 @@ class JsonDataManager:
         """Получить список новостей"""
         return self.data.get('news', [])
     
+    def get_search_index(self, data_type):
+        """Поисковый индекс каталога, строится при первом запросе после загрузки данных"""
+        index = self.search_indexes.get(data_type)
+        if index is None:
+            index = SearchIndex(self.data.get(data_type, []), fields=SEARCH_FIELDS)
+            self.search_indexes[data_type] = index
+        return index
+    
+    def search_catalog(self, data_type, query):
+        """Элементы каталога, в названии или описании которых есть подстрока query
+        
+        Индекс отбирает элементы, где встречаются все слова запроса. Запрос из
+        одного слова индекс находит точно, у остальных подстрока целиком
+        проверяется только у отобранных элементов.
+        """
+        query = query.lower()
+        candidates = self.get_search_index(data_type).search(query)
+        if tokenize(query) == [query]:
+            return candidates
+        return [
+            item for item in candidates
+            if query in item.get('name', '').lower() or query in item.get('description', '').lower()
+        ]
+    
     def search_programs(self, query):
         """Поиск программ"""
         if not query:
             return self.get_programs()
         
-        query = query.lower()
-        results = []
-        
-        for program in self.get_programs():
-            name = program.get('name', '').lower()
-            description = program.get('description', '').lower()
-            
-            if query in name or query in description:
-                results.append(program)
-        
-        return results
+        return self.search_catalog('programs', query)
     
     def search_drivers(self, query):
         """Поиск драйверов"""
         if not query:
             return self.get_drivers()
         
-        query = query.lower()
-        results = []
-        
-        for driver in self.get_drivers():
-            name = driver.get('name', '').lower()
-            description = driver.get('description', '').lower()
-            
-            if query in name or query in description:
-                results.append(driver)
-        
-        return results
+        return self.search_catalog('drivers', query)
     
     def get_programs_by_category(self, category):
         """Получить программы по категории"""
@@ -253,7 +487,10 @@ class JsonDataManager:
     def clear_cache(self):
         """Очистить кэш"""
         try:
-            cache_files = ['programs.json', 'drivers.json', 'news.json', 'cache_time.txt']
+            for data_type in DATA_TYPES:
+                remove_snapshot(snapshot_path(data_type))
+            
+            cache_files = ['programs.json', 'drivers.json', 'news.json', 'cache_time.txt', VALIDATORS_FILE]
             for filename in cache_files:
                 cache_file = os.path.join(CACHE_DIR, filename)
                 if os.path.exists(cache_file):
@@ -265,7 +502,7 @@ class JsonDataManager:
     def force_reload(self, on_complete=None, on_failed=None, on_progress=None):
         """Принудительная перезагрузка"""
         self.clear_cache()
-        self.load_data(on_complete, on_failed, on_progress)
+        self.load_data(on_complete, on_failed, on_progress, stale_while_revalidate=False)
 
 _json_manager = None
 
@@ -9,6 +9,7 @@ from splash_screen import SplashScreen
 from main_window import MainWindow
 from temp_manager import get_temp_manager
 from json_data_manager import get_json_manager
+from resource_path import watch_resources_if_requested
 
 
 def is_admin():
@@ -111,6 +112,7 @@ if __name__ == "__main__":
         cleanup_and_exit()
     
     app.aboutToQuit.connect(cleanup_shared_memory)
+    watch_resources_if_requested()
     
     print("Инициализация temp_manager...")
     temp_manager = get_temp_manager()
@@ -168,11 +170,19 @@ if __name__ == "__main__":
         def on_progress(message, percent):
             print(f"Загрузка: {message} ({percent}%)")
         
+        def on_data_updated(diff):
+            try:
+                window.on_catalog_updated(diff)
+            except Exception as e:
+                print(f"Ошибка применения обновления данных: {e}")
+                traceback.print_exc()
+        
         try:
             json_manager.load_data(
                 on_complete=on_data_loaded,
                 on_failed=on_data_failed,
-                on_progress=on_progress
+                on_progress=on_progress,
+                on_updated=on_data_updated
             )
         except Exception as e:
             print(f"Ошибка запуска загрузки данных: {e}")
@@ -8,7 +8,7 @@ from datetime import datetime
 from urllib.parse import urlparse
 from PyQt6.QtWidgets import (QMainWindow, QLabel, QPushButton, QVBoxLayout, QWidget, 
                              QHBoxLayout, QTabWidget, QFrame, QScrollArea, QProgressBar, 
-                             QGraphicsOpacityEffect, QApplication, QMessageBox)
+                             QGraphicsOpacityEffect, QApplication, QMessageBox, QMenu)
 from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QPixmap, QIcon, QGuiApplication
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, QTimer, pyqtSignal, pyqtProperty, QSize
 from news_tab import NewsTab
@@ -16,11 +16,13 @@ from programs_tab import ProgramsTab
 from drivers_tab import DriversTab
 from downloads_tab import DownloadsTab
 from resource_path import resource_path, get_icon_path, get_db_path
+from image_helper import load_icon_file, get_pixmap_cache
 from temp_manager import get_temp_manager
 from json_data_manager import get_json_manager
 from loading_widget import LoadingWidget, NoInternetWidget
 from scroll_helper import configure_scroll_area
 from notification_manager import get_notification_manager
+from download_scheduler import get_download_scheduler, PRIORITY_USER, STATE_QUEUED, STATE_ACTIVE, STATE_PAUSED, STATE_FINISHED
 
 
 class SettingsTab(QWidget):
@@ -53,17 +55,9 @@ class SettingsTab(QWidget):
 
     def load_icon_pixmap(self, icon_name, size=None):
         """Загрузить иконку с правильным путем для exe"""
-        icon_path = get_icon_path(icon_name)
-        
-        if icon_path:
-            pixmap = QPixmap(icon_path)
-            
-            if not pixmap.isNull() and size:
-                scaled = pixmap.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                return scaled
-            return pixmap
-        
-        return QPixmap()  
+        from image_helper import load_icon_image
+        pixmap = load_icon_image(icon_name, size)
+        return pixmap if pixmap else QPixmap()
 
     def create_icon_label(self, icon_name, size=(24, 24), fallback_text="•"):
         """Создать QLabel с иконкой и fallback текстом"""
@@ -141,7 +135,7 @@ class SettingsTab(QWidget):
         try:
             icon_path = get_icon_path(icon_name)
             if icon_path:
-                pixmap = QPixmap(icon_path)
+                pixmap = load_icon_file(icon_path)
                 if not pixmap.isNull():
                     icon = QIcon(pixmap)
                     btn.setIcon(icon)
@@ -697,7 +691,7 @@ class SettingsTab(QWidget):
             try:
                 icon_path = get_icon_path(icon)
                 if icon_path:
-                    pixmap = QPixmap(icon_path)
+                    pixmap = load_icon_file(icon_path)
                     if not pixmap.isNull():
                         scaled_pixmap = pixmap.scaled(28, 28, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                         icon_label.setPixmap(scaled_pixmap)
@@ -1503,7 +1497,7 @@ class SettingsTab(QWidget):
                     import traceback
                     traceback.print_exc()
             
-            manager.load_data(on_complete=on_complete, on_failed=on_failed)
+            manager.load_data(on_complete=on_complete, on_failed=on_failed, stale_while_revalidate=False)
             
         except Exception as e:
             print(f"Ошибка в force_data_update: {e}")
@@ -2422,6 +2416,9 @@ class MainWindow(QMainWindow):
         self.downloads_panel = None
         self.current_downloads = []
         
+        self.download_scheduler = get_download_scheduler()
+        self.download_scheduler.queue_changed.connect(self.update_queue_states)
+        
         self.downloads_count_label = None
         self.create_downloads_count_indicator()
         
@@ -2465,17 +2462,9 @@ class MainWindow(QMainWindow):
 
     def load_icon_pixmap(self, icon_name, size=None):
         """Загрузить иконку с правильным путем для exe"""
-        icon_path = get_icon_path(icon_name)
-        
-        if icon_path:
-            pixmap = QPixmap(icon_path)
-            
-            if not pixmap.isNull() and size:
-                scaled = pixmap.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                return scaled
-            return pixmap
-        
-        return QPixmap()  
+        from image_helper import load_icon_image
+        pixmap = load_icon_image(icon_name, size)
+        return pixmap if pixmap else QPixmap()
 
     def update_snow_widget_size(self):
         """Обновить размер виджета снежинок под размер окна"""
@@ -2932,8 +2921,8 @@ class MainWindow(QMainWindow):
             
             self.hide_downloads_panel()
     
-    def add_download(self, program_name, download_url, icon_path=None, file_type="program"):
-        """Добавить новую загрузку"""
+    def add_download(self, program_name, download_url, icon_path=None, file_type="program", priority=PRIORITY_USER, size_hint=None):
+        """Добавить новую загрузку в очередь планировщика"""
         if self.downloads_panel:
             self.downloads_panel.deleteLater()
             self.downloads_panel = None
@@ -2946,6 +2935,15 @@ class MainWindow(QMainWindow):
         
         self.update_downloads_count()
         
+        self.download_scheduler.enqueue(download_item, priority, size_hint)
+        if not size_hint and download_item.queue_state == STATE_QUEUED:
+            download_item.probe_size()
+    
+    def update_queue_states(self):
+        """Обновить надписи ожидающих загрузок после изменения очереди"""
+        for download in self.current_downloads:
+            download.update_queue_state()
+        
     def remove_download(self, download_item):
         """Удалить загрузку из списка"""
         if download_item in self.current_downloads:
@@ -3110,6 +3108,8 @@ class MainWindow(QMainWindow):
         """Обработка успешной загрузки данных"""
         
         self.data_loaded = True
+        # Ссылки на логотипы могли исправить - неудачные загрузки пробуем заново
+        get_pixmap_cache().forget_failures()
         
         if hasattr(self, 'programs_tab'):
             self.programs_tab.set_data(data.get('programs', []))
@@ -3129,6 +3129,25 @@ class MainWindow(QMainWindow):
         # Автоматическое сканирование системы
         self.start_auto_scan_if_needed()
     
+    def on_catalog_updated(self, diff):
+        """Каталоги обновились в фоне после показа данных из кэша"""
+        
+        get_pixmap_cache().forget_failures()
+        
+        if 'programs' in diff and hasattr(self, 'programs_tab'):
+            self.programs_tab.apply_catalog_diff(diff['programs'])
+        
+        if 'drivers' in diff and hasattr(self, 'drivers_tab'):
+            self.drivers_tab.apply_catalog_diff(diff['drivers'])
+        
+        if 'news' in diff and hasattr(self, 'news_tab'):
+            self.news_tab.apply_catalog_diff(diff['news'])
+        
+        if hasattr(self, 'update_last_update_time'):
+            self.update_last_update_time()
+        
+        print("✓ Обновления каталогов переданы в интерфейс")
+    
     def on_data_failed(self, error):
         """Обработка ошибки загрузки данных"""
         
@@ -3201,11 +3220,31 @@ class MainWindow(QMainWindow):
             drivers_data = getattr(self.drivers_tab, 'all_drivers', [])
             
             if programs_data or drivers_data:
-                from system_scanner import BackgroundScanner
-                self.background_scanner = BackgroundScanner(programs_data, drivers_data)
+                background_scanner = getattr(self, 'background_scanner', None)
+                if background_scanner is not None and background_scanner.isRunning():
+                    return
+                
+                from system_scanner import BackgroundScanner, InstallationStatusManager
+                # Один менеджер на все автосканирования: после первого полного
+                # сканирования следующие перечитывают только изменения
+                if getattr(self, 'scan_status_manager', None) is None:
+                    self.scan_status_manager = InstallationStatusManager()
+                self.background_scanner = BackgroundScanner(programs_data, drivers_data,
+                                                            status_manager=self.scan_status_manager)
+                self.background_scanner.source_scanned.connect(self.on_background_source_scanned)
                 self.background_scanner.scan_completed.connect(self.on_background_scan_completed)
                 self.background_scanner.start()
     
+    def on_background_source_scanned(self, source, programs_status, drivers_status):
+        """Показ найденного по мере готовности источников фонового сканирования"""
+        if programs_status and hasattr(self, 'programs_tab') and hasattr(self.programs_tab, 'status_manager'):
+            self.programs_tab.status_manager.apply_partial_statuses(programs_status, {})
+            self.programs_tab.programs_grid.refresh()
+        
+        if drivers_status and hasattr(self, 'drivers_tab') and hasattr(self.drivers_tab, 'status_manager'):
+            self.drivers_tab.status_manager.apply_partial_statuses({}, drivers_status)
+            self.drivers_tab.drivers_grid.refresh()
+    
     def on_background_scan_completed(self, programs_status, drivers_status, summary):
         """Обработка завершения фонового сканирования"""
         print(f"Автосканирование завершено: программ {summary['programs_found']}, драйверов {summary['drivers_found']}")
@@ -3220,10 +3259,12 @@ class MainWindow(QMainWindow):
         # Обновляем отображение в вкладках
         if hasattr(self, 'programs_tab'):
             self.programs_tab.display_programs()
+            self.programs_tab.programs_grid.refresh()
             self.programs_tab.update()  # Принудительное обновление виджета
         
         if hasattr(self, 'drivers_tab'):
             self.drivers_tab.display_drivers()
+            self.drivers_tab.drivers_grid.refresh()
             self.drivers_tab.update()  # Принудительное обновление виджета
 
 
@@ -3237,6 +3278,11 @@ class DownloadItem:
         self.icon_path = icon_path
         self.file_type = file_type
         self.download_thread = None
+        self.stopping_thread = None
+        self.start_pending = False
+        self.discard_pending = False
+        self.size_probe = None
+        self.partial_file_path = None
         self.widget = None
         self.progress_bar = None
         self.info_label = None
@@ -3245,10 +3291,12 @@ class DownloadItem:
         self.size_label = None
         self.start_time = None
         self.downloaded_file_path = None
+        self.pause_button = None
+        self.move_button = None
+        self.queue_state = STATE_QUEUED
         self.notification_manager = get_notification_manager()
         
         self.create_widget()
-        self.start_download()
 
     def create_widget(self):
         """Создание виджета элемента загрузки"""
@@ -3289,7 +3337,7 @@ class DownloadItem:
         
         icon_path = get_icon_path("opensize.png")
         if icon_path:
-            pixmap = QPixmap(icon_path)
+            pixmap = load_icon_file(icon_path)
             if not pixmap.isNull():
                 icon = QIcon(pixmap)
                 self.open_button.setIcon(icon)
@@ -3316,13 +3364,47 @@ class DownloadItem:
         self.open_button.hide()
         header_layout.addWidget(self.open_button)
         
+        self.pause_button = QPushButton("⏸")
+        self.pause_button.setFixedSize(24, 24)
+        self.pause_button.setToolTip("Приостановить / продолжить")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.pause_button.setStyleSheet("""
+            QPushButton {
+                font-size: 11px;
+                padding: 0px;
+                border-radius: 12px;
+                background-color: #4a4a4a;
+                color: #ffffff;
+                border: none;
+                margin-left: 5px;
+                min-width: 24px;
+                max-width: 24px;
+                min-height: 24px;
+                max-height: 24px;
+            }
+            QPushButton:hover {
+                background-color: #555555;
+            }
+        """)
+        header_layout.addWidget(self.pause_button)
+        
+        self.move_button = QPushButton("⤒")
+        self.move_button.setFixedSize(24, 24)
+        self.move_button.setToolTip("Скачать следующим")
+        self.move_button.clicked.connect(self.move_to_front)
+        self.move_button.setStyleSheet(self.pause_button.styleSheet())
+        header_layout.addWidget(self.move_button)
+        
+        self.widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.widget.customContextMenuRequested.connect(self.show_queue_menu)
+        
         self.cancel_button = QPushButton()
         self.cancel_button.setFixedSize(24, 24)
         self.cancel_button.clicked.connect(self.cancel_download)
         
         icon_path = get_icon_path("closemenu.png")
         if icon_path:
-            pixmap = QPixmap(icon_path)
+            pixmap = load_icon_file(icon_path)
             if not pixmap.isNull():
                 icon = QIcon(pixmap)
                 self.cancel_button.setIcon(icon)
@@ -3366,7 +3448,7 @@ class DownloadItem:
         file_icon = QLabel()
         icon_path = get_icon_path("file.png")
         if icon_path:
-            pixmap = QPixmap(icon_path)
+            pixmap = load_icon_file(icon_path)
             if not pixmap.isNull():
                 scaled_pixmap = pixmap.scaled(12, 12, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                 file_icon.setPixmap(scaled_pixmap)
@@ -3434,7 +3516,7 @@ class DownloadItem:
             }
         """)
         self.info_label.setTextFormat(Qt.TextFormat.RichText)
-        self.set_info_text("Подготовка к скачиванию...", "preparation")
+        self.set_info_text("В очереди...", "preparation")
         layout.addWidget(self.info_label)
         
         self.size_label = QLabel("")
@@ -3453,14 +3535,15 @@ class DownloadItem:
         """Установить текст с иконкой для info_label"""
         icon_path = get_icon_path(f"{icon_name}.png")
         if icon_path:
-            pixmap = QPixmap(icon_path)
+            pixmap = load_icon_file(icon_path)
             if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(12, 12, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                
                 temp_manager = get_temp_manager()
                 temp_path = temp_manager.get_temp_file_path(f"{icon_name}_temp.png")
                 
-                scaled_pixmap.save(temp_path)
+                # Файл иконки для HTML пишется один раз, дальше переиспользуется
+                if not os.path.exists(temp_path):
+                    scaled_pixmap = pixmap.scaled(12, 12, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                    scaled_pixmap.save(temp_path)
                 self.info_label.setText(f'<img src="{temp_path}" width="12" height="12" style="vertical-align: middle; margin-right: 3px;"> {text}')
             else:
                 emoji_map = {
@@ -3488,10 +3571,100 @@ class DownloadItem:
             }
             emoji = emoji_map.get(icon_name, "•")
             self.info_label.setText(f"{emoji} {text}")
+
+    def update_queue_state(self):
+        """Показать состояние элемента в очереди планировщика"""
+        if not self.info_label:
+            return
+        
+        try:
+            if self.move_button:
+                self.move_button.setVisible(self.queue_state == STATE_QUEUED)
+            if self.queue_state == STATE_QUEUED:
+                position = self.parent_window.download_scheduler.queue_position(self)
+                self.set_info_text(f"В очереди (№{position})" if position else "В очереди...", "preparation")
+            elif self.queue_state == STATE_PAUSED:
+                self.set_info_text("Приостановлено", "time")
+        except RuntimeError:
+            pass
+    
+    def toggle_pause(self):
+        """Приостановить или продолжить загрузку через планировщик"""
+        scheduler = self.parent_window.download_scheduler
+        if self.queue_state == STATE_PAUSED:
+            self.pause_button.setText("⏸")
+            scheduler.resume(self)
+        else:
+            self.pause_button.setText("▶")
+            scheduler.pause(self)
+        self.update_queue_state()
+    
+    def move_to_front(self):
+        """Поднять загрузку в начало очереди"""
+        self.parent_window.download_scheduler.move_to_front(self)
+    
+    def move_in_queue(self, offset):
+        """Сдвинуть загрузку в очереди (отрицательное смещение - вперёд)"""
+        self.parent_window.download_scheduler.move(self, offset)
+    
+    def show_queue_menu(self, position):
+        """Меню перестановки ожидающей загрузки"""
+        if self.queue_state != STATE_QUEUED or not self.widget:
+            return
+        
+        menu = QMenu(self.widget)
+        menu.addAction("Скачать следующим", self.move_to_front)
+        menu.addAction("Поднять в очереди", lambda: self.move_in_queue(-1))
+        menu.addAction("Опустить в очереди", lambda: self.move_in_queue(1))
+        menu.exec(self.widget.mapToGlobal(position))
+    
+    def probe_size(self):
+        """Узнать размер файла, пока загрузка ждет в очереди, чтобы планировщик учел его"""
+        from download_manager import SizeProbeThread
+        self.size_probe = SizeProbeThread(self.download_url)
+        self.size_probe.size_found.connect(
+            lambda size: self.parent_window.download_scheduler.update_size_hint(self, size))
+        self.size_probe.start()
+    
+    def pause_download(self):
+        """Остановить поток загрузки, сохранив недокачанный файл для продолжения
+        
+        Окно не ждет поток: он завершается сам после отмены, а повторный запуск
+        этой загрузки откладывается до его сигнала finished.
+        """
+        self.start_pending = False
+        thread = self.download_thread
+        self.download_thread = None
+        if thread and thread.isRunning():
+            thread.cancel()
+            self.stopping_thread = thread
+            thread.finished.connect(lambda: self.on_thread_stopped(thread))
+            if thread.isFinished():
+                self.on_thread_stopped(thread)
+    
+    def on_thread_stopped(self, thread):
+        """Остановленный поток завершился: удалить файл отмененной загрузки или продолжить ее"""
+        if self.stopping_thread is not thread:
+            return
+        self.stopping_thread = None
+        
+        if self.discard_pending:
+            self.discard_pending = False
+            from download_manager import DownloadThread
+            DownloadThread.discard_partial_file(self.partial_file_path)
+        elif self.start_pending:
+            self.start_pending = False
+            self.start_download()
+    
     def start_download(self):
         """Запуск скачивания"""
+        if self.stopping_thread is not None:
+            # Прежний поток еще дописывает журнал того же файла
+            self.start_pending = True
+            return
         
         self.start_time = time.time()
+        self.set_info_text("Подготовка к скачиванию...", "preparation")
         
         parsed_url = urlparse(self.download_url)
         filename = os.path.basename(parsed_url.path)
@@ -3505,6 +3678,7 @@ class DownloadItem:
             DownloadThread = download_manager.DownloadThread
             
             self.download_thread = DownloadThread(self.download_url, filename)
+            self.partial_file_path = self.download_thread.file_path
             self.download_thread.progress_updated.connect(self.update_progress)
             self.download_thread.download_finished.connect(self.download_completed)
             self.download_thread.download_error.connect(self.download_failed)
@@ -3516,7 +3690,7 @@ class DownloadItem:
 
     def update_progress(self, percent, speed, size):
         """Обновление прогресса"""
-        if not self.progress_bar or not self.info_label:
+        if not self.progress_bar or not self.info_label or self.queue_state != STATE_ACTIVE:
             return
         
         try:
@@ -3544,11 +3718,15 @@ class DownloadItem:
 
     def download_completed(self, file_path):
         """Скачивание завершено"""
+        self.parent_window.download_scheduler.job_finished(self)
+        
         if not self.progress_bar or not self.info_label or not self.cancel_button:
             return
         
         try:
             self.progress_bar.setValue(100)
+            if self.pause_button:
+                self.pause_button.hide()
             
             try:
                 from downloads_manager import get_downloads_manager
@@ -3592,10 +3770,14 @@ class DownloadItem:
 
     def download_failed(self, error):
         """Ошибка скачивания"""
+        self.parent_window.download_scheduler.job_finished(self)
+        
         if not self.info_label or not self.cancel_button:
             return
         
         try:
+            if self.pause_button:
+                self.pause_button.hide()
             short_error = error.split('\n')[0] if '\n' in error else error
             if len(short_error) > 50:
                 short_error = short_error[:47] + "..."
@@ -3611,7 +3793,7 @@ class DownloadItem:
             
             icon_path = get_icon_path("closemenu.png")
             if icon_path:
-                pixmap = QPixmap(icon_path)
+                pixmap = load_icon_file(icon_path)
                 if not pixmap.isNull():
                     icon = QIcon(pixmap)
                     self.cancel_button.setIcon(icon)
@@ -3698,7 +3880,7 @@ class DownloadItem:
             
             icon_path = get_icon_path("delete.png")
             if icon_path:
-                pixmap = QPixmap(icon_path)
+                pixmap = load_icon_file(icon_path)
                 if not pixmap.isNull():
                     icon = QIcon(pixmap)
                     self.cancel_button.setIcon(icon)
@@ -3780,11 +3962,18 @@ class DownloadItem:
         QTimer.singleShot(1000, self.remove_from_list)
 
     def cancel_download(self):
-        """Отмена загрузки"""
-        if self.download_thread and self.download_thread.isRunning():
-            self.download_thread.terminate()
-            self.download_thread.wait()
+        """Отмена загрузки: поток останавливается, недокачанный файл и журнал удаляются"""
+        unfinished = self.queue_state != STATE_FINISHED
+        self.pause_download()
+        
+        if unfinished and self.partial_file_path:
+            if self.stopping_thread is not None:
+                self.discard_pending = True
+            else:
+                from download_manager import DownloadThread
+                DownloadThread.discard_partial_file(self.partial_file_path)
         
+        self.parent_window.download_scheduler.remove(self)
         self.remove_from_list()
 
     def remove_from_list(self):
@@ -3811,14 +4000,15 @@ class DownloadItem:
         """Получить HTML код для иконки"""
         icon_path = get_icon_path(f"{icon_name}.png")
         if icon_path:
-            pixmap = QPixmap(icon_path)
+            pixmap = load_icon_file(icon_path)
             if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                
                 temp_manager = get_temp_manager()
                 temp_path = temp_manager.get_temp_file_path(f"{icon_name}_{size}_temp.png")
                 
-                scaled_pixmap.save(temp_path)
+                # Файл иконки для HTML пишется один раз, дальше переиспользуется
+                if not os.path.exists(temp_path):
+                    scaled_pixmap = pixmap.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                    scaled_pixmap.save(temp_path)
                 return f'<img src="{temp_path}" width="{size}" height="{size}" style="vertical-align: middle; margin-right: 3px;">'
             else:
                 emoji_map = {
@@ -112,6 +112,10 @@ class NewsTab(QWidget):
         self.news_data = news_data
         self.load_news_from_data()
 
+    def apply_catalog_diff(self, diff):
+        """Применить фоновое обновление новостей"""
+        self.set_data(diff["items"])
+
     def load_news_from_data(self):
         """Загрузка новостей из данных"""
         try:
@@ -0,0 +1,85 @@
+"""Заглушка PowerShell с протоколом powershell_worker для проверки без Windows
+
+Отвечает на запросы готовыми данными по имени класса WMI в команде
+(Win32_VideoController, Win32_Processor, Win32_PnPSignedDriver); данные можно
+заменить JSON файлом {класс: [объекты]} из UTILHELP_POWERSHELL_STUB_DATA.
+Для проверки таймаутов и перезапуска понимает "Start-Sleep -Seconds N",
+"exit" и "throw 'текст'".
+
+    UTILHELP_POWERSHELL=powershell_stub.py python main.py
+    python powershell_stub.py -Command "<команда>"    (один запрос, как прежний запуск powershell)
+"""
+import json
+import os
+import re
+import sys
+import time
+
+
+STUB_DATA_ENV = "UTILHELP_POWERSHELL_STUB_DATA"
+
+DEFAULT_DATA = {
+    "Win32_VideoController": ["NVIDIA GeForce RTX 3060", "Intel(R) UHD Graphics 770"],
+    "Win32_Processor": ["12th Gen Intel(R) Core(TM) i5-12400"],
+    "Win32_PnPSignedDriver": [
+        {"DeviceName": "NVIDIA GeForce RTX 3060", "DriverVersion": "31.0.15.5222", "DriverDate": "20240301000000.******+***"},
+        {"DeviceName": "Realtek High Definition Audio", "DriverVersion": "6.0.9549.1", "DriverDate": "20230712000000.******+***"},
+        {"DeviceName": "Intel(R) Ethernet Connection I219-V", "DriverVersion": "12.19.2.45", "DriverDate": "20221104000000.******+***"},
+    ],
+}
+
+
+def load_data():
+    path = os.environ.get(STUB_DATA_ENV)
+    if not path:
+        return DEFAULT_DATA
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_command(command, data):
+    """Вывод команды (список) или исключение, как у Invoke-Expression"""
+    command = command.strip()
+    if command == "exit":
+        sys.exit(0)
+
+    match = re.match(r"Start-Sleep\s+-Seconds\s+([\d.]+)", command)
+    if match:
+        time.sleep(float(match.group(1)))
+        return []
+
+    match = re.match(r"throw\s+['\"](.*)['\"]", command)
+    if match:
+        raise RuntimeError(match.group(1))
+
+    for wmi_class, objects in data.items():
+        if wmi_class in command:
+            return list(objects)
+    raise RuntimeError(f"Неизвестная команда заглушки: {command}")
+
+
+def serve(data):
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            response = {"id": request["id"], "ok": True, "result": run_command(request["command"], data)}
+        except RuntimeError as e:
+            response = {"id": request["id"], "ok": False, "error": str(e)}
+        sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+def main(argv):
+    data = load_data()
+    if len(argv) >= 2 and argv[0] == "-Command":
+        print(json.dumps(run_command(argv[1], data), ensure_ascii=False))
+        return
+    serve(data)
+
+
+if __name__ == "__main__":
+    sys.stdin.reconfigure(encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8')
+    main(sys.argv[1:])
@@ -0,0 +1,237 @@
+"""Общий долгоживущий процесс PowerShell для запросов WMI/CIM
+
+Вместо запуска powershell на каждый запрос (сотни миллисекунд и больше на
+старт) один процесс PowerShell выполняет команды в цикле. Обмен - по строкам
+stdin/stdout, каждая строка - один JSON объект:
+    запрос  {"id": 1, "command": "Get-CimInstance ..."}
+    ответ   {"id": 1, "ok": true, "result": [объекты вывода команды]}
+            {"id": 1, "ok": false, "error": "текст ошибки"}
+
+Запросы выполняются по одному; таймаут запроса включает ожидание очереди и
+запуск процесса. Если ответа нет дольше таймаута, процесс завершается и при
+следующем запросе запускается заново - кроме только что запущенного процесса:
+он продолжает запускаться, а опоздавший ответ отбрасывается по id. Если
+процесс завершился сам, запрос повторяется один раз в новом процессе.
+
+Переменная окружения UTILHELP_POWERSHELL задает другой исполняемый файл,
+например pwsh или powershell_stub.py (заглушка с тем же протоколом для
+проверки без Windows).
+"""
+import atexit
+import base64
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from temp_manager import debug_log
+
+
+POWERSHELL_ENV = "UTILHELP_POWERSHELL"
+POWERSHELL_EXECUTABLE = "powershell"
+
+QUERY_TIMEOUT = 30
+STOP_TIMEOUT = 2
+
+# Цикл обработки запросов внутри PowerShell; вывод команды всегда массив
+WORKER_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+$utf8 = New-Object System.Text.UTF8Encoding $false
+[Console]::InputEncoding = $utf8
+[Console]::OutputEncoding = $utf8
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    if (-not $line.Trim()) { continue }
+    $request = $line | ConvertFrom-Json
+    try {
+        $result = @(Invoke-Expression $request.command)
+        $response = @{ id = $request.id; ok = $true; result = $result }
+    } catch {
+        $response = @{ id = $request.id; ok = $false; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine(($response | ConvertTo-Json -Compress -Depth 5))
+    [Console]::Out.Flush()
+}
+"""
+
+
+class PowerShellError(Exception):
+    """Ошибка выполнения команды или работы процесса PowerShell"""
+    pass
+
+
+class PowerShellTimeout(PowerShellError):
+    """Команда не ответила за отведенное время"""
+    pass
+
+
+class PowerShellExited(PowerShellError):
+    """Процесс PowerShell завершился, не ответив"""
+    pass
+
+
+def worker_command_line():
+    """Командная строка процесса: PowerShell со скриптом цикла или заглушка из UTILHELP_POWERSHELL"""
+    executable = os.environ.get(POWERSHELL_ENV) or POWERSHELL_EXECUTABLE
+    if executable.endswith(".py"):
+        return [sys.executable, executable]
+
+    encoded_script = base64.b64encode(WORKER_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return [executable, "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+            "-EncodedCommand", encoded_script]
+
+
+class PowerShellWorker:
+    """Процесс PowerShell, выполняющий команды по запросу"""
+
+    def __init__(self, command_line=None, timeout=QUERY_TIMEOUT):
+        self.command_line = command_line or worker_command_line()
+        self.timeout = timeout
+        self.process = None
+        self.responses = None
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.starts = 0
+
+    def start(self):
+        try:
+            self.process = subprocess.Popen(
+                self.command_line,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+            )
+        except OSError as e:
+            self.process = None
+            raise PowerShellError(f"Не удалось запустить PowerShell: {e}")
+
+        self.starts += 1
+        self.responses = queue.Queue()
+        threading.Thread(
+            target=self.read_responses, args=(self.process, self.responses), daemon=True
+        ).start()
+        debug_log(f"PowerShell: запущен процесс {self.process.pid} (запуск {self.starts})")
+
+    @staticmethod
+    def read_responses(process, responses):
+        """Чтение ответов в отдельном потоке, чтобы ожидание ответа можно было прервать по таймауту"""
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                # Посторонний вывод (предупреждения PowerShell) пропускается
+                continue
+        responses.put(None)
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def kill(self):
+        if self.process is None:
+            return
+        try:
+            self.process.kill()
+            self.process.wait()
+        except OSError:
+            pass
+        self.process = None
+
+    def stop(self):
+        """Завершить процесс: закрытый stdin завершает цикл PowerShell"""
+        # Если запрос еще выполняется (например, при выходе из программы), процесс просто завершается
+        if not self.lock.acquire(timeout=STOP_TIMEOUT):
+            self.kill()
+            return
+        try:
+            if self.process is None:
+                return
+            self.process.stdin.close()
+            self.process.wait(timeout=STOP_TIMEOUT)
+            self.process = None
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+        finally:
+            self.lock.release()
+
+    def query(self, command: str, timeout: float = None) -> list:
+        """Выполнить команду и вернуть ее вывод (список объектов)
+
+        Если процесс занят другим запросом дольше timeout, поднимается PowerShellTimeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        if not self.lock.acquire(timeout=timeout):
+            raise PowerShellTimeout(f"PowerShell занят другим запросом дольше {timeout:.0f} с")
+        try:
+            try:
+                return self.send(command, deadline)
+            except PowerShellExited as e:
+                debug_log(f"PowerShell: {e}, перезапуск")
+                return self.send(command, deadline)
+        finally:
+            self.lock.release()
+
+    def send(self, command: str, deadline: float) -> list:
+        cold_start = not self.is_running()
+        if cold_start:
+            self.start()
+
+        self.next_id += 1
+        request_id = self.next_id
+        try:
+            self.process.stdin.write(json.dumps({"id": request_id, "command": command}) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            self.kill()
+            raise PowerShellExited("процесс PowerShell не принимает запросы")
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Медленно стартующий процесс не перезапускается: следующий запрос застанет его готовым
+                if not cold_start:
+                    self.kill()
+                raise PowerShellTimeout("PowerShell не ответил вовремя")
+            try:
+                response = self.responses.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            if response is None:
+                self.kill()
+                raise PowerShellExited("процесс PowerShell завершился")
+            if response.get("id") != request_id:
+                continue
+            if not response.get("ok"):
+                raise PowerShellError(response.get("error") or "неизвестная ошибка PowerShell")
+            return response.get("result") or []
+
+
+_powershell_worker = None
+_powershell_worker_lock = threading.Lock()
+
+def get_powershell_worker():
+    """Получить общий процесс PowerShell программы (запускается при первом запросе)"""
+    global _powershell_worker
+    with _powershell_worker_lock:
+        if _powershell_worker is None:
+            _powershell_worker = PowerShellWorker()
+            atexit.register(_powershell_worker.stop)
+    return _powershell_worker
+
+
+def query(command: str, timeout: float = None) -> list:
+    """Выполнить команду в общем процессе PowerShell"""
+    return get_powershell_worker().query(command, timeout)
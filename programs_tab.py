@@ -1,11 +1,16 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QScrollArea, QPushButton, QHBoxLayout, QFrame, QGridLayout, QLineEdit, QDialog, QGraphicsOpacityEffect, QComboBox, QListWidget, QListWidgetItem
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QScrollArea, QPushButton, QHBoxLayout, QFrame, QLineEdit, QDialog, QGraphicsOpacityEffect, QComboBox, QListWidget, QListWidgetItem, QApplication
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, pyqtSignal, QThread
-from PyQt6.QtGui import QPixmap
 from scroll_helper import configure_scroll_area
 from download_manager import InstallationManager, CustomMessageBox
+from download_scheduler import PRIORITY_USER, catalog_size_hint
 from resource_path import get_db_path
 from scroll_helper import configure_scroll_area
 from favorites_manager import FavoritesManager
+from search_index import SearchIndex
+from search_pipeline import SearchPipeline, sort_by_name
+from card_grid import VirtualCardGrid
+from image_helper import get_image_loader, SOURCE_PROGRAM
+from styles import install_style_sheet, set_style_class, set_style_state
 from system_scanner import CachedInstallationStatusManager, BackgroundScanner
 
 
@@ -545,10 +550,9 @@ class ProgramInfoPanel(QWidget):
         self.title_label.setText(program["name"])
         
         from image_helper import load_program_image
-        pixmap = load_program_image(program["logo"])
+        pixmap = load_program_image(program["logo"], (100, 100))
         if pixmap and not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            self.logo_label.setPixmap(scaled_pixmap)
+            self.logo_label.setPixmap(pixmap)
         else:
             self.logo_label.setText("📦")  
         
@@ -605,15 +609,17 @@ class ProgramInfoPanel(QWidget):
         else:
             download_url = program.get("url", "")
             if download_url:
-                from resource_path import get_program_image_path
-                icon_path = get_program_image_path(program.get("logo", ""))
+                from image_helper import get_program_image_file
+                icon_path = get_program_image_file(program.get("logo", ""))
                 
                 InstallationManager.install_program(
                     program["name"], 
                     download_url, 
                     self, 
                     icon_path, 
-                    "program"
+                    "program",
+                    PRIORITY_USER,
+                    catalog_size_hint(program)
                 )
             else:
                 CustomMessageBox.warning(self, "Ошибка", 
@@ -679,6 +685,7 @@ class ProgramsTab(QWidget):
         
         self.all_programs = []
         self.filtered_programs = []
+        self.search_index = SearchIndex([])
         self.current_program = None
         self.current_columns = 3  
         self.favorites_manager = FavoritesManager()
@@ -748,7 +755,7 @@ class ProgramsTab(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Поиск программ...")
-        self.search_input.textChanged.connect(self.filter_programs)
+        self.search_input.textChanged.connect(self.schedule_filter)
         self.search_input.setFixedHeight(35)
         self.search_input.setStyleSheet("""
             QLineEdit {
@@ -845,12 +852,15 @@ class ProgramsTab(QWidget):
             }
         """)
         
-        self.programs_content = QWidget()
-        self.programs_grid = QGridLayout(self.programs_content)
-        self.programs_grid.setContentsMargins(55, 10, 45, 10)  
-        self.programs_grid.setHorizontalSpacing(120)  
-        self.programs_grid.setVerticalSpacing(50)     
-        self.programs_grid.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.programs_grid = VirtualCardGrid(
+            self.scroll_area, self.create_program_card, self.bind_program_card,
+            unbind_card=get_image_loader().cancel
+        )
+        # Стили карточек - классы из общей таблицы, а не QSS у каждого виджета
+        install_style_sheet(self.programs_grid)
+        # Картинка по ссылке обновилась на сервере - перерисовываем видимые карточки
+        get_image_loader().image_changed.connect(lambda source, name: self.programs_grid.refresh())
+        self.programs_content = self.programs_grid
         
         self.programs_data = []
         
@@ -858,6 +868,11 @@ class ProgramsTab(QWidget):
         self.layout.addWidget(self.scroll_area)
         
         self.info_panel = ProgramInfoPanel(self)
+        
+        self.search_pipeline = SearchPipeline(
+            self.match_programs, self.rank_programs, self.apply_search_results, name="Поиск программ"
+        )
+        QApplication.instance().aboutToQuit.connect(self.search_pipeline.shutdown)
 
     def set_data(self, programs_data):
         """Установить данные программ из JSON"""
@@ -894,69 +909,42 @@ class ProgramsTab(QWidget):
         for category in sorted(categories_set):
             self.category_filter.addItem(category, category)
         
-        self.filtered_programs = self.all_programs.copy()
+        # Индекс строится по алфавиту: при равной оценке результаты идут по названию
+        self.search_index = SearchIndex(sort_by_name(self.all_programs))
+        self.filtered_programs = list(self.search_index.items)
+        # Результат поиска по прежним данным уже не нужен
+        self.search_pipeline.cancel()
         
         self.display_programs()
 
     def display_programs(self):
         """Отображение программ в виде сетки"""
-        for i in reversed(range(self.programs_grid.count())):
-            child = self.programs_grid.itemAt(i).widget()
-            if child:
-                child.setParent(None)
-        
         window_width = self.width()
         if window_width >= 1600:  
             columns = 4
         else:  
             columns = 3
         
-        sorted_programs = sorted(self.filtered_programs, key=lambda x: x.get('name', '').lower())
-        
-        row = 0
-        col = 0
-        for program in sorted_programs:
-            card = self.create_program_card(program)
-            self.programs_grid.addWidget(card, row, col)
-            
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
+        self.programs_grid.set_columns(columns)
+        self.programs_grid.set_items(self.filtered_programs)
 
-    def create_program_card(self, program):
-        """Создание квадратной карточки программы"""
+    def create_program_card(self):
+        """Создание пустой квадратной карточки программы (заполняется в bind_program_card)"""
         card = QFrame()
         card.setFixedSize(220, 250)  
+        card.program = None
         
         def card_mouse_press(event):
             if event.button() == Qt.MouseButton.LeftButton:
                 child = card.childAt(event.pos())
                 if child and child.objectName() == "favorite_btn":
                     return
-                self.show_program_info(program)
+                if card.program is not None:
+                    self.show_program_info(card.program)
         
         card.mousePressEvent = card_mouse_press
         
-        colors = {
-            'bg_secondary': '#252525',
-            'bg_button': '#2d2d2d', 
-            'border': '#404040',
-            'text_primary': '#ffffff'
-        }
-        
-        card.setStyleSheet(f"""
-            QFrame {{
-                background-color: {colors['bg_secondary']};
-                border: none;
-                border-radius: 15px;
-                padding: 0px;
-            }}
-            QFrame:hover {{
-                background-color: {colors['bg_button']};
-                border: 2px solid {colors['border']};
-            }}
-        """)
+        set_style_class(card, "card")
         
         card_layout = QVBoxLayout(card)
         card_layout.setContentsMargins(10, 10, 10, 10)
@@ -965,93 +953,49 @@ class ProgramsTab(QWidget):
         
         top_container = QWidget()
         top_container.setFixedHeight(30)
-        top_container.setStyleSheet("background: transparent;")
+        set_style_class(top_container, "transparent")
         top_layout = QHBoxLayout(top_container)
         top_layout.setContentsMargins(0, 0, 0, 0)
         
-        status = self.status_manager.get_program_status(program["name"])
-        if status["installed"]:
-            status_label = QLabel()
-            status_label.setFixedSize(24, 24)
-            status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # Загружаем иконку installed.png
-            from resource_path import get_icon_path
-            icon_path = get_icon_path("installed.png")
-            if icon_path:
-                from PyQt6.QtGui import QPixmap
-                pixmap = QPixmap(icon_path)
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(20, 20, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    status_label.setPixmap(scaled_pixmap)
-                else:
-                    status_label.setText("✓")
-            else:
-                status_label.setText("✓")
-            
-            status_label.setStyleSheet("""
-                QLabel {
-                    background-color: transparent;
-                    border: none;
-                    min-width: 24px;
-                    max-width: 24px;
-                    min-height: 24px;
-                    max-height: 24px;
-                }
-                QToolTip {
-                    background-color: #2d2d2d;
-                    color: #ffffff;
-                    border: 1px solid #555555;
-                    border-radius: 4px;
-                    padding: 8px;
-                    font-size: 12px;
-                }
-            """)
-            status_label.setToolTip(f"Установлено: {status['exact_name']}\nВерсия: {status['version']}")
-            top_layout.addWidget(status_label)
+        status_label = QLabel()
+        status_label.setFixedSize(24, 24)
+        status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        
+        # Загружаем иконку installed.png
+        from image_helper import load_icon_image
+        pixmap = load_icon_image("installed.png", (20, 20))
+        if pixmap:
+            status_label.setPixmap(pixmap)
+        else:
+            status_label.setText("✓")
+        
+        set_style_class(status_label, "card-status")
+        status_label.hide()
+        top_layout.addWidget(status_label)
         
         top_layout.addStretch()
         
         favorite_btn = QPushButton()
         favorite_btn.setFixedSize(28, 28)
         favorite_btn.setObjectName("favorite_btn")
-        is_favorite = self.favorites_manager.is_favorite(program["name"], "programs")
-        favorite_btn.setText("♥" if is_favorite else "♡")
-        favorite_btn.setStyleSheet(f"""
-            QPushButton {{
-                background: transparent;
-                border: none;
-                color: {'#ff4757' if is_favorite else '#666666'};
-                font-size: 22px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                color: #ff4757;
-            }}
-        """)
-        favorite_btn.clicked.connect(lambda: self.toggle_favorite(program, favorite_btn))
+        set_style_class(favorite_btn, "card-favorite")
+        favorite_btn.clicked.connect(lambda: self.toggle_favorite(card.program, favorite_btn))
         
         def favorite_mouse_press(event):
             event.accept()
-            self.toggle_favorite(program, favorite_btn)
+            if card.program is not None:
+                self.toggle_favorite(card.program, favorite_btn)
         
         favorite_btn.mousePressEvent = favorite_mouse_press
         
         top_layout.addWidget(favorite_btn)
         card_layout.addWidget(top_container)
         
-        from image_helper import load_program_image
-        pixmap = load_program_image(program["logo"])
-        if pixmap and not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            logo_label = QLabel()
-            logo_label.setPixmap(scaled_pixmap)
-        else:
-            logo_label = QLabel("📦")  
+        logo_label = QLabel()
         
         logo_container = QWidget()
         logo_container.setFixedSize(200, 100)  
-        logo_container.setStyleSheet("background: transparent;")
+        set_style_class(logo_container, "transparent")
         logo_layout = QHBoxLayout(logo_container)
         logo_layout.setContentsMargins(0, 0, 0, 0)
         logo_layout.addStretch()
@@ -1060,42 +1004,60 @@ class ProgramsTab(QWidget):
         
         logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         logo_label.setFixedSize(100, 100)
-        logo_label.setStyleSheet("""
-            QLabel {
-                color: #ffffff;
-                font-size: 48px;
-                font-family: 'Segoe UI Emoji', 'Apple Color Emoji', 'Noto Color Emoji', sans-serif;
-                background: transparent;
-                border: none;
-                qproperty-alignment: AlignCenter;
-            }
-        """)
+        set_style_class(logo_label, "card-logo")
         
         card_layout.addWidget(logo_container)
         
         card_layout.addStretch()
         
-        name_label = QLabel(program["name"])
+        name_label = QLabel()
         name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         name_label.setWordWrap(True)
         name_label.setFixedHeight(60)  
-        name_label.setStyleSheet(f"""
-            QLabel {{
-                color: {colors['text_primary']};
-                font-size: 15px;
-                font-weight: bold;
-                font-family: 'Segoe UI', Arial, sans-serif;
-                background: transparent;
-                border: none;
-                text-align: center;
-                line-height: 1.3;
-                padding: 5px;
-            }}
-        """)
+        set_style_class(name_label, "card-name")
         card_layout.addWidget(name_label)
         
+        card.status_label = status_label
+        card.favorite_btn = favorite_btn
+        card.logo_label = logo_label
+        card.name_label = name_label
+        
         return card
 
+    def bind_program_card(self, card, program):
+        """Заполнение карточки данными программы"""
+        card.program = program
+        
+        status = self.status_manager.get_program_status(program["name"])
+        if status["installed"]:
+            card.status_label.setToolTip(f"Установлено: {status['exact_name']}\nВерсия: {status['version']}")
+            card.status_label.show()
+        else:
+            card.status_label.hide()
+        
+        is_favorite = self.favorites_manager.is_favorite(program["name"], "programs")
+        self.update_favorite_button(card.favorite_btn, is_favorite)
+        
+        # Пока логотип читается в фоне, на карточке значок-заглушка
+        card.logo_label.setText("📦")
+        get_image_loader().request(
+            card, SOURCE_PROGRAM, program["logo"], (100, 100),
+            lambda pixmap, card=card: self.set_card_logo(card, pixmap),
+            self.programs_grid.index_priority(card.grid_index)
+        )
+        
+        card.name_label.setText(program["name"])
+
+    def set_card_logo(self, card, pixmap):
+        """Показать загруженный логотип (без изображения остается значок-заглушка)"""
+        if pixmap:
+            card.logo_label.setPixmap(pixmap)
+
+    def update_favorite_button(self, button, is_favorite):
+        """Вид кнопки избранного"""
+        button.setText("♥" if is_favorite else "♡")
+        set_style_state(button, "favorite", is_favorite)
+
     def toggle_favorite(self, program, button):
         """Переключить статус избранного для программы"""
         program_name = program["name"]
@@ -1103,34 +1065,10 @@ class ProgramsTab(QWidget):
         
         if is_favorite:
             self.favorites_manager.remove_from_favorites(program_name, "programs")
-            button.setText("♡")
-            button.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    color: #666666;
-                    font-size: 22px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    color: #ff4757;
-                }
-            """)
         else:
             self.favorites_manager.add_to_favorites(program_name, "programs")
-            button.setText("♥")
-            button.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    border: none;
-                    color: #ff4757;
-                    font-size: 22px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    color: #ff4757;
-                }
-            """)
+        
+        self.update_favorite_button(button, not is_favorite)
 
     def show_program_info(self, program):
         """Показать информационную панель программы"""
@@ -1141,28 +1079,55 @@ class ProgramsTab(QWidget):
             self.current_program = program
             self.info_panel.show_program(program)
 
-    def filter_programs(self):
-        search_text = self.search_input.text().lower()
+    def apply_catalog_diff(self, diff):
+        """Применить фоновое обновление каталога, сохранив поиск и выбранную категорию"""
+        added, removed, changed = len(diff["added"]), len(diff["removed"]), len(diff["changed"])
+        print(f"Programs tab: обновление каталога (+{added} -{removed} ~{changed})")
+        
         selected_category = self.category_filter.currentData()
+        self.set_data(diff["items"])
         
-        self.filtered_programs = []
-        for program in self.all_programs:
-            if selected_category == "favorites":
-                if not self.favorites_manager.is_favorite(program["name"], "programs"):
-                    continue
-            elif selected_category:
-                if selected_category not in program.get("categories", []):
-                    continue
-            
-            if search_text:
-                if not (search_text in program["name"].lower() or
-                        search_text in program["description"].lower() or
-                        search_text in program["category"].lower() or
-                        any(search_text in keyword for keyword in program["keywords"])):
-                    continue
-            
-            self.filtered_programs.append(program)
+        if selected_category or self.search_input.text():
+            for index, item in enumerate(self.category_filter.items):
+                if item["data"] == selected_category:
+                    self.category_filter.setCurrentIndex(index)
+                    break
+            self.filter_programs()
+
+    def search_request(self):
+        """Параметры поиска для фонового потока (виджеты читаются только здесь, в GUI потоке)"""
+        search_text = self.search_input.text()
+        selected_category = self.category_filter.currentData()
+        
+        favorites = None
+        if selected_category == "favorites":
+            favorites = list(self.favorites_manager.get_favorites("programs"))
+            selected_category = None
         
+        return self.search_index, search_text, selected_category, favorites
+
+    def schedule_filter(self):
+        """Поиск по мере ввода: запускается после паузы в наборе"""
+        self.search_pipeline.submit(self.search_request())
+
+    def filter_programs(self):
+        """Фильтрация по поисковому запросу и категории без задержки ввода"""
+        self.search_pipeline.submit(self.search_request(), immediate=True)
+
+    @staticmethod
+    def match_programs(request):
+        """Этап поиска с учетом опечаток (выполняется в фоновом потоке)"""
+        search_index, search_text, selected_category, favorites = request
+        return search_index.ranked_masks(search_text, selected_category, favorites)
+
+    @staticmethod
+    def rank_programs(ranked, request):
+        """Этап упорядочивания: лучшие совпадения первыми (в фоновом потоке)"""
+        return request[0].select_ranked(ranked)
+
+    def apply_search_results(self, programs):
+        """Показать результат последнего запроса"""
+        self.filtered_programs = programs
         self.display_programs()
 
     def refresh_programs(self):
@@ -1222,7 +1187,7 @@ class ProgramsTab(QWidget):
             success = self.status_manager.perform_system_scan()
             if success and hasattr(self, 'all_programs'):
                 self.status_manager.check_programs_status(self.all_programs)
-                self.display_programs()
+                self.programs_grid.refresh()
         except Exception as e:
             print(f"Ошибка сканирования: {e}")
         finally:
@@ -0,0 +1,135 @@
+import threading
+import time
+
+
+BURST_SECONDS = 0.1
+MAX_SLEEP = 0.1
+
+GLOBAL_LIMIT_SETTING = "bandwidth_limit_kbps"
+TRANSFER_LIMIT_SETTING = "per_download_limit_kbps"
+
+
+class TokenBucket:
+    """Ведро токенов: ограничение скорости в байтах в секунду (0 - без ограничения)"""
+
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self.rate = 0
+        self.capacity = 0
+        self.tokens = 0
+        self.last_refill = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """Изменить скорость на лету, уже накопленный долг сохраняется"""
+        with self._lock:
+            self._refill()
+            self.rate = max(0, int(rate or 0))
+            self.capacity = max(1, int(self.rate * BURST_SECONDS))
+            self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def consume(self, amount, should_stop=None):
+        """Списать amount байт и подождать, пока ведро не выйдет из долга"""
+        with self._lock:
+            if self.rate <= 0:
+                return
+            self._refill()
+            self.tokens -= amount
+
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    self.tokens = 0
+                    return
+                self._refill()
+                if self.tokens >= 0:
+                    return
+                wait = -self.tokens / self.rate
+
+            if should_stop and should_stop():
+                return
+            time.sleep(min(wait, MAX_SLEEP))
+
+
+class TransferThrottle:
+    """Ограничитель отдельной передачи: собственный лимит плюс общий лимит процесса"""
+
+    def __init__(self, limiter, rate=None):
+        self.limiter = limiter
+        self.bucket = TokenBucket(limiter.transfer_rate if rate is None else rate)
+        self.follows_default = rate is None
+
+    def consume(self, amount, should_stop=None):
+        self.bucket.consume(amount, should_stop)
+        self.limiter.global_bucket.consume(amount, should_stop)
+
+    def set_rate(self, rate):
+        self.follows_default = False
+        self.bucket.set_rate(rate)
+
+    def close(self):
+        self.limiter.release(self)
+
+
+class BandwidthLimiter:
+    """Общий ограничитель скорости для всех сетевых передач программы"""
+
+    def __init__(self, global_rate=0, transfer_rate=0):
+        self._lock = threading.Lock()
+        self.global_bucket = TokenBucket(global_rate)
+        self.transfer_rate = transfer_rate
+        self.transfers = []
+
+    def create_transfer(self, rate=None):
+        """Создать ограничитель для новой передачи"""
+        throttle = TransferThrottle(self, rate)
+        with self._lock:
+            self.transfers.append(throttle)
+        return throttle
+
+    def release(self, throttle):
+        with self._lock:
+            if throttle in self.transfers:
+                self.transfers.remove(throttle)
+
+    def set_global_rate(self, rate):
+        self.global_bucket.set_rate(rate)
+
+    def set_transfer_rate(self, rate):
+        """Изменить лимит по умолчанию для всех текущих и будущих передач"""
+        self.transfer_rate = rate
+        with self._lock:
+            transfers = list(self.transfers)
+        for throttle in transfers:
+            if throttle.follows_default:
+                throttle.bucket.set_rate(rate)
+
+    def on_setting_changed(self, key, value):
+        """Обработчик изменения настроек (лимиты задаются в КБ/с)"""
+        if key == GLOBAL_LIMIT_SETTING:
+            self.set_global_rate(int(value or 0) * 1024)
+        elif key == TRANSFER_LIMIT_SETTING:
+            self.set_transfer_rate(int(value or 0) * 1024)
+
+
+_bandwidth_limiter = None
+_bandwidth_limiter_lock = threading.Lock()
+
+def get_bandwidth_limiter():
+    """Получить глобальный ограничитель скорости, настроенный из settings_manager"""
+    global _bandwidth_limiter
+    with _bandwidth_limiter_lock:
+        if _bandwidth_limiter is None:
+            from settings_manager import settings_manager
+            _bandwidth_limiter = BandwidthLimiter(
+                int(settings_manager.get_setting(GLOBAL_LIMIT_SETTING, 0) or 0) * 1024,
+                int(settings_manager.get_setting(TRANSFER_LIMIT_SETTING, 0) or 0) * 1024
+            )
+            settings_manager.add_change_listener(_bandwidth_limiter.on_setting_changed)
+    return _bandwidth_limiter
@@ -0,0 +1,229 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import http_client
+
+
+IMAGE_CACHE_DIR = os.path.join("cache", "images")
+IMAGE_CACHE_INDEX = "index.json"
+IMAGE_CACHE_BUDGET = 50 * 1024 * 1024
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+# Время использования при попаданиях сохраняется не чаще раза в столько секунд (и при выходе)
+INDEX_SAVE_INTERVAL = 30
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".ico", ".svg")
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/bmp": ".bmp",
+    "image/x-icon": ".ico",
+    "image/vnd.microsoft.icon": ".ico",
+    "image/svg+xml": ".svg",
+}
+
+
+def is_remote_image(name):
+    """Логотип задан ссылкой, а не именем файла из ProgramImages"""
+    return bool(name) and name.startswith(("http://", "https://"))
+
+
+def image_extension(url, content_type):
+    extension = os.path.splitext(urlsplit(url).path)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return extension
+    return CONTENT_TYPE_EXTENSIONS.get((content_type or "").split(";")[0].strip().lower(), ".img")
+
+
+class RemoteImageCache:
+    """Дисковый кэш изображений по URL с адресацией по содержимому
+
+    Файлы называются SHA-256 содержимого, поэтому одинаковые картинки по разным
+    ссылкам хранятся один раз. Индекс url -> хэш, ETag, Last-Modified и время
+    последнего использования лежит в index.json; при превышении объема удаляются
+    давно не использованные записи. Все методы потокобезопасны, fetch() блокирует
+    поток и вызывается из фоновых задач.
+    """
+
+    def __init__(self, directory=IMAGE_CACHE_DIR, budget=IMAGE_CACHE_BUDGET):
+        self.directory = directory
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.url_locks = {}
+        self.validated = set()
+        self.entries = self.load_index()
+        self.index_dirty = False
+        self.index_saved = time.monotonic()
+
+    def load_index(self):
+        try:
+            with open(os.path.join(self.directory, IMAGE_CACHE_INDEX), 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self):
+        """Сохранить индекс (вызывается под self.lock)"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            index_path = os.path.join(self.directory, IMAGE_CACHE_INDEX)
+            with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(index_path + ".tmp", index_path)
+            self.index_dirty = False
+            self.index_saved = time.monotonic()
+        except Exception as e:
+            print(f"Ошибка сохранения индекса кэша изображений: {e}")
+
+    def file_path(self, entry):
+        return os.path.join(self.directory, entry["hash"] + entry["ext"])
+
+    def cached_path(self, url):
+        """Путь к сохраненной картинке без обращения к сети или None"""
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            path = self.file_path(entry)
+            if not os.path.exists(path):
+                del self.entries[url]
+                return None
+            entry["used"] = time.time()
+            self.index_dirty = True
+            if time.monotonic() - self.index_saved >= INDEX_SAVE_INTERVAL:
+                self.save_index()
+            return path
+
+    def flush(self):
+        """Сохранить индекс, если время использования менялось после последнего сохранения"""
+        with self.lock:
+            if self.index_dirty:
+                self.save_index()
+
+    def needs_revalidation(self, url):
+        """Картинку еще не сверяли с сервером в этом сеансе"""
+        with self.lock:
+            return url not in self.validated
+
+    def _url_lock(self, url):
+        with self.lock:
+            return self.url_locks.setdefault(url, threading.Lock())
+
+    def fetch(self, url):
+        """Скачать или сверить по ETag картинку; возвращает (путь, изменилась ли она)"""
+        with self._url_lock(url):
+            path = self.cached_path(url)
+            with self.lock:
+                entry = dict(self.entries.get(url) or {})
+                if path and url in self.validated:
+                    return path, False
+
+            headers = {}
+            if path:
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+
+            with http_client.get(url, headers=headers, stream=True) as response:
+                if response.status_code == 304 and path:
+                    with self.lock:
+                        self.validated.add(url)
+                    return path, False
+
+                if response.status_code != 200:
+                    raise Exception(f"HTTP {response.status_code}")
+
+                chunks = []
+                received = 0
+                for chunk in response.iter_content(chunk_size=16384):
+                    received += len(chunk)
+                    if received > MAX_IMAGE_SIZE:
+                        raise Exception(f"Изображение больше {MAX_IMAGE_SIZE} байт")
+                    chunks.append(chunk)
+                content = b"".join(chunks)
+
+                new_entry = {
+                    "hash": hashlib.sha256(content).hexdigest(),
+                    "ext": image_extension(url, response.headers.get("Content-Type")),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "size": len(content),
+                    "used": time.time()
+                }
+
+            new_path = self.file_path(new_entry)
+            if not os.path.exists(new_path):
+                os.makedirs(self.directory, exist_ok=True)
+                with open(new_path + ".tmp", 'wb') as f:
+                    f.write(content)
+                os.replace(new_path + ".tmp", new_path)
+
+            with self.lock:
+                self.entries[url] = new_entry
+                self.validated.add(url)
+                # Прежнее содержимое по этой ссылке больше не нужно, если на него не ссылаются другие
+                if entry.get("hash") and self.file_path(entry) != new_path:
+                    self.remove_unreferenced(entry["hash"] + entry["ext"])
+                self.evict(keep=url)
+                self.save_index()
+
+            return new_path, entry.get("hash") != new_entry["hash"]
+
+    def evict(self, keep=None):
+        """Удалить давно не использованные картинки сверх объема (вызывается под self.lock)"""
+        sizes = {}
+        for entry in self.entries.values():
+            sizes[entry["hash"] + entry["ext"]] = entry.get("size", 0)
+        total = sum(sizes.values())
+
+        for url in sorted(self.entries, key=lambda url: self.entries[url].get("used", 0)):
+            if total <= self.budget:
+                break
+            if url == keep:
+                continue
+
+            entry = self.entries.pop(url)
+            file_name = entry["hash"] + entry["ext"]
+            if self.remove_unreferenced(file_name):
+                total -= sizes.get(file_name, 0)
+
+    def remove_unreferenced(self, file_name):
+        """Удалить файл, если на него не ссылается ни одна запись (вызывается под self.lock)"""
+        if any(other["hash"] + other["ext"] == file_name for other in self.entries.values()):
+            return False
+        try:
+            os.remove(os.path.join(self.directory, file_name))
+        except OSError:
+            pass
+        return True
+
+    def clear(self):
+        """Удалить все сохраненные картинки"""
+        with self.lock:
+            for entry in self.entries.values():
+                try:
+                    os.remove(self.file_path(entry))
+                except OSError:
+                    pass
+            self.entries = {}
+            self.validated.clear()
+            self.save_index()
+
+
+_remote_image_cache = None
+_remote_image_cache_lock = threading.Lock()
+
+def get_remote_image_cache():
+    """Получить общий кэш загруженных изображений"""
+    global _remote_image_cache
+    with _remote_image_cache_lock:
+        if _remote_image_cache is None:
+            _remote_image_cache = RemoteImageCache()
+            atexit.register(_remote_image_cache.flush)
+    return _remote_image_cache
@@ -91,6 +91,25 @@ def reorganize_build():
         else:
             print(f"     ❌ {file} - НЕ НАЙДЕН")
     
+    print("\n4. Атлас иконок:")
+    
+    icons_path = os.path.join(dist_path, "assets", "icons")
+    try:
+        from icon_atlas import build_icon_atlas
+        count, size = build_icon_atlas(icons_path)
+        print(f"   ✅ Упаковано иконок: {count}, размер {size[0]}x{size[1]}")
+    except Exception as e:
+        print(f"   ❌ Ошибка сборки атласа иконок: {e}")
+    
+    print("\n5. Манифест ресурсов:")
+    
+    try:
+        from resource_path import write_resource_manifest
+        manifest_path = write_resource_manifest(dist_path, internal_path)
+        print(f"   ✅ Записан: {os.path.relpath(manifest_path, dist_path)}")
+    except Exception as e:
+        print(f"   ❌ Ошибка записи манифеста ресурсов: {e}")
+    
     print(f"\n=== РЕОРГАНИЗАЦИЯ ЗАВЕРШЕНА ===")
     return True
 
@@ -1,5 +1,13 @@
 import sys
 import os
+import json
+import threading
+
+
+RESOURCE_MANIFEST = os.path.join("assets", "resource_manifest.json")
+WATCH_RESOURCES_ENV = "UTILHELP_WATCH_RESOURCES"
+RESOURCE_KINDS = ("icons", "programs")
+
 
 def resource_path(relative_path):
     """Получить абсолютный путь к ресурсу, работает для dev и для PyInstaller"""
@@ -10,126 +18,196 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
-def get_icon_path(icon_name):
-    """Получить путь к системной иконке UTILHELP с fallback и диагностикой"""
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(os.path.abspath(sys.executable))
-    else:
-        exe_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    search_paths = []
-    
+
+def get_exe_dir():
     if getattr(sys, 'frozen', False):
-        search_paths.extend([
-            os.path.join(exe_dir, 'assets', 'icons', icon_name),
-            os.path.join(exe_dir, 'Icons', icon_name),  
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def get_bundle_dir():
+    return getattr(sys, '_MEIPASS', os.path.abspath("."))
+
+
+def resource_roots(kind, exe_dir, bundle_dir, frozen):
+    """Папки поиска ресурсов в порядке приоритета (как в прежнем переборе путей)"""
+    roots = []
+
+    if kind == "icons":
+        if frozen:
+            roots.extend([
+                os.path.join(exe_dir, 'assets', 'icons'),
+                os.path.join(exe_dir, 'Icons'),
+            ])
+        roots.extend([
+            os.path.join(exe_dir, 'Icons'),
+            os.path.join(bundle_dir, 'Icons'),
+            os.path.join(bundle_dir, 'assets', 'icons'),
         ])
-    
-    search_paths.extend([
-        os.path.join(exe_dir, 'Icons', icon_name),
-    ])
-    
-    try:
-        search_paths.extend([
-            resource_path(f"Icons/{icon_name}"),
-            resource_path(f"assets/icons/{icon_name}"),
+    else:
+        if frozen:
+            roots.extend([
+                os.path.join(exe_dir, 'assets', 'programs'),
+                os.path.join(exe_dir, 'ProgramImages'),    # Fallback на старую структуру
+                os.path.join(exe_dir, 'assets', 'icons'),  # Fallback на системные иконки
+            ])
+        roots.extend([
+            os.path.join(exe_dir, 'ProgramImages'),
+            os.path.join(exe_dir, 'Icons'),  # Fallback на системные иконки
+            os.path.join(bundle_dir, 'ProgramImages'),
+            os.path.join(bundle_dir, 'assets', 'programs'),
+            os.path.join(bundle_dir, 'Icons'),
+            os.path.join(bundle_dir, 'assets', 'icons'),
         ])
-    except:
-        pass
-    
-    for path in search_paths:
-        # try:
-        #     from temp_manager import debug_log
-        #     debug_log(f"Checking system icon path: {path}")
-        # except:
-        #     pass
-        
-        if path and os.path.exists(path):
-            # try:
-            #     from temp_manager import debug_log
-            #     debug_log(f"Found system icon at: {path}")
-            # except:
-            #     pass
-            return path
-    
-    # try:
-    #     from temp_manager import debug_log
-    #     debug_log(f"System icon not found: {icon_name}. Checked paths: {search_paths}")
-    # except:
-    #     pass
-    
-    return None
+
+    unique_roots = []
+    for root in roots:
+        if root not in unique_roots:
+            unique_roots.append(root)
+    return unique_roots
+
+
+def scan_resources(kind, exe_dir, bundle_dir, frozen):
+    """Обойти папки ресурсов один раз: имя файла -> путь первого найденного"""
+    paths = {}
+    for root in resource_roots(kind, exe_dir, bundle_dir, frozen):
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            continue
+
+        for entry in entries:
+            if entry.is_file():
+                paths.setdefault(os.path.normcase(entry.name), entry.path)
+    return paths
+
+
+def write_resource_manifest(dist_dir, bundle_dir=None):
+    """Записать манифест ресурсов для собранной программы (вызывается из reorganize_build.py)"""
+    bundle_dir = bundle_dir or os.path.join(dist_dir, "_internal")
+    manifest = {}
+    for kind in RESOURCE_KINDS:
+        paths = scan_resources(kind, dist_dir, bundle_dir, True)
+        manifest[kind] = {name: os.path.relpath(path, dist_dir) for name, path in paths.items()}
+
+    manifest_path = os.path.join(dist_dir, RESOURCE_MANIFEST)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    return manifest_path
+
+
+class ResourceIndex:
+    """Индекс ресурсов: имя файла -> путь, без обращений к диску при поиске
+
+    В собранной программе читается манифест, созданный reorganize_build.py,
+    иначе папки ресурсов обходятся один раз. В режиме разработки с
+    UTILHELP_WATCH_RESOURCES=1 индекс перестраивается при изменении папок.
+    """
+
+    def __init__(self):
+        self.exe_dir = get_exe_dir()
+        self.bundle_dir = get_bundle_dir()
+        self.frozen = getattr(sys, 'frozen', False)
+        self.paths = {}
+        self.watcher = None
+        self.change_listeners = []
+        self.rebuild()
+
+    def rebuild(self):
+        paths = self.load_manifest() if self.frozen else None
+        if paths is None:
+            paths = {
+                kind: scan_resources(kind, self.exe_dir, self.bundle_dir, self.frozen)
+                for kind in RESOURCE_KINDS
+            }
+        self.paths = paths
+
+    def load_manifest(self):
+        manifest_path = os.path.join(self.exe_dir, RESOURCE_MANIFEST)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return {
+            kind: {name: os.path.join(self.exe_dir, path) for name, path in manifest.get(kind, {}).items()}
+            for kind in RESOURCE_KINDS
+        }
+
+    def find(self, kind, name):
+        if '/' in name or '\\' in name:
+            # Вложенные пути в индекс не попадают: проверяем их по старинке
+            for root in resource_roots(kind, self.exe_dir, self.bundle_dir, self.frozen):
+                path = os.path.join(root, name)
+                if os.path.exists(path):
+                    return path
+            return None
+
+        return self.paths[kind].get(os.path.normcase(name))
+
+    def add_change_listener(self, listener):
+        self.change_listeners.append(listener)
+
+    def watch(self):
+        """Следить за папками ресурсов (только для разработки, нужен QApplication)"""
+        if self.frozen or self.watcher is not None:
+            return
+
+        from PyQt6.QtCore import QFileSystemWatcher
+
+        roots = set()
+        for kind in RESOURCE_KINDS:
+            roots.update(root for root in resource_roots(kind, self.exe_dir, self.bundle_dir, False)
+                         if os.path.isdir(root))
+
+        self.watcher = QFileSystemWatcher(sorted(roots))
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+
+    def _on_directory_changed(self, path):
+        self.rebuild()
+        for listener in self.change_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"Ошибка обработчика изменения ресурсов: {e}")
+
+
+_resource_index = None
+_resource_index_lock = threading.Lock()
+
+def get_resource_index():
+    """Получить общий индекс ресурсов"""
+    global _resource_index
+    with _resource_index_lock:
+        if _resource_index is None:
+            _resource_index = ResourceIndex()
+    return _resource_index
+
+
+def watch_resources_if_requested():
+    """Включить слежение за ресурсами, если задан UTILHELP_WATCH_RESOURCES"""
+    if os.environ.get(WATCH_RESOURCES_ENV) == "1":
+        get_resource_index().watch()
+
+
+def get_icon_path(icon_name):
+    """Получить путь к системной иконке UTILHELP"""
+    if not icon_name:
+        return None
+
+    return get_resource_index().find("icons", icon_name)
 
 def get_program_image_path(image_name):
-    """Получить путь к картинке программы для скачивания с расширенной диагностикой"""
-    # try:
-    #     from temp_manager import debug_log
-    #     debug_log(f"Looking for program image: {image_name}")
-    # except:
-    #     pass
-    
-    if image_name and ('/' in image_name or '\\' in image_name):
+    """Получить путь к картинке программы для скачивания"""
+    if not image_name:
+        return None
+
+    if '/' in image_name or '\\' in image_name:
         image_name = os.path.basename(image_name)
-        # try:
-        #     from temp_manager import debug_log
-        #     debug_log(f"Extracted filename from path: {image_name}")
-        # except:
-        #     pass
-    
-    if os.path.isabs(image_name) and os.path.exists(image_name):
-        return image_name
-    
-    if getattr(sys, 'frozen', False):
-        exe_dir = os.path.dirname(os.path.abspath(sys.executable))
-    else:
-        exe_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    search_paths = []
-    
-    if getattr(sys, 'frozen', False):
-        search_paths.extend([
-            os.path.join(exe_dir, 'assets', 'programs', image_name),
-            os.path.join(exe_dir, 'ProgramImages', image_name),    # Fallback на старую структуру
-            os.path.join(exe_dir, 'assets', 'icons', image_name),  # Fallback на системные иконки
-        ])
-    
-    search_paths.extend([
-        os.path.join(exe_dir, 'ProgramImages', image_name),
-        os.path.join(exe_dir, 'Icons', image_name),  # Fallback на системные иконки
-    ])
-    
-    try:
-        search_paths.extend([
-            resource_path(f"ProgramImages/{image_name}"),
-            resource_path(f"assets/programs/{image_name}"),
-            resource_path(f"Icons/{image_name}"),
-            resource_path(f"assets/icons/{image_name}"),
-        ])
-    except:
-        pass
-    
-    for path in search_paths:
-        # try:
-        #     from temp_manager import debug_log
-        #     debug_log(f"Checking program image path: {path}")
-        # except:
-        #     pass
-        
-        if path and os.path.exists(path):
-            # try:
-            #     from temp_manager import debug_log
-            #     debug_log(f"Found program image at: {path}")
-            # except:
-            #     pass
-            return path
-    
-    # try:
-    #     from temp_manager import debug_log
-    #     debug_log(f"Program image not found: {image_name}. Checked paths: {search_paths}")
-    # except:
-    #     pass
-    
-    return None
+
+    return get_resource_index().find("programs", image_name)
 
 def get_db_path(db_name):
     """Получить путь к базе данных"""
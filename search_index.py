@@ -0,0 +1,436 @@
+import re
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain, compress
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SEARCH_FIELDS = ("name", "description", "category", "keywords")
+PREFIX_END = "\U0010ffff"
+TOKEN_CACHE_SIZE = 2048
+# Слова, встречающиеся чаще чем в 1/64 элементов, хранятся сразу битовой маской
+DENSE_POSTING_RATIO = 64
+BIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+SPARSE_SELECT_LIMIT = 64
+
+# Оценка совпадения = вид совпадения * вес поля, в котором оно найдено
+FIELD_WEIGHTS = {"name": 4, "keywords": 3, "category": 2, "description": 1}
+MATCH_EQUAL = 4
+MATCH_PREFIX = 3
+MATCH_SUBSTRING = 2
+MATCH_FUZZY = 1
+# Опечатки ищутся в словах запроса от 4 букв: одна ошибка, от 8 букв - две
+FUZZY_MIN_LENGTH = 4
+FUZZY_LONG_LENGTH = 8
+
+LATIN_LAYOUT = "`qwertyuiop[]asdfghjkl;'zxcvbnm,."
+CYRILLIC_LAYOUT = "ёйцукенгшщзхъфывапролджэячсмитьбю"
+TO_LATIN_LAYOUT = str.maketrans(CYRILLIC_LAYOUT, LATIN_LAYOUT)
+TO_CYRILLIC_LAYOUT = str.maketrans(LATIN_LAYOUT, CYRILLIC_LAYOUT)
+
+CYRILLIC_TO_LATIN = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya"
+})
+# Буквы, которые часто передают латиницей по-другому: хром - chrome, йога - yoga
+CYRILLIC_ALTERNATIVES = {"х": ("kh", "ch"), "й": ("i", "j"), "ц": ("c",), "ж": ("j",), "ы": ("i",)}
+LATIN_TO_CYRILLIC = {
+    "sch": "щ", "zh": "ж", "kh": "х", "ch": "ч", "sh": "ш", "ts": "ц", "yu": "ю", "ya": "я",
+    "a": "а", "b": "б", "c": "к", "d": "д", "e": "е", "f": "ф", "g": "г", "h": "х",
+    "i": "и", "j": "дж", "k": "к", "l": "л", "m": "м", "n": "н", "o": "о", "p": "п",
+    "q": "к", "r": "р", "s": "с", "t": "т", "u": "у", "v": "в", "w": "в", "x": "кс",
+    "y": "и", "z": "з"
+}
+LATIN_PATTERN = re.compile("|".join(sorted(LATIN_TO_CYRILLIC, key=len, reverse=True)))
+
+
+def tokenize(text):
+    """Разбить текст на слова в нижнем регистре"""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def _field_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(part) for part in value)
+    return str(value) if value else ""
+
+
+def has_cyrillic(text):
+    return any("а" <= char <= "я" or char == "ё" for char in text)
+
+
+def transliterate(text):
+    """Транслитерация кириллицы в латиницу и обратно"""
+    if has_cyrillic(text):
+        return text.translate(CYRILLIC_TO_LATIN)
+    return LATIN_PATTERN.sub(lambda match: LATIN_TO_CYRILLIC[match.group()], text)
+
+
+def transliterations(text):
+    """Транслитерация и ее варианты с другим написанием отдельных букв"""
+    variants = [transliterate(text)]
+    for letter, spellings in CYRILLIC_ALTERNATIVES.items():
+        if letter in text:
+            for spelling in spellings:
+                variants.append(text.translate(CYRILLIC_TO_LATIN | {ord(letter): spelling}))
+    return variants
+
+
+def query_variants(token):
+    """Слово запроса и его варианты: набранное не в той раскладке и транслитерация"""
+    switched = token.translate(TO_LATIN_LAYOUT if has_cyrillic(token) else TO_CYRILLIC_LAYOUT)
+    variants = [token]
+    for variant in [switched, *transliterations(token), *transliterations(switched)]:
+        # Буквы х, ъ, ж, э, б, ю в другой раскладке - знаки препинания
+        variant = "".join(TOKEN_PATTERN.findall(variant))
+        if variant and variant not in variants:
+            variants.append(variant)
+    return variants
+
+
+def bigram_signature(token):
+    """Неупорядоченные пары соседних букв: перестановка двух букв меняет не больше двух пар"""
+    padded = "^" + token
+    return {first + second if first <= second else second + first for first, second in zip(padded, padded[1:])}
+
+
+def edit_distance(first, second, limit):
+    """Расстояние Дамерау-Левенштейна (с перестановкой соседних букв); больше limit - limit + 1"""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    before_previous = None
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                value = min(value, before_previous[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def mask_from_positions(positions, size):
+    """Битовая маска из номеров элементов"""
+    flags = bytearray((size + 7) // 8)
+    for position in positions:
+        flags[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(flags, "little")
+
+
+def item_categories(item):
+    """Категории элемента: готовый список categories или разбор строки category"""
+    categories = item.get("categories")
+    if categories is None:
+        categories = [cat.strip() for cat in (item.get("category") or "").split(",") if cat.strip()]
+    return categories
+
+
+class SearchIndex:
+    """Инвертированный индекс каталога с поиском по подстроке слова и фильтрами-битсетами
+
+    Элементы нумеруются в порядке списка, множества найденных элементов
+    представлены битовыми масками в int. Словарь индекса хранит отсортированные
+    суффиксы всех слов: диапазон суффиксов с заданным префиксом (как обход
+    поддерева префиксного дерева) дает все слова, содержащие подстроку, поэтому
+    поведение search() совпадает со старым поиском "подстрока в поле".
+
+    ranked_search() дополнительно находит слова с опечатками, набранные не в той
+    раскладке и в транслитерации, и упорядочивает результат по оценке совпадения.
+    Кандидаты на опечатку отбираются по сигнатурам из пар букв, расстояние
+    считается только для них. Внутри одной оценки порядок - как в списке items.
+    """
+
+    def __init__(self, items, key="name", fields=SEARCH_FIELDS):
+        self.items = list(items)
+        self.key = key
+        self.fields = fields
+        self.all_mask = (1 << len(self.items)) - 1
+
+        self.positions = {}
+        postings = {}
+        field_positions = {field: {} for field in fields}
+        char_positions = {}
+        category_positions = {}
+
+        for position, item in enumerate(self.items):
+            self.positions.setdefault(item.get(key), position)
+
+            tokens = set()
+            for field in fields:
+                field_tokens = set(tokenize(_field_text(item.get(field))))
+                for token in field_tokens:
+                    field_positions[field].setdefault(token, []).append(position)
+                tokens.update(field_tokens)
+
+            for token in tokens:
+                postings.setdefault(token, []).append(position)
+
+            for char in set("".join(tokens)):
+                char_positions.setdefault(char, []).append(position)
+
+            for category in item_categories(item):
+                category_positions.setdefault(category, []).append(position)
+
+        size = len(self.items)
+        dense_size = max(1, size // DENSE_POSTING_RATIO)
+
+        # Редкие слова хранят номера элементов, частые - маску: так память не растет квадратично
+        def compact(positions):
+            return mask_from_positions(positions, size) if len(positions) >= dense_size else tuple(positions)
+
+        self.postings = {token: compact(positions) for token, positions in postings.items()}
+        self.field_postings = [
+            (FIELD_WEIGHTS.get(field, 1), {token: compact(positions) for token, positions in field_positions[field].items()})
+            for field in fields
+        ]
+        self.char_masks = {char: mask_from_positions(positions, size) for char, positions in char_positions.items()}
+        self.category_masks = {
+            category: mask_from_positions(positions, size) for category, positions in category_positions.items()
+        }
+
+        suffixes = sorted(
+            (token[start:], token)
+            for token in self.postings
+            for start in range(len(token) - 1)
+        )
+        self.suffixes = [suffix for suffix, _ in suffixes]
+        self.suffix_tokens = [token for _, token in suffixes]
+
+        self._token_cache = {}
+        self._score_cache = {}
+        # Сигнатуры для поиска опечаток строятся при первом нечетком запросе
+        self.vocabulary = None
+        self.bigram_tokens = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def token_mask(self, query_token):
+        """Элементы, в словах которых встречается query_token"""
+        mask = self._token_cache.get(query_token)
+        if mask is not None:
+            return mask
+
+        if len(query_token) == 1:
+            mask = self.char_masks.get(query_token, 0)
+        else:
+            mask = 0
+            sparse = []
+            for token in self.substring_tokens(query_token):
+                posting = self.postings[token]
+                if isinstance(posting, int):
+                    mask |= posting
+                else:
+                    sparse.extend(posting)
+            if sparse:
+                mask |= mask_from_positions(sparse, len(self.items))
+
+        if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+            self._token_cache.clear()
+        self._token_cache[query_token] = mask
+        return mask
+
+    def substring_tokens(self, query_token):
+        """Слова словаря, содержащие query_token (от двух букв)"""
+        start = bisect_left(self.suffixes, query_token)
+        end = bisect_left(self.suffixes, query_token + PREFIX_END, start)
+        return set(self.suffix_tokens[start:end])
+
+    def build_fuzzy_index(self):
+        """Сигнатуры слов словаря: пара букв -> номера слов"""
+        self.vocabulary = list(self.postings)
+        bigram_tokens = {}
+        for token_id, token in enumerate(self.vocabulary):
+            for bigram in bigram_signature(token):
+                bigram_tokens.setdefault(bigram, []).append(token_id)
+        self.bigram_tokens = bigram_tokens
+
+    def fuzzy_tokens(self, query_token):
+        """Слова словаря на расстоянии одной-двух правок от query_token или от его начала"""
+        if self.bigram_tokens is None:
+            self.build_fuzzy_index()
+
+        limit = 2 if len(query_token) >= FUZZY_LONG_LENGTH else 1
+        signature = bigram_signature(query_token)
+        # Каждая правка убирает из сигнатуры не больше двух пар
+        threshold = max(1, len(signature) - 2 * limit)
+        counts = Counter(chain.from_iterable(
+            self.bigram_tokens.get(bigram, ()) for bigram in signature
+        ))
+
+        found = []
+        for token_id, count in counts.items():
+            if count < threshold:
+                continue
+            token = self.vocabulary[token_id]
+            if len(token) < len(query_token) - limit:
+                continue
+            distance = edit_distance(query_token, token, limit)
+            if distance > limit and len(token) > len(query_token):
+                distance = edit_distance(query_token, token[:len(query_token)], limit)
+            if distance <= limit:
+                found.append(token)
+        return found
+
+    def token_scores(self, query_token):
+        """Лучшая оценка совпадения слова запроса для каждого элемента: {оценка: маска}
+
+        Маски разных оценок не пересекаются.
+        """
+        scores = self._score_cache.get(query_token)
+        if scores is not None:
+            return scores
+
+        if len(query_token) == 1:
+            mask = self.char_masks.get(query_token, 0)
+            scores = {MATCH_SUBSTRING: mask} if mask else {}
+        else:
+            matches = {}
+            for token in self.substring_tokens(query_token):
+                if token == query_token:
+                    matches[token] = MATCH_EQUAL
+                else:
+                    matches[token] = MATCH_PREFIX if token.startswith(query_token) else MATCH_SUBSTRING
+
+            variants = query_variants(query_token)
+            for variant in variants[1:]:
+                if len(variant) < 2:
+                    continue
+                # Для другой раскладки и транслитерации - только слово целиком или его начало
+                for token in self.substring_tokens(variant):
+                    if token.startswith(variant):
+                        kind = MATCH_EQUAL if token == variant else MATCH_PREFIX
+                        matches[token] = max(matches.get(token, 0), kind)
+
+            for variant in variants:
+                if len(variant) >= FUZZY_MIN_LENGTH:
+                    for token in self.fuzzy_tokens(variant):
+                        matches.setdefault(token, MATCH_FUZZY)
+
+            scores = self.score_masks(matches)
+
+        if len(self._score_cache) >= TOKEN_CACHE_SIZE:
+            self._score_cache.clear()
+        self._score_cache[query_token] = scores
+        return scores
+
+    def score_masks(self, matches):
+        """Маски элементов по оценкам для найденных слов {слово: вид совпадения}"""
+        size = len(self.items)
+        masks = {}
+        sparse = {}
+        for token, kind in matches.items():
+            for weight, postings in self.field_postings:
+                posting = postings.get(token)
+                if posting is None:
+                    continue
+                score = kind * weight
+                if isinstance(posting, int):
+                    masks[score] = masks.get(score, 0) | posting
+                else:
+                    sparse.setdefault(score, []).extend(posting)
+        for score, positions in sparse.items():
+            masks[score] = masks.get(score, 0) | mask_from_positions(positions, size)
+
+        scores = {}
+        seen = 0
+        for score in sorted(masks, reverse=True):
+            mask = masks[score] & ~seen
+            if mask:
+                scores[score] = mask
+                seen |= mask
+        return scores
+
+    def query_mask(self, query):
+        """Элементы, содержащие все слова запроса"""
+        mask = self.all_mask
+        for query_token in tokenize(query):
+            mask &= self.token_mask(query_token)
+            if not mask:
+                break
+        return mask
+
+    def category_mask(self, category):
+        return self.category_masks.get(category, 0)
+
+    def keys_mask(self, keys):
+        """Маска элементов по списку ключей (например, избранное)"""
+        mask = 0
+        for key in keys:
+            position = self.positions.get(key)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def select(self, mask):
+        """Элементы, входящие в маску, в порядке каталога"""
+        if mask == self.all_mask:
+            return list(self.items)
+
+        # Для небольших результатов быстрее снять младшие биты, чем разворачивать всю маску
+        positions = []
+        remaining = mask
+        while remaining and len(positions) < SPARSE_SELECT_LIMIT:
+            lowest = remaining & -remaining
+            positions.append(lowest.bit_length() - 1)
+            remaining ^= lowest
+        if not remaining:
+            return [self.items[position] for position in positions]
+
+        flags = bin(mask)[:1:-1].encode("ascii").translate(BIT_FLAGS)
+        return list(compress(self.items, flags))
+
+    def filter_mask(self, mask, category=None, keys=None):
+        if category:
+            mask &= self.category_mask(category)
+        if keys is not None:
+            mask &= self.keys_mask(keys)
+        return mask
+
+    def search(self, query="", category=None, keys=None):
+        """Поиск: слова запроса, затем фильтр категории и списка ключей"""
+        mask = self.query_mask(query) if query else self.all_mask
+        return self.select(self.filter_mask(mask, category, keys))
+
+    def ranked_masks(self, query="", category=None, keys=None):
+        """Нечеткий поиск: [(оценка, маска)] по убыванию оценки
+
+        Элемент должен совпасть с каждым словом запроса, его оценка - сумма
+        лучших оценок по словам.
+        """
+        mask = self.filter_mask(self.all_mask, category, keys)
+        buckets = {0: mask} if mask else {}
+
+        for query_token in tokenize(query):
+            token_scores = self.token_scores(query_token)
+            next_buckets = {}
+            for total, bucket in buckets.items():
+                for score, score_mask in token_scores.items():
+                    matched = bucket & score_mask
+                    if matched:
+                        next_buckets[total + score] = next_buckets.get(total + score, 0) | matched
+            buckets = next_buckets
+            if not buckets:
+                break
+
+        return sorted(buckets.items(), reverse=True)
+
+    def select_ranked(self, ranked):
+        """Элементы из результата ranked_masks в порядке убывания оценки"""
+        items = []
+        for _, mask in ranked:
+            items.extend(self.select(mask))
+        return items
+
+    def ranked_search(self, query="", category=None, keys=None):
+        """Нечеткий поиск с учетом опечаток, раскладки и транслитерации, лучшие совпадения первыми"""
+        return self.select_ranked(self.ranked_masks(query, category, keys))
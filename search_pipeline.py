@@ -0,0 +1,147 @@
+import time
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
+from temp_manager import debug_log
+
+
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_STAGES = ("match", "sort", "render")
+
+
+def sort_by_name(items):
+    """Сортировка результатов по названию"""
+    return sorted(items, key=lambda item: item.get('name', '').lower())
+
+
+class SearchThread(QThread):
+    """Поиск и сортировка одного запроса в фоне
+
+    Между этапами проверяется, не устарел ли запрос: если пользователь уже ввел
+    новый текст, результат не досчитывается.
+    """
+    search_finished = pyqtSignal(int, object, object)
+
+    def __init__(self, pipeline, generation, request):
+        super().__init__()
+        self.pipeline = pipeline
+        self.generation = generation
+        self.request = request
+
+    def run(self):
+        timings = {}
+        try:
+            start = time.perf_counter()
+            items = self.pipeline.match(self.request)
+            timings["match"] = time.perf_counter() - start
+            if not self.pipeline.is_current(self.generation):
+                self.search_finished.emit(self.generation, None, timings)
+                return
+
+            start = time.perf_counter()
+            items = self.pipeline.sort(items, self.request)
+            timings["sort"] = time.perf_counter() - start
+        except Exception as e:
+            print(f"Ошибка поиска: {e}")
+            items = None
+
+        self.search_finished.emit(self.generation, items, timings)
+
+
+class SearchPipeline(QObject):
+    """Поиск по мере ввода: задержка ввода, отмена устаревших запросов, поиск в фоне
+
+    submit() запоминает последний запрос и запускает его после паузы в наборе
+    (или сразу, если immediate). Поиск (match) и сортировка (sort) выполняются в
+    фоновом потоке, не больше одного запроса одновременно; в GUI поток через
+    apply(items) попадает только результат последнего запроса. Время этапов
+    match/sort/render последнего примененного запроса лежит в last_timings и
+    передается сигналом timings_measured.
+    """
+    timings_measured = pyqtSignal(object)
+
+    def __init__(self, match, sort, apply, debounce_ms=SEARCH_DEBOUNCE_MS, name="Поиск"):
+        super().__init__()
+        self.match = match
+        self.sort = sort
+        self.apply = apply
+        self.name = name
+
+        self.generation = 0
+        self.pending_request = None
+        self.submitted_at = None
+        self.thread = None
+        self.last_timings = {}
+        self.stats = {"submitted": 0, "superseded": 0, "applied": 0}
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.start_pending)
+
+    def submit(self, request, immediate=False):
+        """Поставить запрос в очередь; предыдущий еще не примененный запрос отменяется"""
+        if self.pending_request is not None or self.thread is not None:
+            self.stats["superseded"] += 1
+        self.stats["submitted"] += 1
+
+        self.generation += 1
+        self.pending_request = request
+        self.submitted_at = time.perf_counter()
+
+        if immediate:
+            self.debounce_timer.stop()
+            self.start_pending()
+        else:
+            self.debounce_timer.start()
+
+    def cancel(self):
+        """Отменить ожидающий и выполняющийся запросы (например, при смене данных)"""
+        self.generation += 1
+        self.pending_request = None
+        self.debounce_timer.stop()
+
+    def is_current(self, generation):
+        return generation == self.generation
+
+    def start_pending(self):
+        # Следующий запрос стартует, когда текущий поток закончит работу
+        if self.thread is not None or self.pending_request is None:
+            return
+
+        request, self.pending_request = self.pending_request, None
+        self.thread = SearchThread(self, self.generation, request)
+        self.thread.search_finished.connect(self._on_search_finished)
+        self.thread.start()
+
+    def _on_search_finished(self, generation, items, timings):
+        self.thread.wait()
+        self.thread = None
+
+        if items is not None and self.is_current(generation):
+            start = time.perf_counter()
+            try:
+                self.apply(items)
+            except Exception as e:
+                print(f"Ошибка отображения результатов поиска: {e}")
+            timings["render"] = time.perf_counter() - start
+            self.report(timings, len(items))
+
+        self.start_pending()
+
+    def report(self, timings, count):
+        """Сохранить и записать в лог время этапов примененного запроса"""
+        self.stats["applied"] += 1
+        timings["total"] = time.perf_counter() - self.submitted_at
+        self.last_timings = timings
+        self.timings_measured.emit(timings)
+
+        stages = ", ".join(f"{stage} {timings.get(stage, 0) * 1000:.1f} мс" for stage in SEARCH_STAGES)
+        debug_log(
+            f"{self.name}: найдено {count}, {stages}, от ввода {timings['total'] * 1000:.1f} мс "
+            f"(запросов {self.stats['submitted']}, отменено {self.stats['superseded']})"
+        )
+
+    def shutdown(self):
+        """Дождаться фонового поиска (при выходе из программы)"""
+        self.cancel()
+        if self.thread is not None:
+            self.thread.wait(1000)
@@ -0,0 +1,261 @@
+import threading
+import time
+import requests
+from download_journal import DownloadJournal
+from rate_limiter import get_bandwidth_limiter
+from http_client import get_http_session, CONNECT_TIMEOUT
+
+
+DEFAULT_SEGMENTS = 4
+MIN_SEGMENT_SIZE = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, 30)
+SEGMENT_RETRIES = 3
+JOURNAL_SAVE_INTERVAL = 1.0
+
+
+class DownloadCancelled(Exception):
+    """Скачивание отменено пользователем"""
+    pass
+
+
+def parse_content_range(value):
+    """Разбор заголовка Content-Range вида 'bytes 0-0/12345', возвращает общий размер"""
+    if not value or '/' not in value:
+        return 0
+
+    total = value.rsplit('/', 1)[1].strip()
+    if total.isdigit():
+        return int(total)
+    return 0
+
+
+class SegmentedDownloader:
+    """Скачивание файла несколькими параллельными соединениями по диапазонам байт"""
+
+    def __init__(self, url, file_path, segments=DEFAULT_SEGMENTS, progress_callback=None, session=None, throttle=None):
+        self.source_url = url
+        self.url = url
+        self.file_path = file_path
+        self.segments = max(1, segments)
+        self.progress_callback = progress_callback
+        self.session = session or get_http_session()
+        self.throttle = throttle
+
+        self.total_size = 0
+        self.accepts_ranges = False
+        self.etag = None
+        self.last_modified = None
+        self.downloaded = 0
+        self.resumed_bytes = 0
+
+        self.journal = DownloadJournal(file_path)
+
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._abort_event = threading.Event()
+        self._errors = []
+
+    def cancel(self):
+        """Отменить скачивание"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _should_stop(self):
+        return self._cancel_event.is_set() or self._abort_event.is_set()
+
+    def _get(self, headers=None):
+        """Потоковый GET через общую сессию (без проверки сертификата, как раньше)"""
+        # Без сжатия, иначе смещения Range не совпадут с байтами файла
+        request_headers = {'Accept-Encoding': 'identity'}
+        request_headers.update(headers or {})
+        return self.session.get(self.url, headers=request_headers, stream=True, timeout=REQUEST_TIMEOUT, verify=False)
+
+    def probe(self):
+        """Проверка поддержки Range и размера файла запросом первого байта"""
+        with self._get({'Range': 'bytes=0-0'}) as response:
+            response.raise_for_status()
+            self.url = response.url or self.url
+            self.etag = response.headers.get('ETag')
+            self.last_modified = response.headers.get('Last-Modified')
+
+            if response.status_code == 206:
+                self.total_size = parse_content_range(response.headers.get('Content-Range'))
+                self.accepts_ranges = self.total_size > 0
+            else:
+                self.total_size = int(response.headers.get('Content-Length') or 0)
+                self.accepts_ranges = False
+
+        return self.total_size, self.accepts_ranges
+
+    def plan_segments(self):
+        """Разбиение файла на диапазоны байт [start, end] включительно"""
+        if not self.accepts_ranges or self.total_size <= 0:
+            return []
+
+        count = min(self.segments, max(1, self.total_size // MIN_SEGMENT_SIZE))
+        segment_size = self.total_size // count
+
+        ranges = []
+        for i in range(count):
+            start = i * segment_size
+            end = self.total_size - 1 if i == count - 1 else start + segment_size - 1
+            ranges.append({"start": start, "end": end, "done": 0})
+
+        return ranges
+
+    def download(self):
+        """Скачать файл, возвращает путь к файлу"""
+        own_throttle = self.throttle is None
+        if own_throttle:
+            self.throttle = get_bandwidth_limiter().create_transfer()
+
+        try:
+            try:
+                self.probe()
+            except (requests.RequestException, OSError, ValueError):
+                self.accepts_ranges = False
+
+            if self.accepts_ranges:
+                self._download_ranges()
+            else:
+                self.journal.remove()
+                self._download_single()
+        finally:
+            if own_throttle:
+                self.throttle.close()
+
+        if self.cancelled:
+            raise DownloadCancelled()
+
+        return self.file_path
+
+    def _report(self, amount):
+        with self._lock:
+            self.downloaded += amount
+            if self.progress_callback:
+                self.progress_callback(self.downloaded, self.total_size)
+
+    def _download_single(self):
+        """Скачивание одним потоком для серверов без поддержки Range"""
+        with self._get() as response:
+            response.raise_for_status()
+            if not self.total_size:
+                self.total_size = int(response.headers.get('Content-Length') or 0)
+
+            with open(self.file_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if self._should_stop():
+                        break
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    self._report(len(chunk))
+                    self.throttle.consume(len(chunk), self._should_stop)
+
+    def _prepare_journal(self):
+        """Продолжить по журналу или начать новую загрузку с предвыделением файла"""
+        if self.journal.load() and self.journal.matches(self.source_url, self.total_size, self.etag, self.last_modified):
+            self.resumed_bytes = self.journal.completed_bytes()
+            self.downloaded = self.resumed_bytes
+            print(f"Продолжение загрузки: {self.resumed_bytes} из {self.total_size} байт уже скачано")
+            return
+
+        self.journal.url = self.source_url
+        self.journal.etag = self.etag
+        self.journal.last_modified = self.last_modified
+        self.journal.total_size = self.total_size
+        self.journal.segments = self.plan_segments()
+
+        with open(self.file_path, 'wb') as f:
+            f.truncate(self.total_size)
+
+        self.journal.save()
+
+    def _download_ranges(self):
+        """Параллельное скачивание диапазонов в заранее выделенный файл"""
+        self._prepare_journal()
+
+        workers = []
+        for segment in self.journal.segments:
+            if segment["done"] >= segment["end"] - segment["start"] + 1:
+                continue
+            worker = threading.Thread(target=self._segment_worker, args=(segment,), daemon=True)
+            workers.append(worker)
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+        with self._lock:
+            self.journal.save()
+
+        if self._errors:
+            raise self._errors[0]
+
+        if self.journal.is_complete():
+            self.journal.remove()
+
+    def _segment_worker(self, segment):
+        """Скачивание одного диапазона байт с повтором при обрыве соединения"""
+        attempt = 0
+
+        while not self._should_stop():
+            try:
+                self._fetch_segment(segment)
+                return
+            except Exception as e:
+                attempt += 1
+                if attempt > SEGMENT_RETRIES or self._should_stop():
+                    with self._lock:
+                        self._errors.append(e)
+                    self._abort_event.set()
+                    return
+                time.sleep(attempt)
+
+    def _fetch_segment(self, segment):
+        """Запрос оставшейся части диапазона и запись в файл"""
+        start = segment["start"] + segment["done"]
+        end = segment["end"]
+        if start > end:
+            return
+
+        headers = {'Range': f'bytes={start}-{end}'}
+        validator = self.etag or self.last_modified
+        if validator:
+            headers['If-Range'] = validator
+
+        with self._get(headers) as response:
+            if response.status_code != 206:
+                raise IOError(f"Сервер не вернул диапазон {start}-{end} (HTTP {response.status_code})")
+
+            expected = end - start + 1
+            received = 0
+
+            # Без буферизации: журнал не должен опережать реально записанные данные
+            with open(self.file_path, 'r+b', buffering=0) as f:
+                f.seek(start)
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if received >= expected or self._should_stop():
+                        break
+                    chunk = chunk[:expected - received]
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    received += len(chunk)
+
+                    with self._lock:
+                        segment["done"] += len(chunk)
+                        self.downloaded += len(chunk)
+                        if self.progress_callback:
+                            self.progress_callback(self.downloaded, self.total_size)
+                        if time.time() - self.journal.last_saved >= JOURNAL_SAVE_INTERVAL:
+                            self.journal.save()
+
+                    self.throttle.consume(len(chunk), self._should_stop)
+
+            if received < expected and not self._should_stop():
+                raise IOError(f"Диапазон {start}-{end} получен не полностью ({received}/{expected})")
@@ -18,10 +18,14 @@ class SettingsManager:
             "last_scan_timestamp": None,
             "scan_on_startup": True,
             "notifications_enabled": True,
+            "max_active_downloads": 3,
+            "bandwidth_limit_kbps": 0,
+            "per_download_limit_kbps": 0,
             "theme": "dark"
         }
         self.settings = self.load_settings()
         self.scan_cache = self.load_scan_cache()
+        self.change_listeners = []
     
     def load_settings(self) -> Dict[str, Any]:
         """Загрузка настроек из JSON файла"""
@@ -113,7 +117,25 @@ class SettingsManager:
     def set_setting(self, key: str, value: Any) -> bool:
         """Установка значения настройки"""
         self.settings[key] = value
-        return self.save_settings()
+        result = self.save_settings()
+        
+        for listener in list(self.change_listeners):
+            try:
+                listener(key, value)
+            except Exception as e:
+                print(f"Ошибка обработчика изменения настройки {key}: {e}")
+        
+        return result
+    
+    def add_change_listener(self, callback) -> None:
+        """Подписка на изменения настроек: callback(key, value)"""
+        if callback not in self.change_listeners:
+            self.change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback) -> None:
+        """Отписка от изменений настроек"""
+        if callback in self.change_listeners:
+            self.change_listeners.remove(callback)
     
     def get_cached_status(self, item_name: str, item_type: str) -> Dict[str, Any]:
         """Получение статуса из кеша"""
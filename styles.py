@@ -0,0 +1,192 @@
+"""Общие классы стилей для карточек
+
+Вместо отдельного QSS у каждой карточки, метки и кнопки стили описаны здесь один
+раз как именованные классы. Они собираются в одну таблицу стилей, которая
+ставится на контейнер карточек (install_style_sheet), а виджету достаточно
+получить имя класса через динамическое свойство (set_style_class). Так Qt
+разбирает QSS один раз, а не при создании каждой карточки.
+
+Таблица ставится на контейнер, а не на QApplication: правило вкладки
+"QWidget { background-color: ... }" стоит ближе к карточкам и перекрыло бы
+таблицу приложения.
+"""
+from PyQt6.QtCore import Qt
+
+
+STYLE_CLASS_PROPERTY = "styleClass"
+
+TOOLTIP_STYLE = """
+    background-color: #2d2d2d;
+    color: #ffffff;
+    border: 1px solid #555555;
+    border-radius: 4px;
+    padding: 8px;
+    font-size: 12px;
+"""
+
+# Имя класса -> {состояние селектора: объявления}; "" - базовое правило
+STYLE_CLASSES = {
+    "transparent": {
+        "": "background: transparent; border: none;",
+    },
+    "card": {
+        "": "background-color: #252525; border: none; border-radius: 15px; padding: 0px;",
+        ":hover": "background-color: #2d2d2d; border: 2px solid #404040;",
+    },
+    "card-status": {
+        "": """
+            background-color: transparent;
+            border: none;
+            min-width: 24px;
+            max-width: 24px;
+            min-height: 24px;
+            max-height: 24px;
+        """,
+    },
+    "card-logo": {
+        "": """
+            color: #ffffff;
+            font-size: 48px;
+            font-family: 'Segoe UI Emoji', 'Apple Color Emoji', 'Noto Color Emoji', sans-serif;
+            background: transparent;
+            border: none;
+        """,
+    },
+    "card-name": {
+        "": """
+            color: #ffffff;
+            font-size: 15px;
+            font-weight: bold;
+            font-family: 'Segoe UI', Arial, sans-serif;
+            background: transparent;
+            border: none;
+            padding: 5px;
+        """,
+    },
+    "card-favorite": {
+        "": "background: transparent; border: none; color: #666666; font-size: 22px; font-weight: bold;",
+        '[favorite="true"]': "color: #ff4757;",
+        ":hover": "color: #ff4757;",
+    },
+    "card-recommendation": {
+        "": """
+            color: #cccccc;
+            font-size: 9px;
+            font-weight: bold;
+            background: rgba(128, 128, 128, 0.1);
+            border: 1px solid #888888;
+            border-radius: 4px;
+            padding: 2px 6px;
+            margin: 1px;
+        """,
+    },
+    "download-card": {
+        "": """
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 #2d2d2d, stop:1 #252525);
+            border: 2px solid #404040;
+            border-radius: 18px;
+            padding: 0px;
+        """,
+        ":hover": """
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 #353535, stop:1 #2d2d2d);
+            border: 2px solid #666666;
+        """,
+    },
+    "download-glyph": {
+        "": "color: #cccccc; font-size: 52px; background: transparent; border: none;",
+    },
+    "download-name": {
+        "": "color: #ffffff; font-size: 13px; font-weight: bold; background: transparent; border: none; padding: 0px 5px;",
+    },
+    "download-info": {
+        "": "background-color: rgba(58, 58, 58, 0.5); border-radius: 8px; border: 1px solid #555555;",
+    },
+    "download-meta": {
+        "": "color: #cccccc; font-size: 11px; font-weight: bold; background: transparent; border: none;",
+    },
+    "download-run": {
+        "": """
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 #4CAF50, stop:1 #45a049);
+            color: white;
+            border: 1px solid #4CAF50;
+            padding: 8px 16px;
+            border-radius: 8px;
+            font-size: 13px;
+            font-weight: bold;
+            outline: none;
+            text-align: left;
+        """,
+        ":hover": """
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 #5CBF60, stop:1 #4CAF50);
+            border: 1px solid #5CBF60;
+        """,
+        ":pressed": """
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 #45a049, stop:1 #3d8b40);
+        """,
+    },
+    "download-delete": {
+        "": """
+            background-color: rgba(244, 67, 54, 0.1);
+            color: #f44336;
+            border: 1px solid rgba(244, 67, 54, 0.3);
+            border-radius: 16px;
+            font-size: 14px;
+            font-weight: bold;
+            outline: none;
+        """,
+        ":hover": "background-color: rgba(244, 67, 54, 0.2); border: 1px solid rgba(244, 67, 54, 0.5);",
+        ":pressed": "background-color: rgba(244, 67, 54, 0.3); border: 1px solid #f44336;",
+    },
+}
+
+
+def compile_style_sheet(style_classes=STYLE_CLASSES):
+    """Собрать классы стилей в одну таблицу QSS"""
+    rules = [f"QToolTip {{{TOOLTIP_STYLE}}}"]
+    for name, states in style_classes.items():
+        for state, declarations in states.items():
+            rules.append(f'*[{STYLE_CLASS_PROPERTY}="{name}"]{state} {{{declarations}}}')
+    return "\n".join(rules)
+
+
+_style_sheet = None
+
+def get_style_sheet():
+    """Получить собранную таблицу стилей (собирается один раз)"""
+    global _style_sheet
+    if _style_sheet is None:
+        _style_sheet = compile_style_sheet()
+    return _style_sheet
+
+
+def install_style_sheet(widget):
+    """Поставить общую таблицу стилей на контейнер карточек"""
+    widget.setStyleSheet(get_style_sheet())
+
+
+def set_style_class(widget, name):
+    """Назначить виджету класс стиля (до показа виджета перерисовка не нужна)"""
+    if name not in STYLE_CLASSES:
+        raise ValueError(f"Неизвестный класс стиля: {name}")
+    if widget.property(STYLE_CLASS_PROPERTY) != name:
+        widget.setProperty(STYLE_CLASS_PROPERTY, name)
+        repolish(widget)
+
+
+def set_style_state(widget, name, value):
+    """Изменить свойство-состояние (например, favorite) и обновить вид виджета"""
+    if widget.property(name) != value:
+        widget.setProperty(name, value)
+        repolish(widget)
+
+
+def repolish(widget):
+    """Заново применить таблицу стилей к уже показанному виджету"""
+    if widget.testAttribute(Qt.WidgetAttribute.WA_WState_Polished):
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
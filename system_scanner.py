@@ -1,129 +1,512 @@
-import winreg
 import os
-import subprocess
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Set
 from settings_manager import settings_manager
+from temp_manager import debug_log
+from inventory_providers import InventoryProvider, get_inventory_provider
 from PyQt6.QtCore import QThread, pyqtSignal
 
 
+NOT_INSTALLED = {"installed": False, "exact_name": None, "version": None}
+DRIVERS_SOURCE = "drivers"
+DIRECTX_STATUS_NAME = "DirectX (системный)"
+GENERAL_EXCLUSIONS = ['basic', 'standard', 'generic', 'pnp']
+SYSTEM_EXCLUSIONS = ['microsoft', 'windows']
+BRAND_EXCLUSIONS = {
+    'amd': ['processor', 'chipset', 'gpio', 'pci', 'smbus', 'balanced', 'dvr64', 'wvr64', 'crash defender'],
+    'intel': ['management', 'mei', 'serial', 'thermal', 'platform'],
+    'nvidia': ['audio', 'usb', 'serial']
+}
+
+KEY_BRANDS = {'java', 'nvidia', 'amd', 'intel', 'microsoft', 'directx', 'visual', 'net'}
+PENALTY_WORDS = ['auto', 'updater', 'update', 'launcher', 'installer', 'setup']
+BONUS_WORDS = ['runtime', 'framework', 'redistributable', 'sdk']
+# В индексе из нескольких названий (добавленные при повторном сканировании) подстрока ищется перебором
+LINEAR_SCAN_NAMES = 32
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def empty_changes() -> Dict[str, Set[str]]:
+    """Изменения названий между сканированиями: добавлены, удалены, изменилась версия"""
+    return {"added": set(), "removed": set(), "updated": set()}
+
+
+def diff_installed(old_names: Set[str], old_versions: Dict[str, str],
+                   new_names: Set[str], new_versions: Dict[str, str]) -> Dict[str, Set[str]]:
+    changes = empty_changes()
+    changes["added"] = new_names - old_names
+    changes["removed"] = old_names - new_names
+    changes["updated"] = {
+        name for name in new_names & old_names if new_versions.get(name) != old_versions.get(name)
+    }
+    return changes
+
+
+def merge_changes(target: Dict[str, Set[str]], changes: Dict[str, Set[str]]):
+    for kind, names in changes.items():
+        target[kind] |= names
+
+
+class InstalledNameIndex:
+    """Индекс названий установленных программ или драйверов для проверки статусов
+
+    Каждое название один раз приводится к нижнему регистру, очищается и
+    разбивается на слова. Кандидаты для элемента каталога берутся из индексов
+    (слово -> названия для программ, триграмма -> названия для поиска подстроки
+    у драйверов), и правила сравнения применяются только к ним. Названия
+    нумеруются в порядке обхода исходного множества, поэтому "первое
+    совпадение" и выбор среди равных оценок совпадают с полным перебором.
+
+    После повторного сканирования индекс не перестраивается (apply_changes):
+    новые названия получают номера после известных, удаленные помечаются.
+    Поэтому добавленное название не вытесняет прежнее совпадение при равенстве,
+    и статусы можно обновлять только у затронутых элементов каталога.
+
+    Разбор отдельных названий хранится в cache, общем для индексов одного
+    сканера: заново разбираются только новые названия.
+    """
+    
+    def __init__(self, scanner: "SystemScanner", names: Set[str], cache: Dict = None):
+        self.scanner = scanner
+        self.source = names
+        self.cache = cache if cache is not None else {}
+        self.reset(list(names))
+    
+    def reset(self, names: List[str]):
+        """Пронумеровать названия заново в заданном порядке (построенные части индекса строятся снова)"""
+        self.names = names
+        self.lower = [name.lower() for name in self.names]
+        self.positions = {name: position for position, name in enumerate(self.names)}
+        self.dead = set()
+        self.clean_names = None
+        self.word_postings = None
+        self.trigram_postings = None
+    
+    def apply_changes(self, names: Set[str], added: Set[str], removed: Set[str]):
+        """Перейти к новому набору названий names, дописав added и пометив removed"""
+        self.source = names
+        for name in removed:
+            position = self.positions.pop(name, None)
+            if position is not None:
+                self.dead.add(position)
+        
+        for name in added:
+            if name in self.positions:
+                continue
+            position = len(self.names)
+            self.names.append(name)
+            self.lower.append(name.lower())
+            self.positions[name] = position
+            if self.word_postings is not None:
+                self.add_program_postings(position)
+            if self.trigram_postings is not None:
+                self.add_driver_postings(position)
+        
+        # Когда удаленных много, номера сжимаются с сохранением порядка
+        if len(self.dead) * 2 > len(self.names):
+            self.reset([name for position, name in enumerate(self.names) if position not in self.dead])
+    
+    def program_features(self, name: str):
+        """Очищенное название и его слова"""
+        features = self.cache.get(("program", name))
+        if features is None:
+            clean_name = self.scanner._clean_program_name(name)
+            features = (clean_name, set(clean_name.split()))
+            self.cache[("program", name)] = features
+        return features
+    
+    def driver_features(self, name: str):
+        """Триграммы, ключевые слова, часть оценки и признаки исключений названия"""
+        features = self.cache.get(("driver", name))
+        if features is None:
+            key_words = set(self.scanner._extract_key_words(name))
+            features = (
+                trigrams(name),
+                key_words,
+                self.scanner._installed_score(name, len(key_words)),
+                (
+                    any(exclusion in name for exclusion in GENERAL_EXCLUSIONS),
+                    any(exclusion in name for exclusion in SYSTEM_EXCLUSIONS),
+                    {brand for brand, exclusions in BRAND_EXCLUSIONS.items() if any(exclusion in name for exclusion in exclusions)}
+                )
+            )
+            self.cache[("driver", name)] = features
+        return features
+    
+    def build_program_index(self):
+        """Очищенные названия и слово -> номера названий (для сравнения программ)"""
+        self.clean_names = []
+        self.word_postings = {}
+        for position in range(len(self.names)):
+            self.add_program_postings(position)
+    
+    def add_program_postings(self, position: int):
+        clean_name, words = self.program_features(self.lower[position])
+        self.clean_names.append(clean_name)
+        for word in words:
+            self.word_postings.setdefault(word, []).append(position)
+    
+    def build_driver_index(self):
+        """Триграммы, ключевые слова и не зависящие от драйвера части правил (для драйверов)"""
+        self.trigram_postings = {}
+        self.key_word_postings = {}
+        self.installed_scores = []
+        self.exclusion_flags = []
+        for position in range(len(self.names)):
+            self.add_driver_postings(position)
+    
+    def add_driver_postings(self, position: int):
+        name_trigrams, key_words, installed_score, exclusion_flags = self.driver_features(self.lower[position])
+        for trigram in name_trigrams:
+            self.trigram_postings.setdefault(trigram, []).append(position)
+        for word in key_words:
+            self.key_word_postings.setdefault(word, []).append(position)
+        
+        self.installed_scores.append(installed_score)
+        self.exclusion_flags.append(exclusion_flags)
+    
+    def containing(self, substring: str) -> Set[int]:
+        """Номера названий, содержащих подстроку"""
+        if self.trigram_postings is None:
+            self.build_driver_index()
+        
+        if len(substring) < 3 or len(self.names) <= LINEAR_SCAN_NAMES:
+            return {position for position, name in enumerate(self.lower)
+                    if substring in name and position not in self.dead}
+        
+        postings = sorted((self.trigram_postings.get(trigram, ()) for trigram in trigrams(substring)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return {position for position in candidates
+                if substring in self.lower[position] and position not in self.dead}
+    
+    def has_exclusions(self, position: int, driver_name: str) -> bool:
+        """То же, что SystemScanner._has_exclusions, по заранее вычисленным признакам"""
+        general, system, brands = self.exclusion_flags[position]
+        if general:
+            return True
+        if system and not ('visual' in driver_name or '.net' in driver_name or 'dotnet' in driver_name):
+            return True
+        return any(brand in driver_name for brand in brands)
+    
+    def find_program(self, target_name: str):
+        """Первое в порядке обхода название, подходящее по правилам _is_program_match"""
+        if self.word_postings is None:
+            self.build_program_index()
+        
+        target_clean, target_words = self.program_features(target_name)
+        
+        if not target_words:
+            # Пустое очищенное название подходит к любой программе
+            candidates = range(len(self.names))
+        elif len(target_words) <= 2:
+            postings = sorted((self.word_postings.get(word, ()) for word in target_words), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+            candidates = sorted(candidates)
+        else:
+            counts = Counter(position for word in target_words for position in self.word_postings.get(word, ()))
+            required = max(2, len(target_words) * 0.6)
+            candidates = sorted(position for position, count in counts.items() if count >= required)
+        
+        for position in candidates:
+            if position in self.dead:
+                continue
+            installed_clean = self.clean_names[position]
+            if target_clean == "opera" and "gx" in installed_clean:
+                continue
+            if "opera gx" in target_clean and "gx" not in installed_clean:
+                continue
+            return self.names[position]
+        return None
+    
+    def driver_matches(self, driver_name: str, driver_words: Set[str]):
+        """Кандидаты для драйвера: (номер названия, число общих ключевых слов, есть ли общий бренд)
+
+        Кандидат содержит хотя бы одно ключевое слово драйвера длиннее двух букв.
+        """
+        candidates = set()
+        for word in driver_words:
+            if len(word) > 2:
+                candidates |= self.containing(word)
+        
+        common_counts = Counter(
+            position for word in driver_words for position in self.key_word_postings.get(word, ())
+        )
+        common_brands = {
+            position for word in driver_words.intersection(KEY_BRANDS) for position in self.key_word_postings.get(word, ())
+        }
+        return candidates, common_counts, common_brands
+    
+    def find_best_program_for_driver(self, driver_name: str, driver_words: Set[str]):
+        """Программа с наибольшей оценкой по правилам _check_in_programs"""
+        best = self.best_program_for_driver(driver_name, driver_words)
+        return best[1] if best is not None else None
+    
+    def best_program_for_driver(self, driver_name: str, driver_words: Set[str]):
+        """(оценка, название) лучшей программы для драйвера или None"""
+        candidates, common_counts, common_brands = self.driver_matches(driver_name, driver_words)
+        net_matches = set()
+        if '.net' in driver_name or 'dotnet' in driver_name:
+            net_matches = self.containing('.net')
+        full_matches = self.containing(driver_name)
+        
+        # Оценка не зависит от фильтров, поэтому кандидаты проверяются от лучшей
+        # оценки к худшей (при равной - в порядке обхода, как у max()), и первый
+        # прошедший фильтры кандидат - ответ. Та же оценка, что
+        # _calculate_relevance_score: все слагаемые кратны 0.5 и складываются точно
+        scored = []
+        for position in candidates | net_matches:
+            score = 10.0 if position in full_matches else 0.0
+            score += common_counts.get(position, 0) * 2.5 + self.installed_scores[position]
+            scored.append((-score, position))
+        scored.sort()
+        
+        for negative_score, position in scored:
+            if self.has_exclusions(position, driver_name):
+                continue
+            if position in net_matches or self.scanner._is_relevant(
+                    driver_name, driver_words, self.lower[position],
+                    common_counts.get(position, 0), position in common_brands):
+                return -negative_score, self.names[position]
+        return None
+    
+    def find_driver(self, driver_name: str, driver_words: Set[str]):
+        """Первый в порядке обхода драйвер по правилам _check_in_drivers"""
+        candidates, common_counts, common_brands = self.driver_matches(driver_name, driver_words)
+        for position in sorted(candidates):
+            if self.has_exclusions(position, driver_name):
+                continue
+            if self.scanner._is_relevant(driver_name, driver_words, self.lower[position],
+                                         common_counts.get(position, 0), position in common_brands):
+                return self.names[position]
+        return None
+
+
 class SystemScanner:
     """Сканер установленных программ и драйверов в системе"""
     
-    def __init__(self):
+    def __init__(self, provider: InventoryProvider = None):
+        self.provider = provider or get_inventory_provider()
         self.installed_programs = set()
         self.installed_drivers = set()
         self.program_versions = {}
         self.driver_versions = {}
+        # Источник -> подраздел -> (время записи, название, версия); название None,
+        # если подраздел не описывает программу
+        self.program_entries = {}
+        self.source_fingerprints = {}
+        self._program_index = None
+        self._driver_index = None
+        self._name_cache = {}
+    
+    def program_index(self) -> InstalledNameIndex:
+        """Индекс установленных программ (перестраивается после нового сканирования)"""
+        if self._program_index is None or self._program_index.source is not self.installed_programs:
+            self._program_index = InstalledNameIndex(self, self.installed_programs, self._name_cache)
+        return self._program_index
+    
+    def driver_index(self) -> InstalledNameIndex:
+        """Индекс установленных драйверов (перестраивается после нового сканирования)"""
+        if self._driver_index is None or self._driver_index.source is not self.installed_drivers:
+            self._driver_index = InstalledNameIndex(self, self.installed_drivers, self._name_cache)
+        return self._driver_index
     
     def scan_installed_programs(self) -> Set[str]:
-        """Сканирование установленных программ через реестр Windows"""
-        programs = set()
-        versions = {}
+        """Сканирование установленных программ (разделы Uninstall реестра Windows)"""
+        results = {}
+        for source in self.provider.program_sources():
+            try:
+                results[source] = self.read_program_source(source)
+            except OSError:
+                continue
         
-        registry_paths = [
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
-        ]
+        return self.apply_program_sources(results)
+    
+    def read_program_source(self, source: str):
+        """Прочитать один раздел Uninstall: (отпечаток, подраздел -> запись), состояние сканера не меняется"""
+        # Отпечаток берется до чтения, чтобы изменения во время чтения не потерялись
+        fingerprint = self.provider.source_fingerprint(source)
+        records = self.provider.read_programs(source)
+        return fingerprint, {record["Subkey"]: self._program_entry(record) for record in records}
+    
+    def apply_program_sources(self, results) -> Set[str]:
+        """Собрать программы из прочитанных разделов (в порядке results)"""
+        self.program_entries = {source: entries for source, (_, entries) in results.items()}
+        self.source_fingerprints = {source: fingerprint for source, (fingerprint, _) in results.items()}
+        self.installed_programs, self.program_versions = self._programs_from_entries(self.program_entries)
+        return self.installed_programs
+    
+    def rescan_installed_programs(self) -> Dict[str, Set[str]]:
+        """Повторное сканирование программ: перечитываются только новые и измененные подразделы
+
+        Если отпечаток раздела не изменился, набор подразделов тот же и
+        проверяется только время записи известных подразделов.
+        """
+        entries = {}
+        fingerprints = {}
+        reread = 0
         
-        for hkey, path in registry_paths:
+        for source in self.provider.program_sources():
+            old_entries = self.program_entries.get(source)
             try:
-                with winreg.OpenKey(hkey, path) as key:
-                    for i in range(winreg.QueryInfoKey(key)[0]):
-                        try:
-                            subkey_name = winreg.EnumKey(key, i)
-                            with winreg.OpenKey(key, subkey_name) as subkey:
-                                try:
-                                    display_name = winreg.QueryValueEx(subkey, "DisplayName")[0]
-                                    if display_name and len(display_name.strip()) > 2:
-                                        programs.add(display_name.strip())
-                                        
-                                        try:
-                                            version = winreg.QueryValueEx(subkey, "DisplayVersion")[0]
-                                            if version:
-                                                versions[display_name.strip()] = version.strip()
-                                        except FileNotFoundError:
-                                            pass
-                                            
-                                except FileNotFoundError:
-                                    pass
-                        except (OSError, FileNotFoundError):
-                            continue
-            except (OSError, FileNotFoundError):
+                fingerprint = self.provider.source_fingerprint(source)
+                if old_entries is not None and fingerprint is not None and fingerprint == self.source_fingerprints.get(source):
+                    stamps = self.provider.program_stamps(source, list(old_entries))
+                else:
+                    stamps = self.provider.program_stamps(source)
+            except OSError:
                 continue
+            
+            source_entries = {}
+            for subkey, stamp in stamps.items():
+                entry = old_entries.get(subkey) if old_entries else None
+                if entry is None or stamp is None or entry[0] != stamp:
+                    try:
+                        entry = self._program_entry(self.provider.read_program(source, subkey))
+                    except OSError:
+                        continue
+                    reread += 1
+                source_entries[subkey] = entry
+            
+            entries[source] = source_entries
+            fingerprints[source] = fingerprint
         
-        self.installed_programs = programs
+        programs, versions = self._programs_from_entries(entries)
+        changes = diff_installed(self.installed_programs, self.program_versions, programs, versions)
+        
+        self.program_entries = entries
+        self.source_fingerprints = fingerprints
+        # Тот же набор названий - тот же объект, и индекс программ не перестраивается
+        if changes["added"] or changes["removed"]:
+            self.installed_programs = programs
+            if self._program_index is not None:
+                self._program_index.apply_changes(programs, changes["added"], changes["removed"])
         self.program_versions = versions
-        return programs
+        
+        debug_log(
+            f"Повторное сканирование программ: перечитано подразделов {reread}, "
+            f"добавлено {len(changes['added'])}, удалено {len(changes['removed'])}, "
+            f"обновлено {len(changes['updated'])}"
+        )
+        return changes
+    
+    def _program_entry(self, record: Dict[str, str]):
+        """Запись подраздела -> (время записи, название, версия) по прежним правилам сканирования"""
+        display_name = record.get("DisplayName")
+        if not display_name or len(display_name.strip()) <= 2:
+            return (record.get("LastWrite"), None, None)
+        
+        version = record.get("DisplayVersion")
+        return (record.get("LastWrite"), display_name.strip(), version.strip() if version else None)
+    
+    def _programs_from_entries(self, entries):
+        """Названия и версии программ в порядке обхода разделов и подразделов"""
+        programs = set()
+        versions = {}
+        for source_entries in entries.values():
+            for _, name, version in source_entries.values():
+                if name:
+                    programs.add(name)
+                    if version:
+                        versions[name] = version
+        return programs, versions
     
     def scan_installed_drivers(self) -> Set[str]:
-        """Сканирование установленных драйверов через PowerShell"""
+        """Сканирование установленных драйверов (Win32_PnPSignedDriver)"""
+        self.installed_drivers, self.driver_versions = self.read_installed_drivers()
+        return self.installed_drivers
+    
+    def read_installed_drivers(self):
+        """Запросить драйверы: (названия, версии), состояние сканера не меняется"""
         drivers = set()
         versions = {}
         
-        try:
-            powershell_command = """
-            Get-WmiObject Win32_PnPSignedDriver | Where-Object {
-                $_.DeviceName -and 
-                $_.DriverVersion -and 
-                $_.DeviceName -notlike "*Generic*" -and
-                $_.DeviceName -notlike "*Standard*" -and
-                $_.DeviceName -notlike "*Basic*" -and
-                $_.DeviceName -notlike "*Microsoft*" -and
-                $_.DeviceName -notlike "*Windows*"
-            } | Select-Object DeviceName, DriverVersion, DriverDate | 
-            ConvertTo-Json
-            """
-            
-            result = subprocess.run(
-                ["powershell", "-Command", powershell_command],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+        for driver in self.provider.read_drivers():
+            if driver.get("DeviceName"):
+                device_name = driver["DeviceName"].strip()
+                drivers.add(device_name)
+                if driver.get("DriverVersion"):
+                    versions[device_name] = driver["DriverVersion"].strip()
+        
+        return drivers, versions
+    
+    def scan_all(self, on_source=None):
+        """Полное сканирование: разделы реестра и запрос драйверов выполняются параллельно
+
+        Источники читаются на пуле потоков (обход реестра и ожидание PowerShell
+        отпускают GIL). on_source(source, names, versions) вызывается в
+        вызывающем потоке, как только готов очередной источник (DRIVERS_SOURCE
+        для драйверов). Программы собираются в порядке источников, как при
+        последовательном сканировании.
+        """
+        sources = self.provider.program_sources()
+        program_results = {}
+        driver_result = (set(), {})
+        
+        with ThreadPoolExecutor(max_workers=len(sources) + 1) as pool:
+            futures = {pool.submit(self.read_program_source, source): source for source in sources}
+            futures[pool.submit(self.read_installed_drivers)] = DRIVERS_SOURCE
             
-            if result.returncode == 0 and result.stdout.strip():
-                import json
+            for future in as_completed(futures):
+                source = futures[future]
                 try:
-                    driver_data = json.loads(result.stdout)
-                    if isinstance(driver_data, list):
-                        for driver in driver_data:
-                            if driver.get("DeviceName"):
-                                device_name = driver["DeviceName"].strip()
-                                drivers.add(device_name)
-                                if driver.get("DriverVersion"):
-                                    versions[device_name] = driver["DriverVersion"].strip()
-                    elif isinstance(driver_data, dict) and driver_data.get("DeviceName"):
-                        device_name = driver_data["DeviceName"].strip()
-                        drivers.add(device_name)
-                        if driver_data.get("DriverVersion"):
-                            versions[device_name] = driver_data["DriverVersion"].strip()
-                except json.JSONDecodeError:
-                    pass
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError, FileNotFoundError):
-            pass
-        
-        self.installed_drivers = drivers
-        self.driver_versions = versions
-        return drivers
+                    result = future.result()
+                except OSError:
+                    continue
+                
+                if source == DRIVERS_SOURCE:
+                    driver_result = result
+                    names, versions = result
+                else:
+                    program_results[source] = result
+                    names, versions = self._programs_from_entries({source: result[1]})
+                
+                if on_source is not None:
+                    on_source(source, names, versions)
+        
+        self.apply_program_sources({source: program_results[source] for source in sources if source in program_results})
+        self.installed_drivers, self.driver_versions = driver_result
+    
+    def rescan_installed_drivers(self) -> Dict[str, Set[str]]:
+        """Повторное сканирование драйверов: список запрашивается целиком, возвращаются отличия"""
+        old_drivers, old_versions = self.installed_drivers, self.driver_versions
+        drivers = self.scan_installed_drivers()
+        changes = diff_installed(old_drivers, old_versions, drivers, self.driver_versions)
+        
+        if not changes["added"] and not changes["removed"]:
+            self.installed_drivers = old_drivers
+        elif self._driver_index is not None:
+            self._driver_index.apply_changes(drivers, changes["added"], changes["removed"])
+        return changes
+    
+    def rescan(self) -> Dict[str, Dict[str, Set[str]]]:
+        """Повторное сканирование программ и драйверов после полного"""
+        return {
+            "programs": self.rescan_installed_programs(),
+            "drivers": self.rescan_installed_drivers()
+        }
     
     def check_program_installed(self, program_name: str) -> Dict[str, any]:
         """Проверка установлена ли конкретная программа"""
-        program_name_lower = program_name.lower()
-        
-        for installed_program in self.installed_programs:
-            installed_lower = installed_program.lower()
-            
-            if self._is_program_match(program_name_lower, installed_lower):
-                return {
-                    "installed": True,
-                    "exact_name": installed_program,
-                    "version": self.program_versions.get(installed_program, "Неизвестно")
-                }
+        installed_program = self.program_index().find_program(program_name.lower())
+        if installed_program is not None:
+            return {
+                "installed": True,
+                "exact_name": installed_program,
+                "version": self.program_versions.get(installed_program, "Неизвестно")
+            }
         
-        return {"installed": False, "exact_name": None, "version": None}
+        return dict(NOT_INSTALLED)
     
     def check_driver_installed(self, driver_name: str) -> Dict[str, any]:
         """Проверка установлен ли конкретный драйвер или программа"""
@@ -133,7 +516,7 @@ class SystemScanner:
             if self._check_directx_installed():
                 return {
                     "installed": True,
-                    "exact_name": "DirectX (системный)",
+                    "exact_name": DIRECTX_STATUS_NAME,
                     "version": "Установлен"
                 }
         
@@ -147,68 +530,55 @@ class SystemScanner:
         
         return {"installed": False, "exact_name": None, "version": None}
     
+    def driver_words(self, driver_name_lower: str) -> Set[str]:
+        """Ключевые слова названия драйвера из каталога (запоминаются между проверками)"""
+        words = self._name_cache.get(("words", driver_name_lower))
+        if words is None:
+            words = set(self._extract_key_words(driver_name_lower))
+            self._name_cache[("words", driver_name_lower)] = words
+        return words
+    
     def _check_in_programs(self, driver_name: str) -> Dict[str, any]:
         """Проверка драйвера среди установленных программ"""
         driver_name_lower = driver_name.lower()
-        driver_words = set(self._extract_key_words(driver_name_lower))
-        
-        candidates = []  
+        driver_words = self.driver_words(driver_name_lower)
         
-        for installed_program in self.installed_programs:
-            installed_lower = installed_program.lower()
-            
-            if ('.net' in driver_name_lower or 'dotnet' in driver_name_lower) and '.net' in installed_lower:
-                if not self._has_exclusions(installed_lower, driver_name_lower):
-                    candidates.append({
-                        "program": installed_program,
-                        "score": self._calculate_relevance_score(driver_name_lower, installed_lower)
-                    })
-                    continue
-            
-            if any(word in installed_lower for word in driver_words if len(word) > 2):
-                if not self._has_exclusions(installed_lower, driver_name_lower):
-                    if self._is_relevant_match(driver_name_lower, installed_lower):
-                        candidates.append({
-                            "program": installed_program,
-                            "score": self._calculate_relevance_score(driver_name_lower, installed_lower)
-                        })
-        
-        if candidates:
-            best_candidate = max(candidates, key=lambda x: x["score"])
+        best_program = self.program_index().find_best_program_for_driver(driver_name_lower, driver_words)
+        if best_program is not None:
             return {
                 "installed": True,
-                "exact_name": best_candidate["program"],
-                "version": self.program_versions.get(best_candidate["program"], "Неизвестно")
+                "exact_name": best_program,
+                "version": self.program_versions.get(best_program, "Неизвестно")
             }
         
-        return {"installed": False, "exact_name": None, "version": None}
+        return dict(NOT_INSTALLED)
     
     def _check_in_drivers(self, driver_name: str) -> Dict[str, any]:
         """Проверка драйвера среди системных драйверов"""
         driver_name_lower = driver_name.lower()
-        driver_words = set(self._extract_key_words(driver_name_lower))
+        driver_words = self.driver_words(driver_name_lower)
         
-        for installed_driver in self.installed_drivers:
-            installed_lower = installed_driver.lower()
-            
-            if any(word in installed_lower for word in driver_words if len(word) > 2):
-                if not self._has_exclusions(installed_lower, driver_name_lower):
-                    if self._is_relevant_match(driver_name_lower, installed_lower):
-                        return {
-                            "installed": True,
-                            "exact_name": installed_driver,
-                            "version": self.driver_versions.get(installed_driver, "Неизвестно")
-                        }
+        installed_driver = self.driver_index().find_driver(driver_name_lower, driver_words)
+        if installed_driver is not None:
+            return {
+                "installed": True,
+                "exact_name": installed_driver,
+                "version": self.driver_versions.get(installed_driver, "Неизвестно")
+            }
         
-        return {"installed": False, "exact_name": None, "version": None}
+        return dict(NOT_INSTALLED)
     
     def _is_relevant_match(self, driver_name: str, installed_name: str) -> bool:
         """Проверка релевантности совпадения"""
         driver_words = set(self._extract_key_words(driver_name))
         installed_words = set(self._extract_key_words(installed_name))
-        
         common_words = driver_words.intersection(installed_words)
-        
+        return self._is_relevant(driver_name, driver_words, installed_name,
+                                 len(common_words), bool(common_words.intersection(KEY_BRANDS)))
+    
+    def _is_relevant(self, driver_name: str, driver_words: Set[str], installed_name: str,
+                     common_count: int, common_brand: bool) -> bool:
+        """Правила релевантности по числу общих ключевых слов и наличию среди них общего бренда"""
         if 'amd' in driver_name and 'adrenalin' in driver_name:
             return 'amd' in installed_name and ('settings' in installed_name or 'software' in installed_name)
         
@@ -222,16 +592,12 @@ class SystemScanner:
             return 'java' in installed_name
         
         if len(driver_words) <= 2:
-            return len(common_words) >= 1
-        
-        key_brands = {'java', 'nvidia', 'amd', 'intel', 'microsoft', 'directx', 'visual', 'net'}
-        driver_brands = driver_words.intersection(key_brands)
-        installed_brands = installed_words.intersection(key_brands)
+            return common_count >= 1
         
-        if driver_brands and installed_brands and driver_brands.intersection(installed_brands):
+        if common_brand:
             return True
         
-        return len(common_words) >= max(1, len(driver_words) * 0.4)
+        return common_count >= max(1, len(driver_words) * 0.4)
     
     def _extract_key_words(self, name: str) -> List[str]:
         """Извлечение ключевых слов из названия драйвера"""
@@ -248,21 +614,15 @@ class SystemScanner:
     
     def _has_exclusions(self, installed_name: str, driver_name: str) -> bool:
         """Проверка на исключения для избежания ложных срабатываний"""
-        general_exclusions = ['basic', 'standard', 'generic', 'pnp']
+        general_exclusions = list(GENERAL_EXCLUSIONS)
         
         if not ('visual' in driver_name or '.net' in driver_name or 'dotnet' in driver_name):
-            general_exclusions.extend(['microsoft', 'windows'])
-        
-        brand_exclusions = {
-            'amd': ['processor', 'chipset', 'gpio', 'pci', 'smbus', 'balanced', 'dvr64', 'wvr64', 'crash defender'],
-            'intel': ['management', 'mei', 'serial', 'thermal', 'platform'],
-            'nvidia': ['audio', 'usb', 'serial']
-        }
+            general_exclusions.extend(SYSTEM_EXCLUSIONS)
         
         if any(exclusion in installed_name for exclusion in general_exclusions):
             return True
         
-        for brand, exclusions in brand_exclusions.items():
+        for brand, exclusions in BRAND_EXCLUSIONS.items():
             if brand in driver_name and any(exclusion in installed_name for exclusion in exclusions):
                 return True
         
@@ -270,26 +630,25 @@ class SystemScanner:
     
     def _calculate_relevance_score(self, driver_name: str, installed_name: str) -> float:
         """Вычисление оценки релевантности для приоритизации результатов"""
-        score = 0.0
-        
-        if driver_name in installed_name:
-            score += 10.0
-        
         driver_words = set(self._extract_key_words(driver_name))
         installed_words = set(self._extract_key_words(installed_name))
-        common_words = driver_words.intersection(installed_words)
-        score += len(common_words) * 2.0
+        common_count = len(driver_words.intersection(installed_words))
         
-        extra_words = len(installed_words) - len(common_words)
-        score -= extra_words * 0.5
+        score = 10.0 if driver_name in installed_name else 0.0
+        return score + common_count * 2.5 + self._installed_score(installed_name, len(installed_words))
+    
+    def _installed_score(self, installed_name: str, word_count: int) -> float:
+        """Часть оценки релевантности, зависящая только от установленного названия
+
+        Каждое лишнее слово стоит -0.5, общее +2.0, поэтому общее слово в сумме дает +2.5.
+        """
+        score = -word_count * 0.5
         
-        penalty_words = ['auto', 'updater', 'update', 'launcher', 'installer', 'setup']
-        for word in penalty_words:
+        for word in PENALTY_WORDS:
             if word in installed_name:
                 score -= 2.0
         
-        bonus_words = ['runtime', 'framework', 'redistributable', 'sdk']
-        for word in bonus_words:
+        for word in BONUS_WORDS:
             if word in installed_name:
                 score += 1.0
         
@@ -387,22 +746,39 @@ class SystemScanner:
 
 
 class InstallationStatusManager:
-    """Менеджер статусов установки программ и драйверов"""
+    """Менеджер статусов установки программ и драйверов
+
+    Первое сканирование полное, следующие - повторные (SystemScanner.rescan).
+    Изменения, накопленные с последней проверки статусов, позволяют
+    перепроверить только затронутые элементы каталога, остальные статусы
+    остаются прежними.
+    """
     
-    def __init__(self):
-        self.scanner = SystemScanner()
+    def __init__(self, provider: InventoryProvider = None):
+        self.scanner = SystemScanner(provider)
         self.scan_completed = False
         self.program_statuses = {}
         self.driver_statuses = {}
+        # None - статусы нужно проверить заново целиком
+        self.program_status_changes = None
+        self.driver_status_changes = None
     
-    def perform_system_scan(self) -> bool:
-        """Выполнить полное сканирование системы"""
+    def perform_system_scan(self, on_source=None) -> bool:
+        """Выполнить сканирование системы (повторное, если уже было полное)
+
+        on_source передается в SystemScanner.scan_all при полном сканировании.
+        """
         try:
-            print("Сканирование установленных программ...")
-            self.scanner.scan_installed_programs()
-            
-            print("Сканирование установленных драйверов...")
-            self.scanner.scan_installed_drivers()
+            if self.scan_completed:
+                print("Повторное сканирование системы...")
+                changes = self.scanner.rescan()
+                self.record_changes(changes)
+            else:
+                print("Сканирование установленных программ и драйверов...")
+                self.scanner.scan_all(on_source)
+                
+                self.program_status_changes = None
+                self.driver_status_changes = None
             
             self.scan_completed = True
             print(f"Сканирование завершено: найдено {len(self.scanner.installed_programs)} программ и {len(self.scanner.installed_drivers)} драйверов")
@@ -410,13 +786,30 @@ class InstallationStatusManager:
             
         except Exception as e:
             print(f"Ошибка сканирования: {e}")
+            self.program_status_changes = None
+            self.driver_status_changes = None
             return False
     
+    def record_changes(self, changes: Dict[str, Dict[str, Set[str]]]):
+        """Добавить изменения повторного сканирования к еще не учтенным в статусах"""
+        if self.program_status_changes is not None:
+            merge_changes(self.program_status_changes, changes["programs"])
+        if self.driver_status_changes is not None:
+            merge_changes(self.driver_status_changes["programs"], changes["programs"])
+            merge_changes(self.driver_status_changes["drivers"], changes["drivers"])
+    
     def check_programs_status(self, programs_data: List[Dict]) -> Dict[str, Dict]:
         """Проверить статус установки для списка программ"""
         if not self.scan_completed:
             return {}
         
+        program_names = {program.get("name", "") for program in programs_data} - {""}
+        if self.program_status_changes is not None and program_names == set(self.program_statuses):
+            rechecked = self.patch_program_statuses(self.program_status_changes)
+            self.program_status_changes = empty_changes()
+            debug_log(f"Статусы программ обновлены: перепроверено {rechecked} из {len(self.program_statuses)}")
+            return self.program_statuses
+        
         statuses = {}
         for program in programs_data:
             program_name = program.get("name", "")
@@ -425,6 +818,7 @@ class InstallationStatusManager:
                 statuses[program_name] = status
         
         self.program_statuses = statuses
+        self.program_status_changes = empty_changes()
         return statuses
     
     def check_drivers_status(self, drivers_data: List[Dict]) -> Dict[str, Dict]:
@@ -432,6 +826,13 @@ class InstallationStatusManager:
         if not self.scan_completed:
             return {}
         
+        driver_names = {driver.get("name", "") for driver in drivers_data} - {""}
+        if self.driver_status_changes is not None and driver_names == set(self.driver_statuses):
+            rechecked = self.patch_driver_statuses(self.driver_status_changes)
+            self.driver_status_changes = {"programs": empty_changes(), "drivers": empty_changes()}
+            debug_log(f"Статусы драйверов обновлены: перепроверено {rechecked} из {len(self.driver_statuses)}")
+            return self.driver_statuses
+        
         statuses = {}
         for driver in drivers_data:
             driver_name = driver.get("name", "")
@@ -440,8 +841,76 @@ class InstallationStatusManager:
                 statuses[driver_name] = status
         
         self.driver_statuses = statuses
+        self.driver_status_changes = {"programs": empty_changes(), "drivers": empty_changes()}
         return statuses
     
+    def patch_program_statuses(self, changes: Dict[str, Set[str]]) -> int:
+        """Обновить статусы программ на месте, возвращает число перепроверенных
+
+        Результат тот же, что у проверки всех программ заново: добавленные
+        названия нумеруются после известных (InstalledNameIndex.apply_changes)
+        и не вытесняют найденное совпадение, поэтому перепроверяются только
+        программы, чье совпадение удалено, и не найденные программы, к которым
+        подходит добавленное название. У совпадений с новой версией обновляется
+        только версия.
+        """
+        scanner = self.scanner
+        added_index = InstalledNameIndex(scanner, changes["added"], scanner._name_cache) if changes["added"] else None
+        rechecked = 0
+        
+        for program_name, status in self.program_statuses.items():
+            exact_name = status.get("exact_name")
+            if exact_name in changes["removed"] or (
+                    added_index is not None and not status.get("installed")
+                    and added_index.find_program(program_name.lower()) is not None):
+                self.program_statuses[program_name] = scanner.check_program_installed(program_name)
+                rechecked += 1
+            elif exact_name in changes["updated"]:
+                status["version"] = scanner.program_versions.get(exact_name, "Неизвестно")
+        
+        return rechecked
+    
+    def patch_driver_statuses(self, changes: Dict[str, Dict[str, Set[str]]]) -> int:
+        """Обновить статусы драйверов на месте, возвращает число перепроверенных
+
+        Результат тот же, что у проверки всех драйверов заново. Перепроверяются
+        драйверы, чье совпадение удалено или изменилось; драйверы, для которых
+        добавленная программа получает оценку выше текущего совпадения (при
+        равной оценке прежнее совпадение остается первым) или которые раньше
+        нашлись не среди программ; не найденные драйверы, к которым подходит
+        добавленный драйвер.
+        """
+        scanner = self.scanner
+        program_changes, driver_changes = changes["programs"], changes["drivers"]
+        stale = (program_changes["removed"] | program_changes["updated"]
+                 | driver_changes["removed"] | driver_changes["updated"])
+        added_programs = InstalledNameIndex(scanner, program_changes["added"], scanner._name_cache) if program_changes["added"] else None
+        added_drivers = InstalledNameIndex(scanner, driver_changes["added"], scanner._name_cache) if driver_changes["added"] else None
+        rechecked = 0
+        
+        for driver_name, status in self.driver_statuses.items():
+            exact_name = status.get("exact_name")
+            recheck = exact_name in stale
+            if not recheck and (added_programs is not None or added_drivers is not None):
+                driver_name_lower = driver_name.lower()
+                driver_words = scanner.driver_words(driver_name_lower)
+                found_in_programs = exact_name in scanner.installed_programs
+                
+                if added_programs is not None and exact_name != DIRECTX_STATUS_NAME:
+                    best_added = added_programs.best_program_for_driver(driver_name_lower, driver_words)
+                    recheck = best_added is not None and (
+                        not found_in_programs
+                        or best_added[0] > scanner._calculate_relevance_score(driver_name_lower, exact_name.lower())
+                    )
+                if not recheck and added_drivers is not None and not status.get("installed"):
+                    recheck = added_drivers.find_driver(driver_name_lower, driver_words) is not None
+            
+            if recheck:
+                self.driver_statuses[driver_name] = scanner.check_driver_installed(driver_name)
+                rechecked += 1
+        
+        return rechecked
+    
     def get_program_status(self, program_name: str) -> Dict[str, any]:
         """Получить статус конкретной программы"""
         return self.program_statuses.get(program_name, {"installed": False, "exact_name": None, "version": None})
@@ -452,22 +921,40 @@ class InstallationStatusManager:
 
 
 class BackgroundScanner(QThread):
-    """Фоновый сканер системы"""
+    """Фоновый сканер системы
+
+    Разделы реестра и запрос драйверов выполняются параллельно. Как только
+    готов очередной источник, source_scanned передает статусы элементов
+    каталога, впервые найденных в нем (найденное уже не пропадет, но
+    exact_name и version могут уточниться). Окончательные статусы приходят в
+    scan_completed.
+
+    Переданный status_manager переживает сканер: тогда после первого полного
+    сканирования следующие повторные и статусы обновляются на месте. Один
+    менеджер не должен использоваться двумя сканерами одновременно.
+    """
     
     scan_completed = pyqtSignal(dict, dict, dict)  
     scan_progress = pyqtSignal(str)  
+    source_scanned = pyqtSignal(str, dict, dict)
     
-    def __init__(self, programs_data=None, drivers_data=None):
+    def __init__(self, programs_data=None, drivers_data=None, provider: InventoryProvider = None,
+                 status_manager: InstallationStatusManager = None):
         super().__init__()
         self.programs_data = programs_data or []
         self.drivers_data = drivers_data or []
-        self.status_manager = InstallationStatusManager()
+        self.status_manager = status_manager or InstallationStatusManager(provider)
+        self.pending_programs = []
+        self.pending_drivers = []
     
     def run(self):
         """Выполнение сканирования в фоновом потоке"""
         try:
-            self.scan_progress.emit("Сканирование программ...")
-            success = self.status_manager.perform_system_scan()
+            self.pending_programs = [program.get("name", "") for program in self.programs_data if program.get("name", "")]
+            self.pending_drivers = [driver.get("name", "") for driver in self.drivers_data if driver.get("name", "")]
+            
+            self.scan_progress.emit("Сканирование программ и драйверов...")
+            success = self.status_manager.perform_system_scan(self.on_source_scanned)
             
             if success:
                 programs_status = {}
@@ -492,13 +979,50 @@ class BackgroundScanner(QThread):
         except Exception as e:
             print(f"Ошибка фонового сканирования: {e}")
             self.scan_completed.emit({}, {}, {"programs_found": 0, "drivers_found": 0})
+    
+    def on_source_scanned(self, source: str, names: Set[str], versions: Dict[str, str]):
+        """Статусы еще не найденных элементов каталога по названиям одного источника"""
+        scanner = self.status_manager.scanner
+        index = InstalledNameIndex(scanner, names, scanner._name_cache)
+        is_drivers = source == DRIVERS_SOURCE
+        programs_status = {}
+        drivers_status = {}
+        
+        if not is_drivers:
+            for program_name in self.pending_programs:
+                match = index.find_program(program_name.lower())
+                if match is not None:
+                    programs_status[program_name] = {
+                        "installed": True, "exact_name": match, "version": versions.get(match, "Неизвестно")
+                    }
+        
+        for driver_name in self.pending_drivers:
+            driver_name_lower = driver_name.lower()
+            driver_words = scanner.driver_words(driver_name_lower)
+            if is_drivers:
+                match = index.find_driver(driver_name_lower, driver_words)
+            else:
+                match = index.find_best_program_for_driver(driver_name_lower, driver_words)
+            if match is not None:
+                drivers_status[driver_name] = {
+                    "installed": True, "exact_name": match, "version": versions.get(match, "Неизвестно")
+                }
+        
+        self.pending_programs = [name for name in self.pending_programs if name not in programs_status]
+        self.pending_drivers = [name for name in self.pending_drivers if name not in drivers_status]
+        
+        self.scan_progress.emit(f"Источник просканирован: {source} ({len(names)})")
+        self.source_scanned.emit(source, programs_status, drivers_status)
 
 
 class CachedInstallationStatusManager(InstallationStatusManager):
     """Менеджер статусов с поддержкой кеширования"""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, provider: InventoryProvider = None):
+        super().__init__(provider)
         self.use_cache = True
+        # Статусы, найденные идущим фоновым сканированием (BackgroundScanner.source_scanned)
+        self.partial_program_statuses = {}
+        self.partial_driver_statuses = {}
     
     def get_program_status(self, program_name: str) -> Dict[str, any]:
         """Получить статус программы"""
@@ -507,7 +1031,10 @@ class CachedInstallationStatusManager(InstallationStatusManager):
             if cached_status.get("installed") is not False or cached_status.get("exact_name"):
                 return cached_status
         
-        return super().get_program_status(program_name)
+        status = super().get_program_status(program_name)
+        if not status["installed"] and program_name in self.partial_program_statuses:
+            return self.partial_program_statuses[program_name]
+        return status
     
     def get_driver_status(self, driver_name: str) -> Dict[str, any]:
         """Получить статус драйвера"""
@@ -516,7 +1043,15 @@ class CachedInstallationStatusManager(InstallationStatusManager):
             if cached_status.get("installed") is not False or cached_status.get("exact_name"):
                 return cached_status
         
-        return super().get_driver_status(driver_name)
+        status = super().get_driver_status(driver_name)
+        if not status["installed"] and driver_name in self.partial_driver_statuses:
+            return self.partial_driver_statuses[driver_name]
+        return status
+    
+    def apply_partial_statuses(self, programs_status: Dict[str, Dict], drivers_status: Dict[str, Dict]):
+        """Показать найденное фоновым сканированием до его завершения"""
+        self.partial_program_statuses.update(programs_status)
+        self.partial_driver_statuses.update(drivers_status)
     
     def force_refresh(self):
         """Принудительное обновление без кеша"""
@@ -526,4 +1061,6 @@ class CachedInstallationStatusManager(InstallationStatusManager):
     def refresh_cache(self):
         """Обновить кеш - перезагрузить данные из settings_manager"""
         settings_manager.scan_cache = settings_manager.load_scan_cache()
-        self.use_cache = True
\ No newline at end of file
+        self.use_cache = True
+        self.partial_program_statuses = {}
+        self.partial_driver_statuses = {}
\ No newline at end of file
@@ -7,7 +7,10 @@ import tempfile
 from packaging import version
 from PyQt6.QtWidgets import QMessageBox, QApplication
 from PyQt6.QtCore import QThread, pyqtSignal, QTimer
-from PyQt6.QtGui import QPixmap, QIcon, QTextBlockFormat
+from PyQt6.QtGui import QIcon, QTextBlockFormat
+from rate_limiter import get_bandwidth_limiter
+import http_client
+from image_helper import load_icon_file
 
 
 class UpdateChecker:
@@ -35,7 +38,7 @@ class UpdateChecker:
             from temp_manager import debug_log
             debug_log("Checking for updates on GitHub...")
             
-            response = requests.get(self.github_api_url, timeout=10)
+            response = http_client.get(self.github_api_url)
             response.raise_for_status()
             release_data = response.json()
             latest_version = release_data.get('tag_name', '').lstrip('v')
@@ -135,27 +138,35 @@ class UpdateDownloader(QThread):
             temp_dir = tempfile.gettempdir()
             installer_path = os.path.join(temp_dir, self.installer_name)
             
-            response = requests.get(self.installer_url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded_size = 0
-            
-            with open(installer_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if self.cancelled:
-                        f.close()
-                        if os.path.exists(installer_path):
-                            os.remove(installer_path)
-                        return
-                    
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        
-                        if total_size > 0:
-                            progress = int((downloaded_size / total_size) * 100)
-                            self.progress_updated.emit(progress)
+            # Ответ закрывается и при отмене, иначе соединение остается занятым недочитанным телом
+            with http_client.get(self.installer_url, stream=True) as response:
+                response.raise_for_status()
+                
+                total_size = int(response.headers.get('content-length', 0))
+                downloaded_size = 0
+                
+                throttle = get_bandwidth_limiter().create_transfer()
+                try:
+                    with open(installer_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=8192):
+                            if self.cancelled:
+                                break
+                            
+                            if chunk:
+                                f.write(chunk)
+                                downloaded_size += len(chunk)
+                                throttle.consume(len(chunk), lambda: self.cancelled)
+                                
+                                if total_size > 0:
+                                    progress = int((downloaded_size / total_size) * 100)
+                                    self.progress_updated.emit(progress)
+                finally:
+                    throttle.close()
+            
+            if self.cancelled:
+                if os.path.exists(installer_path):
+                    os.remove(installer_path)
+                return
             
             debug_log(f"Download completed: {installer_path}")
             self.download_finished.emit(installer_path)
@@ -188,7 +199,6 @@ class UpdateManager:
         try:
             from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
             from PyQt6.QtCore import Qt
-            from PyQt6.QtGui import QPixmap
             
             check_dialog = QDialog(self.parent_window)
             check_dialog.setWindowTitle("Проверка обновлений")
@@ -220,7 +230,7 @@ class UpdateManager:
                 from resource_path import get_icon_path
                 logo_icon_path = get_icon_path("logo64x64.png")
                 if logo_icon_path:
-                    pixmap = QPixmap(logo_icon_path)
+                    pixmap = load_icon_file(logo_icon_path)
                     scaled_pixmap = pixmap.scaled(32, 32, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                     icon_label.setPixmap(scaled_pixmap)
             except:
@@ -360,7 +370,7 @@ class UpdateManager:
         """Показать диалог с предложением обновления"""
         from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
         from PyQt6.QtCore import Qt, QSize
-        from PyQt6.QtGui import QFont, QPixmap, QIcon
+        from PyQt6.QtGui import QFont, QIcon
         
         dialog = QDialog(self.parent_window)
         dialog.setWindowTitle("Обновление UTILHELP")
@@ -392,7 +402,7 @@ class UpdateManager:
             from resource_path import get_icon_path
             logo_icon_path = get_icon_path("logo64x64.png")
             if logo_icon_path:
-                pixmap = QPixmap(logo_icon_path)
+                pixmap = load_icon_file(logo_icon_path)
                 scaled_pixmap = pixmap.scaled(56, 56, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                 icon_label.setPixmap(scaled_pixmap)
         except:
@@ -832,7 +842,6 @@ class UpdateManager:
             
             from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
             from PyQt6.QtCore import Qt
-            from PyQt6.QtGui import QPixmap
             
             dialog = QDialog(self.parent_window)
             dialog.setWindowTitle("Обновление готово")
@@ -862,7 +871,7 @@ class UpdateManager:
                 from resource_path import get_icon_path
                 complete_icon_path = get_icon_path("complete.png")
                 if complete_icon_path:
-                    pixmap = QPixmap(complete_icon_path)
+                    pixmap = load_icon_file(complete_icon_path)
                     scaled_pixmap = pixmap.scaled(48, 48, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                     icon_label.setPixmap(scaled_pixmap)
                 else:
@@ -988,7 +997,6 @@ class UpdateManager:
         
         from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
         from PyQt6.QtCore import Qt
-        from PyQt6.QtGui import QPixmap
         
         dialog = QDialog(self.parent_window)
         dialog.setWindowTitle("Ошибка скачивания")
@@ -1020,7 +1028,7 @@ class UpdateManager:
             from resource_path import get_icon_path
             error_icon_path = get_icon_path("error.png")
             if error_icon_path:
-                pixmap = QPixmap(error_icon_path)
+                pixmap = load_icon_file(error_icon_path)
                 scaled_pixmap = pixmap.scaled(32, 32, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
                 icon_label.setPixmap(scaled_pixmap)
             else: